@@ -1,13 +1,17 @@
 import pandas as pd
 import numpy as np
+import json
+import os
 import re
+import time
 import torch
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import classification_report, accuracy_score
 from transformers import AutoTokenizer, AutoModelForSequenceClassification, TrainingArguments, Trainer
+from transformers import DataCollatorWithPadding
 from datasets import Dataset
-import nlpaug.augmenter.word as naw
+from augment import augment_minority_classes
 import warnings
 warnings.filterwarnings("ignore")
 
@@ -38,26 +42,11 @@ print(f"عدد الكلاسات: {df['Category'].nunique()}")
 le = LabelEncoder()
 df['label'] = le.fit_transform(df['Category'])
 
-# Data Augmentation
-aug = naw.SynonymAug(aug_src='wordnet', aug_p=0.3)
-
-augmented_texts = []
-augmented_labels = []
-
-for label in df['label'].unique():
-    current = df[df['label'] == label].shape[0]
-    if current < 60:
-        needed = 60 - current
-        samples = df[df['label'] == label]['RESUME'].sample(min(needed, current), replace=True)
-        for text in samples:
-            try:
-                augmented_texts.append(aug.augment(text))
-                augmented_labels.append(label)
-            except:
-                pass
-
-if augmented_texts:
-    aug_df = pd.DataFrame({'RESUME': augmented_texts, 'label': augmented_labels})
+# Data Augmentation (موزعة على processes ومحفوظة في aug_cache/ - شوف augment.py)
+aug_df = augment_minority_classes(df, text_column='RESUME', label_column='label',
+                                  target=60, aug_src='wordnet', aug_p=0.3, seed=42)
+
+if len(aug_df):
     df = pd.concat([df, aug_df], ignore_index=True)
 
 print(f"عدد العينات بعد التوسيع: {len(df)}")
@@ -71,15 +60,71 @@ test_dataset = Dataset.from_pandas(test_df[['RESUME', 'label']])
 model_name = "bert-base-uncased"
 tokenizer = AutoTokenizer.from_pretrained(model_name)
 
+MAX_LENGTH = 384
+
+# بدون padding هنا: كل batch يتعمله padding لأطول CV فيه بس (DataCollatorWithPadding)
+# عمود length بيستخدمه group_by_length عشان يجمع الـ CVs المتقاربة في الطول
 def tokenize(examples):
-    return tokenizer(examples['RESUME'], truncation=True, padding="max_length", max_length=384)
+    encoded = tokenizer(examples['RESUME'], truncation=True, max_length=MAX_LENGTH)
+    encoded['length'] = [len(ids) for ids in encoded['input_ids']]
+    return encoded
 
 train_dataset = train_dataset.map(tokenize, batched=True)
 test_dataset = test_dataset.map(tokenize, batched=True)
 train_dataset = train_dataset.rename_column("label", "labels")
 test_dataset = test_dataset.rename_column("label", "labels")
-train_dataset.set_format("torch", columns=["input_ids", "attention_mask", "labels"])
-test_dataset.set_format("torch", columns=["input_ids", "attention_mask", "labels"])
+
+# الجهاز والدقة: GPU لو موجود (bf16 لو مدعوم وإلا fp16)، وإلا CPU (bf16 لو المعالج بيدعمه)
+use_cuda = torch.cuda.is_available()
+if use_cuda:
+    use_bf16 = torch.cuda.is_bf16_supported()
+    use_fp16 = not use_bf16
+else:
+    try:
+        from transformers.utils import is_torch_bf16_cpu_available
+        use_bf16 = is_torch_bf16_cpu_available()
+    except ImportError:
+        use_bf16 = False
+    use_fp16 = False
+device_name = "GPU" if use_cuda else "CPU"
+precision = "bf16" if use_bf16 else ("fp16" if use_fp16 else "fp32")
+print(f"الجهاز: {device_name} | الدقة العددية: {precision}")
+
+
+# Dynamic padding + إحصائيات: عدد التوكنز الحقيقية مقابل الـ padding
+class PaddingStats:
+    def __init__(self, collator):
+        self.collator = collator
+        self.reset()
+
+    def reset(self):
+        self.real_tokens = 0
+        self.padded_tokens = 0
+        self.examples = 0
+
+    def __call__(self, features):
+        batch = self.collator(features)
+        mask = batch["attention_mask"]
+        self.real_tokens += int(mask.sum())
+        self.padded_tokens += mask.numel()
+        self.examples += mask.shape[0]
+        return batch
+
+    def report(self, title, seconds=None):
+        if not self.padded_tokens:
+            return
+        waste = 1 - self.real_tokens / self.padded_tokens
+        fixed_waste = 1 - self.real_tokens / (self.examples * MAX_LENGTH)
+        print(f"\n{title}:")
+        print(f"  توكنز حقيقية: {self.real_tokens:,} | بعد الـ padding: {self.padded_tokens:,}")
+        print(f"  هدر الـ padding: {waste:.1%} (مع max_length={MAX_LENGTH} الثابت كان {fixed_waste:.1%})")
+        if seconds:
+            print(f"  السرعة: {self.real_tokens / seconds:,.0f} توكن/ثانية "
+                  f"({self.examples / seconds:.1f} CV/ثانية)")
+
+data_collator = PaddingStats(
+    DataCollatorWithPadding(tokenizer, pad_to_multiple_of=8 if use_cuda else None)
+)
 
 # Class Weights
 from sklearn.utils.class_weight import compute_class_weight
@@ -98,9 +143,7 @@ class WeightedTrainer(Trainer):
 
 # الموديل
 model = AutoModelForSequenceClassification.from_pretrained(model_name, num_labels=len(le.classes_))
-
-# نقل الموديل للـ GPU
-model = model.to('cuda')
+# الـ Trainer بينقل الموديل للجهاز المتاح (GPU أو CPU)
 
 # التدريب
 training_args = TrainingArguments(
@@ -118,7 +161,10 @@ training_args = TrainingArguments(
     save_steps=200,
     load_best_model_at_end=True,
     metric_for_best_model="accuracy",
-    fp16=True,
+    fp16=use_fp16,
+    bf16=use_bf16,
+    group_by_length=True,
+    length_column_name="length",
     report_to=[],
     lr_scheduler_type="cosine",
 )
@@ -128,16 +174,32 @@ trainer = WeightedTrainer(
     args=training_args,
     train_dataset=train_dataset,
     eval_dataset=test_dataset,
+    data_collator=data_collator,
     compute_metrics=lambda p: {"accuracy": accuracy_score(p.label_ids, p.predictions.argmax(-1))},
 )
 
-print("بدء التدريب على GPU... (30-45 دقيقة)")
-trainer.train()
+print(f"بدء التدريب على {device_name}..." + (" (30-45 دقيقة)" if use_cuda else ""))
+train_result = trainer.train()
+# الإحصائيات تشمل الـ evaluation اللي حصل أثناء التدريب
+data_collator.report("التدريب (شامل التقييم الدوري)", train_result.metrics.get("train_runtime"))
 
 # النتيجة
+data_collator.reset()
+eval_start = time.perf_counter()
 eval_result = trainer.evaluate()
+data_collator.report("التقييم النهائي", time.perf_counter() - eval_start)
 accuracy = eval_result['eval_accuracy']
 print(f"\nالدقة النهائية: {accuracy:.4f} ({accuracy*100:.2f}%)")
 
 if accuracy >= 0.90:
-    print("مبروك! وصلتي لـ 90%+")
\ No newline at end of file
+    print("مبروك! وصلتي لـ 90%+")
+
+# حفظ الـ teacher للـ distillation (distill.py): الموديل + التوكنايزر + أسماء الكلاسات + نفس التقسيم
+TEACHER_DIR = "./cv_bert_teacher"
+trainer.save_model(TEACHER_DIR)
+tokenizer.save_pretrained(TEACHER_DIR)
+with open(os.path.join(TEACHER_DIR, "classes.json"), "w", encoding="utf-8") as f:
+    json.dump([str(c) for c in le.classes_], f, ensure_ascii=False, indent=2)
+train_df[['RESUME', 'label']].to_csv(os.path.join(TEACHER_DIR, "train.csv"), index=False)
+test_df[['RESUME', 'label']].to_csv(os.path.join(TEACHER_DIR, "test.csv"), index=False)
+print(f"تم حفظ الـ teacher في {TEACHER_DIR} (للـ distillation: python distill.py)")
@@ -0,0 +1,124 @@
+"""
+مرحلة الـ Data Augmentation لـ MY.py
+
+بتكمل كل كلاس أقل من target لحد target عينة باستخدام SynonymAug،
+والشغل موزع على process pool. كل نص ليه seed خاص بيه، فالنتيجة ثابتة
+مهما كان عدد الـ workers أو ترتيب التنفيذ.
+
+النتيجة بتتحفظ في cache_dir باسم مبني على hash البيانات + إعدادات الـ augmentation،
+فأي تدريب تاني على نفس البيانات بنفس الإعدادات بيقرا الملف بدل ما يعيد التوليد.
+
+    from augment import augment_minority_classes
+    aug_df = augment_minority_classes(df, text_column='RESUME', label_column='label')
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = "aug_cache"
+CHUNK_SIZE = 16
+
+_augmenter = None
+
+
+def data_hash(df, text_column, label_column):
+    values = pd.util.hash_pandas_object(df[[text_column, label_column]], index=False).values
+    return hashlib.sha256(values.tobytes()).hexdigest()
+
+
+def cache_path(df, text_column, label_column, params, cache_dir=CACHE_DIR):
+    key = json.dumps({"data": data_hash(df, text_column, label_column), **params}, sort_keys=True)
+    return os.path.join(cache_dir, f"augmented_{hashlib.sha256(key.encode()).hexdigest()[:16]}.csv")
+
+
+def plan(df, text_column, label_column, target, seed):
+    # نفس منطق MY.py القديم: لكل كلاس أقل من target نختار min(needed, current) نص بالتكرار
+    tasks = []
+    for label in sorted(df[label_column].unique()):
+        texts = df.loc[df[label_column] == label, text_column]
+        current = len(texts)
+        if current >= target:
+            continue
+        needed = target - current
+        samples = texts.sample(min(needed, current), replace=True, random_state=seed + int(label))
+        for text in samples:
+            tasks.append((label, text))
+    # seed مستقل لكل نص (مش مرتبط بالـ worker اللي هيشتغل عليه)
+    item_seeds = np.random.SeedSequence(seed).generate_state(len(tasks)) if tasks else []
+    return [(int(item_seed), label, text) for item_seed, (label, text) in zip(item_seeds, tasks)]
+
+
+def _init_worker(aug_src, aug_p):
+    global _augmenter
+    import nlpaug.augmenter.word as naw
+    _augmenter = naw.SynonymAug(aug_src=aug_src, aug_p=aug_p)
+
+
+def _augment_one(task):
+    item_seed, label, text = task
+    random.seed(item_seed)
+    np.random.seed(item_seed)
+    try:
+        augmented = _augmenter.augment(text)
+    except Exception:
+        return None
+    # الإصدارات الجديدة من nlpaug بترجع list
+    if isinstance(augmented, list):
+        augmented = augmented[0] if augmented else None
+    return (augmented, label) if augmented else None
+
+
+def _pool_context():
+    # spawn بيعيد تشغيل سكريبت التدريب نفسه (MY.py مالوش main guard)، فبنستخدم fork لو متاح
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return None
+
+
+def augment_minority_classes(df, text_column="RESUME", label_column="label", target=60,
+                             aug_src="wordnet", aug_p=0.3, seed=42, workers=None,
+                             cache_dir=CACHE_DIR):
+    try:
+        from nlpaug import __version__ as nlpaug_version
+    except ImportError:
+        nlpaug_version = "unknown"
+    params = {"target": target, "aug_src": aug_src, "aug_p": aug_p, "seed": seed,
+              "nlpaug": nlpaug_version}
+    path = cache_path(df, text_column, label_column, params, cache_dir)
+    if os.path.exists(path):
+        aug_df = pd.read_csv(path, keep_default_na=False)
+        print(f"Augmentation من الكاش: {len(aug_df)} عينة ({path})")
+        return aug_df
+
+    tasks = plan(df, text_column, label_column, target, seed)
+    if not tasks:
+        return pd.DataFrame({text_column: [], label_column: []})
+
+    workers = workers or os.cpu_count() or 1
+    context = _pool_context()
+    if workers > 1 and context is not None:
+        print(f"Augmentation: {len(tasks)} نص على {workers} workers...")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=_init_worker, initargs=(aug_src, aug_p)) as pool:
+            results = list(pool.map(_augment_one, tasks, chunksize=CHUNK_SIZE))
+    else:
+        print(f"Augmentation: {len(tasks)} نص (process واحد)...")
+        _init_worker(aug_src, aug_p)
+        results = [_augment_one(task) for task in tasks]
+
+    rows = [result for result in results if result is not None]
+    aug_df = pd.DataFrame(rows, columns=[text_column, label_column])
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = path + ".tmp"
+    aug_df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    print(f"تم حفظ {len(aug_df)} عينة في {path}")
+    return aug_df
@@ -0,0 +1,283 @@
+"""
+Distillation: من BERT (MY.py) لموديل Keras صغير سريع على الـ CPU
+
+الـ teacher هو bert-base-uncased المتدرب في MY.py (محفوظ في ./cv_bert_teacher).
+الـ student: Embedding -> GlobalAveragePooling -> Dense، بيتدرب على الـ soft labels
+بتاعة الـ teacher (temperature T) مع الـ labels الحقيقية.
+
+التصدير بنفس المسار اللي خدمة /classify بتحمله (cv_classifier_real_model.py):
+    mlp_cv_model.h5                 الموديل (input = token ids، output = softmax)
+    mlp_cv_model_tokenizer.pkl      Keras Tokenizer
+    mlp_cv_model_classes.json       أسماء الكلاسات بترتيب الـ output
+    mlp_cv_model_distill.json       تقرير: فرق الدقة + السرعة + الذاكرة مقابل الـ teacher
+
+    python distill.py
+    python distill.py --teacher ./cv_bert_teacher --epochs 30 --force
+"""
+
+import argparse
+import json
+import os
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+TEACHER_DIR = "./cv_bert_teacher"
+OUTPUT = "mlp_cv_model.h5"
+TEACHER_MAX_LENGTH = 384
+
+
+def artifact_paths(model_path):
+    base = os.path.splitext(model_path)[0]
+    return {
+        "model": model_path,
+        "tokenizer": base + "_tokenizer.pkl",
+        "classes": base + "_classes.json",
+        "report": base + "_distill.json",
+    }
+
+
+# ───────────────────────── Teacher ─────────────────────────
+
+def load_teacher(teacher_dir):
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(teacher_dir)
+    model = AutoModelForSequenceClassification.from_pretrained(teacher_dir)
+    model.eval()
+    model.to("cuda" if torch.cuda.is_available() else "cpu")
+    return model, tokenizer
+
+
+def teacher_logits(model, tokenizer, texts, batch_size=32):
+    # ترتيب حسب الطول عشان كل batch يتعمله padding لأطول نص فيه بس
+    import torch
+
+    device = next(model.parameters()).device
+    lengths = [len(text.split()) for text in texts]
+    order = np.argsort(lengths)
+    logits = np.zeros((len(texts), model.config.num_labels), dtype=np.float32)
+    with torch.no_grad():
+        for start in range(0, len(texts), batch_size):
+            idx = order[start:start + batch_size]
+            batch = tokenizer([texts[i] for i in idx], truncation=True, max_length=TEACHER_MAX_LENGTH,
+                              padding=True, return_tensors="pt").to(device)
+            logits[idx] = model(**batch).logits.float().cpu().numpy()
+            if (start // batch_size) % 20 == 0:
+                print(f"  teacher: {min(start + batch_size, len(texts))}/{len(texts)}")
+    return logits
+
+
+def cached_teacher_logits(model, tokenizer, texts, path):
+    # الـ soft labels بتتحسب مرة واحدة (أبطأ خطوة على الـ CPU)
+    if os.path.exists(path):
+        logits = np.load(path)
+        if len(logits) == len(texts):
+            print(f"soft labels من الكاش: {path}")
+            return logits
+    logits = teacher_logits(model, tokenizer, texts)
+    np.save(path, logits)
+    return logits
+
+
+# ───────────────────────── Student ─────────────────────────
+
+def build_student(vocab_size, maxlen, num_classes, embedding_dim=128, hidden=256, dropout=0.3):
+    import tensorflow as tf
+
+    inputs = tf.keras.Input(shape=(maxlen,), dtype="int32", name="token_ids")
+    x = tf.keras.layers.Embedding(vocab_size, embedding_dim, mask_zero=True)(inputs)
+    x = tf.keras.layers.GlobalAveragePooling1D()(x)
+    x = tf.keras.layers.Dense(hidden, activation="relu")(x)
+    x = tf.keras.layers.Dropout(dropout)(x)
+    logits = tf.keras.layers.Dense(num_classes, name="logits")(x)
+    return tf.keras.Model(inputs, logits)
+
+
+def distillation_loss(num_classes, temperature, alpha):
+    # y_true = [soft labels للـ teacher عند T | one-hot للـ label الحقيقي]
+    import tensorflow as tf
+
+    def loss(y_true, logits):
+        soft, hard = y_true[:, :num_classes], y_true[:, num_classes:]
+        student_soft = tf.nn.softmax(logits / temperature)
+        kd = tf.keras.losses.kl_divergence(soft, student_soft) * temperature ** 2
+        ce = tf.keras.losses.categorical_crossentropy(hard, logits, from_logits=True)
+        return alpha * kd + (1 - alpha) * ce
+
+    return loss
+
+
+def softmax(logits, temperature=1.0):
+    z = logits / temperature
+    z = z - z.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+# ───────────────────────── القياس ─────────────────────────
+
+def median_latency_ms(fn, texts, warmup=3):
+    for text in texts[:warmup]:
+        fn(text)
+    timings = []
+    for text in texts:
+        started = time.perf_counter()
+        fn(text)
+        timings.append(time.perf_counter() - started)
+    return float(np.median(timings)) * 1000
+
+
+def teacher_predict_one(model, tokenizer):
+    import torch
+
+    device = next(model.parameters()).device
+
+    def predict(text):
+        batch = tokenizer([text], truncation=True, max_length=TEACHER_MAX_LENGTH,
+                          return_tensors="pt").to(device)
+        with torch.no_grad():
+            return model(**batch).logits
+
+    return predict
+
+
+def student_predict_one(model, keras_tokenizer, maxlen):
+    from tensorflow.keras.preprocessing.sequence import pad_sequences
+
+    def predict(text):
+        padded = pad_sequences(keras_tokenizer.texts_to_sequences([text]), maxlen=maxlen, padding="post")
+        return model(padded, training=False)
+
+    return predict
+
+
+def param_mb(count):
+    return count * 4 / (1024 * 1024)
+
+
+# ───────────────────────── Pipeline ─────────────────────────
+
+def distill(teacher_dir=TEACHER_DIR, output=OUTPUT, vocab_size=20000, maxlen=512, epochs=20,
+            batch_size=64, temperature=4.0, alpha=0.7, latency_samples=50, force=False):
+    import tensorflow as tf
+    from tensorflow.keras.preprocessing.sequence import pad_sequences
+    from tensorflow.keras.preprocessing.text import Tokenizer
+
+    paths = artifact_paths(output)
+    if os.path.exists(paths["model"]) and not force:
+        raise SystemExit(f"{paths['model']} موجود بالفعل - استخدمي --force للاستبدال")
+
+    train_df = pd.read_csv(os.path.join(teacher_dir, "train.csv"), keep_default_na=False)
+    test_df = pd.read_csv(os.path.join(teacher_dir, "test.csv"), keep_default_na=False)
+    with open(os.path.join(teacher_dir, "classes.json"), "r", encoding="utf-8") as f:
+        classes = json.load(f)
+    num_classes = len(classes)
+    train_texts, test_texts = train_df["RESUME"].tolist(), test_df["RESUME"].tolist()
+    y_train, y_test = train_df["label"].to_numpy(), test_df["label"].to_numpy()
+    print(f"Train: {len(train_texts)} | Test: {len(test_texts)} | كلاسات: {num_classes}")
+
+    # 1) soft labels من الـ teacher
+    print("\nحساب soft labels من الـ teacher...")
+    teacher, teacher_tokenizer = load_teacher(teacher_dir)
+    train_logits = cached_teacher_logits(teacher, teacher_tokenizer, train_texts,
+                                         os.path.join(teacher_dir, "train_logits.npy"))
+    test_logits = cached_teacher_logits(teacher, teacher_tokenizer, test_texts,
+                                        os.path.join(teacher_dir, "test_logits.npy"))
+    teacher_acc = float((test_logits.argmax(1) == y_test).mean())
+
+    # 2) الـ student
+    keras_tokenizer = Tokenizer(num_words=vocab_size, oov_token="<OOV>")
+    keras_tokenizer.fit_on_texts(train_texts)
+    x_train = pad_sequences(keras_tokenizer.texts_to_sequences(train_texts), maxlen=maxlen, padding="post")
+    x_test = pad_sequences(keras_tokenizer.texts_to_sequences(test_texts), maxlen=maxlen, padding="post")
+
+    targets = np.concatenate([softmax(train_logits, temperature),
+                              np.eye(num_classes, dtype=np.float32)[y_train]], axis=1)
+
+    student = build_student(vocab_size, maxlen, num_classes)
+    student.compile(optimizer=tf.keras.optimizers.Adam(1e-3),
+                    loss=distillation_loss(num_classes, temperature, alpha))
+    print(f"\nتدريب الـ student ({student.count_params():,} parameter)...")
+    started = time.perf_counter()
+    student.fit(x_train, targets, epochs=epochs, batch_size=batch_size, validation_split=0.1,
+                callbacks=[tf.keras.callbacks.EarlyStopping(patience=3, restore_best_weights=True)],
+                verbose=2)
+    train_seconds = time.perf_counter() - started
+
+    student_logits = student.predict(x_test, batch_size=256, verbose=0)
+    student_acc = float((student_logits.argmax(1) == y_test).mean())
+    agreement = float((student_logits.argmax(1) == test_logits.argmax(1)).mean())
+
+    # 3) التصدير: نفس شكل mlp_cv_model.h5 (token ids -> احتمالات)
+    exported = tf.keras.Model(student.input, tf.keras.layers.Softmax()(student.output))
+    os.makedirs(os.path.dirname(os.path.abspath(paths["model"])), exist_ok=True)
+    exported.save(paths["model"])
+    with open(paths["tokenizer"], "wb") as f:
+        pickle.dump(keras_tokenizer, f)
+    with open(paths["classes"], "w", encoding="utf-8") as f:
+        json.dump(classes, f, ensure_ascii=False, indent=2)
+
+    # 4) المقارنة: CV واحد في المرة (زي الخدمة)
+    sample = test_texts[:latency_samples]
+    teacher_ms = median_latency_ms(teacher_predict_one(teacher, teacher_tokenizer), sample)
+    student_ms = median_latency_ms(student_predict_one(exported, keras_tokenizer, maxlen), sample)
+    teacher_params = sum(p.numel() for p in teacher.parameters())
+    student_params = exported.count_params()
+
+    report = {
+        "teacher": {"accuracy": teacher_acc, "latency_ms": teacher_ms, "params": teacher_params,
+                    "weights_mb": param_mb(teacher_params)},
+        "student": {"accuracy": student_acc, "latency_ms": student_ms, "params": student_params,
+                    "weights_mb": param_mb(student_params),
+                    "file_mb": os.path.getsize(paths["model"]) / (1024 * 1024),
+                    "train_seconds": train_seconds},
+        "accuracy_gap": teacher_acc - student_acc,
+        "agreement_with_teacher": agreement,
+        "speedup": teacher_ms / student_ms if student_ms else None,
+        "memory_reduction": teacher_params / student_params,
+        "settings": {"vocab_size": vocab_size, "maxlen": maxlen, "temperature": temperature,
+                     "alpha": alpha, "epochs": epochs, "batch_size": batch_size},
+    }
+    with open(paths["report"], "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print("\n" + "=" * 60)
+    print("نتيجة الـ Distillation")
+    print("=" * 60)
+    print(f"الدقة:      teacher {teacher_acc:.2%} | student {student_acc:.2%} "
+          f"| الفرق {report['accuracy_gap'] * 100:.2f} نقطة")
+    print(f"التطابق مع الـ teacher: {agreement:.2%}")
+    print(f"زمن CV واحد: teacher {teacher_ms:.1f}ms | student {student_ms:.2f}ms "
+          f"| أسرع {report['speedup']:.0f}x")
+    print(f"الأوزان:    teacher {param_mb(teacher_params):.0f}MB | student {param_mb(student_params):.1f}MB "
+          f"| أصغر {report['memory_reduction']:.0f}x")
+    print(f"\nتم الحفظ: {paths['model']}")
+    print(f"          {paths['tokenizer']}")
+    print(f"          {paths['classes']}")
+    print(f"          {paths['report']}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distillation من BERT لموديل Keras صغير")
+    parser.add_argument("--teacher", default=TEACHER_DIR)
+    parser.add_argument("--output", default=OUTPUT)
+    parser.add_argument("--vocab-size", type=int, default=20000)
+    parser.add_argument("--maxlen", type=int, default=512)
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--temperature", type=float, default=4.0)
+    parser.add_argument("--alpha", type=float, default=0.7, help="وزن الـ soft labels مقابل الـ labels الحقيقية")
+    parser.add_argument("--force", action="store_true", help="استبدال mlp_cv_model.h5 لو موجود")
+    args = parser.parse_args()
+
+    distill(args.teacher, args.output, args.vocab_size, args.maxlen, args.epochs, args.batch_size,
+            args.temperature, args.alpha, force=args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+"""
+Performance benchmarks for the ML services (see benchmarks/run.py)
+"""
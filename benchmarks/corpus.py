@@ -0,0 +1,90 @@
+"""
+Synthetic CV / job corpus for benchmarks and load tests
+
+Texts are built from role titles, technical skills (the same vocabulary the
+matchers and classifiers look for) and filler words, so keyword scans,
+tokenizers and embedders do realistic amounts of work. Generation is seeded
+and therefore reproducible.
+
+Usage:
+    python -m benchmarks.corpus --kind cv --count 1000 --length 300 --out cvs.jsonl
+"""
+
+import argparse
+import json
+import random
+
+ROLES = [
+    "Frontend Developer", "Backend Developer", "Full Stack Developer", "Mobile Developer",
+    "DevOps Engineer", "Data Scientist", "Machine Learning Engineer", "QA Engineer",
+    "UI/UX Designer", "Network Engineer", "Cybersecurity Analyst", "Project Manager",
+    "Data Analyst", "HR Specialist", "Accountant", "Digital Marketing Specialist",
+]
+
+SKILLS = [
+    "python", "java", "javascript", "typescript", "node.js", "express", "react", "vue", "angular",
+    "next.js", "html", "css", "tailwind", "php", "c#", "c++", "go", "rust", "kotlin", "swift",
+    "flutter", "react native", "android", "ios", "mongodb", "mysql", "postgresql", "redis", "sql",
+    "docker", "kubernetes", "aws", "azure", "gcp", "jenkins", "terraform", "ci/cd", "linux", "git",
+    "rest", "graphql", "microservices", "jwt", "oauth", "machine learning", "deep learning",
+    "tensorflow", "pytorch", "scikit-learn", "pandas", "numpy", "nlp", "computer vision",
+    "power bi", "tableau", "excel", "spark", "hadoop", "selenium", "jest", "pytest", "agile",
+    "scrum", "figma", "photoshop", "seo", "google ads", "cisco", "firewall", "vpn", "siem",
+    "penetration testing", "quickbooks", "project management", "leadership", "communication",
+]
+
+FILLER = [
+    "experience", "team", "project", "worked", "developed", "built", "designed", "implemented",
+    "responsible", "years", "company", "client", "system", "application", "service", "platform",
+    "delivered", "improved", "performance", "led", "collaborated", "requirements", "production",
+    "support", "maintained", "features", "users", "data", "solutions", "quality", "process",
+    "the", "and", "with", "for", "in", "of", "to", "on", "using", "including", "across",
+]
+
+CV_SECTIONS = ["Summary", "Experience", "Education", "Skills", "Projects", "Certifications"]
+JOB_SECTIONS = ["About the role", "Responsibilities", "Requirements", "Nice to have", "Benefits"]
+
+
+def _text(rng, length, sections, title, skill_share):
+    words = []
+    for i in range(length):
+        if i and i % max(1, length // len(sections)) == 0:
+            words.append(f"\n{sections[(i * len(sections)) // length]}:")
+        words.append(rng.choice(SKILLS) if rng.random() < skill_share else rng.choice(FILLER))
+    return f"{title}\n" + " ".join(words)
+
+
+def generate_cvs(count, length=300, seed=42, skill_share=0.2):
+    """count CV texts of about `length` words each"""
+    rng = random.Random(seed)
+    return [_text(rng, length, CV_SECTIONS, rng.choice(ROLES), skill_share) for _ in range(count)]
+
+
+def generate_jobs(count, length=150, seed=7, skill_share=0.25):
+    """count job descriptions of about `length` words each"""
+    rng = random.Random(seed)
+    return [_text(rng, length, JOB_SECTIONS, f"Hiring: {rng.choice(ROLES)}", skill_share) for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic CV or job corpus (jsonl)")
+    parser.add_argument("--kind", choices=["cv", "job"], default="cv")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--length", type=int, default=None, help="words per text")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+
+    if args.kind == "cv":
+        texts = generate_cvs(args.count, args.length or 300, args.seed)
+    else:
+        texts = generate_jobs(args.count, args.length or 150, args.seed)
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        for i, text in enumerate(texts):
+            f.write(json.dumps({"id": i, "text": text}, ensure_ascii=False) + "\n")
+    print(f"✅ Wrote {len(texts)} {args.kind} texts to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark harness - registration, timing and baseline comparison
+
+A benchmark is a setup function that receives the scale (number of items)
+and returns a zero-argument callable doing the timed work. Setup may raise
+BenchmarkSkipped when an optional dependency, model file or service is
+missing; the run records the reason and continues.
+"""
+
+import gc
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+
+class BenchmarkSkipped(Exception):
+    """Raised by a setup function when the benchmark cannot run here"""
+
+
+@dataclass
+class Benchmark:
+    name: str
+    setup: Callable[[int], Callable[[], object]]
+    unit: str = "item"
+    max_scale: Optional[int] = None
+    description: str = ""
+
+
+REGISTRY: Dict[str, Benchmark] = {}
+
+
+def benchmark(name, unit="item", max_scale=None, description=""):
+    """Decorator registering a setup function as a benchmark"""
+    def register(setup):
+        REGISTRY[name] = Benchmark(name, setup, unit, max_scale, description or (setup.__doc__ or "").strip())
+        return setup
+    return register
+
+
+def repeats_for(scale):
+    if scale >= 10000:
+        return 1
+    if scale >= 1000:
+        return 3
+    return 10
+
+
+def time_benchmark(bench: Benchmark, scale: int, repeats: Optional[int] = None) -> dict:
+    """Run one benchmark at one scale; timings are wall-clock seconds per run"""
+    try:
+        fn = bench.setup(scale)
+    except BenchmarkSkipped as e:
+        return {"status": "skipped", "reason": str(e)}
+    except ImportError as e:
+        return {"status": "skipped", "reason": f"missing dependency: {e}"}
+
+    # Warm-up (imports, caches, lazy model init) is not part of the timing
+    fn()
+
+    runs: List[float] = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats or repeats_for(scale)):
+            started = time.perf_counter()
+            fn()
+            runs.append(time.perf_counter() - started)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    median = statistics.median(runs)
+    return {
+        "status": "ok",
+        "runs": len(runs),
+        "min_s": min(runs),
+        "median_s": median,
+        "max_s": max(runs),
+        "per_item_us": median / scale * 1e6 if scale else None,
+        "items_per_s": scale / median if median > 0 else None,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> List[dict]:
+    """Benchmarks whose median got slower than baseline by more than threshold (0.2 = 20%)"""
+    regressions = []
+    for name, scales in results.get("benchmarks", {}).items():
+        for scale, current in scales.items():
+            previous = baseline.get("benchmarks", {}).get(name, {}).get(scale)
+            if not previous or current.get("status") != "ok" or previous.get("status") != "ok":
+                continue
+            ratio = current["median_s"] / previous["median_s"] if previous["median_s"] > 0 else 1.0
+            current["baseline_ratio"] = round(ratio, 3)
+            if ratio > 1 + threshold:
+                regressions.append({
+                    "benchmark": name,
+                    "scale": scale,
+                    "baseline_s": previous["median_s"],
+                    "current_s": current["median_s"],
+                    "ratio": round(ratio, 3),
+                })
+    return regressions
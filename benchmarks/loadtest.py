@@ -0,0 +1,382 @@
+"""
+Load test harness - replay or synthesize traffic against the local services
+
+Drives the HTTP services (main.py matcher on 5001, classifier on 5002, skill
+analyzer on 5003) at increasing load and reports per endpoint:
+- latency histogram and p50 / p95 / p99 / max
+- error rate and achieved throughput
+- the knee of the latency curve: the last load step before p95 latency
+  blows up (KNEE_FACTOR x the lightest step), errors appear or the service
+  stops keeping up with the offered rate
+
+Two load models:
+- open loop (--rates): Poisson arrivals at a target rate, independent of how
+  fast the service answers; latency is measured from the scheduled send
+  time, so queueing shows up instead of being hidden
+- closed loop (--concurrencies): N workers each sending the next request as
+  soon as the previous one completes
+
+Traffic is either replayed from a jsonl capture or synthesized. A replay
+record looks like
+    {"service": "matcher", "method": "POST", "path": "/match-jobs", "body": {...}}
+Lines without a "path" are not HTTP records and are skipped.
+
+Usage (services started locally first):
+    python -m benchmarks.loadtest --scenario analyze --rates 1,2,5,10,20 --duration 20
+    python -m benchmarks.loadtest --scenario match-jobs,classify --concurrencies 1,2,4,8,16
+    python -m benchmarks.loadtest --replay capture.jsonl --rates 5,10,20 --output load.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+from benchmarks.corpus import generate_cvs, generate_jobs
+
+DEFAULT_TARGETS = {
+    "matcher": "http://localhost:5001",
+    "classifier": "http://localhost:5002",
+    "skills": "http://localhost:5003",
+}
+
+# p95 of a step above KNEE_FACTOR x the lightest step's p95 counts as saturated
+KNEE_FACTOR = 2.0
+KNEE_MAX_ERROR_RATE = 0.01
+KNEE_MIN_THROUGHPUT_RATIO = 0.9
+
+# Ensure UTF-8 stdout
+sys.stdout.reconfigure(encoding="utf-8")
+
+
+# --- Traffic ---------------------------------------------------------------------------
+
+def synthesize(scenarios, count, unique_ratio, seed=42):
+    """
+    Request records for the given scenarios. unique_ratio is the share of
+    requests with fresh texts; the rest reuse a small pool, like users
+    reopening the same pages (this is what exercises the caches).
+    """
+    rng = random.Random(seed)
+    pool_size = max(1, int(count * unique_ratio))
+    cvs = generate_cvs(pool_size, seed=seed)
+    jobs = generate_jobs(max(20, pool_size), seed=seed + 1)
+
+    def pick(texts):
+        return texts[rng.randrange(len(texts))]
+
+    builders = {
+        "match-jobs": lambda: {
+            "service": "matcher", "method": "POST", "path": "/match-jobs",
+            "body": {
+                "cv_text": pick(cvs),
+                "job_descriptions": [{"id": str(i), "description": pick(jobs)} for i in range(20)],
+            },
+        },
+        "classify": lambda: {
+            "service": "classifier", "method": "POST", "path": "/classify",
+            "body": {"cv_text": pick(cvs), "use_groq_analysis": False},
+        },
+        "analyze": lambda: {
+            "service": "skills", "method": "POST", "path": "/analyze",
+            "body": {"cv_text": pick(cvs), "job_desc": pick(jobs)},
+        },
+        "analyze-batch": lambda: {
+            "service": "skills", "method": "POST", "path": "/analyze/batch",
+            "body": {"cv_text": pick(cvs), "job_descs": [pick(jobs) for _ in range(10)]},
+        },
+    }
+    unknown = [s for s in scenarios if s not in builders]
+    if unknown:
+        raise SystemExit(f"Unknown scenario(s): {', '.join(unknown)} (choose from {', '.join(builders)})")
+
+    return [builders[scenarios[i % len(scenarios)]]() for i in range(count)]
+
+
+def load_replay(path):
+    records, skipped = [], 0
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                skipped += 1
+                continue
+            if not isinstance(record, dict) or not record.get("path"):
+                skipped += 1
+                continue
+            records.append(record)
+    return records, skipped
+
+
+def endpoint_of(record):
+    return f"{record.get('method', 'POST').upper()} {record.get('service', '')}{record['path']}"
+
+
+# --- Measurement -----------------------------------------------------------------------
+
+class StepStats:
+    """Latencies and outcomes of one load step, per endpoint"""
+
+    def __init__(self):
+        self.requests = defaultdict(int)
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.status = defaultdict(lambda: defaultdict(int))
+
+    def record(self, endpoint, latency_s, status):
+        """latency_s is None for requests that were never sent"""
+        self.requests[endpoint] += 1
+        if latency_s is not None:
+            self.latencies[endpoint].append(latency_s)
+        self.status[endpoint][str(status)] += 1
+        if not (isinstance(status, int) and 200 <= status < 300):
+            self.errors[endpoint] += 1
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * q
+    lo, hi = math.floor(k), math.ceil(k)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def histogram(sorted_values_ms):
+    """Counts per log-spaced bucket (upper bound in ms, 4 buckets per doubling)"""
+    buckets = defaultdict(int)
+    for value in sorted_values_ms:
+        bound = 2 ** (math.ceil(4 * math.log2(max(value, 0.25))) / 4)
+        buckets[round(bound, 2)] += 1
+    return {str(bound): buckets[bound] for bound in sorted(buckets)}
+
+
+def summarize(stats: StepStats, elapsed_s):
+    out = {}
+    for endpoint, count in stats.requests.items():
+        values = sorted(latency * 1000 for latency in stats.latencies[endpoint])
+        out[endpoint] = {
+            "requests": count,
+            "errors": stats.errors[endpoint],
+            "error_rate": stats.errors[endpoint] / count if count else 0.0,
+            "throughput_rps": (count - stats.errors[endpoint]) / elapsed_s if elapsed_s > 0 else 0.0,
+            "p50_ms": percentile(values, 0.50),
+            "p95_ms": percentile(values, 0.95),
+            "p99_ms": percentile(values, 0.99),
+            "max_ms": values[-1] if values else None,
+            "status": dict(stats.status[endpoint]),
+            "histogram_ms": histogram(values),
+        }
+    return out
+
+
+# --- Load generation -------------------------------------------------------------------
+
+async def send(client, targets, record, stats, scheduled_at):
+    endpoint = endpoint_of(record)
+    base = targets.get(record.get("service"), record.get("base_url", ""))
+    try:
+        response = await client.request(record.get("method", "POST").upper(), base + record["path"], json=record.get("body"))
+        status = response.status_code
+    except httpx.TimeoutException:
+        status = "timeout"
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    stats.record(endpoint, time.perf_counter() - scheduled_at, status)
+
+
+async def open_loop(client, targets, records, rate, duration_s, max_inflight, seed):
+    """Poisson arrivals at `rate` per second for `duration_s`"""
+    rng = random.Random(seed)
+    stats = StepStats()
+    tasks = set()
+    dropped = 0
+    started = time.perf_counter()
+    next_at = started
+    i = 0
+
+    while True:
+        next_at += rng.expovariate(rate)
+        if next_at - started > duration_s:
+            break
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        record = records[i % len(records)]
+        i += 1
+        if len(tasks) >= max_inflight:
+            # Client-side cap reached: count as an error, the service is saturated
+            stats.record(endpoint_of(record), None, "client_overload")
+            dropped += 1
+            continue
+        task = asyncio.create_task(send(client, targets, record, stats, next_at))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    if tasks:
+        await asyncio.gather(*tasks)
+    return stats, time.perf_counter() - started, {"offered_rps": rate, "dropped": dropped}
+
+
+async def closed_loop(client, targets, records, concurrency, duration_s):
+    """`concurrency` workers sending back-to-back requests for `duration_s`"""
+    stats = StepStats()
+    started = time.perf_counter()
+    deadline = started + duration_s
+    counter = iter(range(10 ** 12))
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            record = records[next(counter) % len(records)]
+            await send(client, targets, record, stats, time.perf_counter())
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return stats, time.perf_counter() - started, {"concurrency": concurrency}
+
+
+# --- Knee detection --------------------------------------------------------------------
+
+def find_knee(steps, endpoint):
+    """
+    Last step that still behaves: p95 within KNEE_FACTOR of the lightest step,
+    error rate under KNEE_MAX_ERROR_RATE and (open loop) achieved throughput
+    close to the rate offered to this endpoint. Returns the knee step and why
+    the following step was rejected.
+    """
+    series = [step for step in steps if endpoint in step["endpoints"]]
+    if not series:
+        return None
+
+    base_p95 = series[0]["endpoints"][endpoint]["p95_ms"] or 0.0
+    knee, reason = None, "not reached (all steps healthy)"
+    for step in series:
+        result = step["endpoints"][endpoint]
+        problems = []
+        if result["error_rate"] > KNEE_MAX_ERROR_RATE:
+            problems.append(f"error rate {result['error_rate']:.1%}")
+        if base_p95 and result["p95_ms"] and result["p95_ms"] > KNEE_FACTOR * base_p95:
+            problems.append(f"p95 {result['p95_ms']:.0f} ms > {KNEE_FACTOR:g}x {base_p95:.0f} ms")
+
+        offered = step["load"].get("offered_rps")
+        if offered:
+            # This endpoint's share of the mix
+            total = sum(r["requests"] for r in step["endpoints"].values())
+            endpoint_offered = offered * result["requests"] / total if total else offered
+            if result["throughput_rps"] < KNEE_MIN_THROUGHPUT_RATIO * endpoint_offered:
+                problems.append(f"throughput {result['throughput_rps']:.1f} < offered {endpoint_offered:.1f} rps")
+
+        if problems:
+            reason = f"{_load_label(step['load'])}: " + ", ".join(problems)
+            break
+        knee = {"load": step["load"], "throughput_rps": result["throughput_rps"], "p95_ms": result["p95_ms"]}
+    return {"knee": knee, "saturated_at": reason}
+
+
+# --- Main ------------------------------------------------------------------------------
+
+def _load_label(load):
+    if "offered_rps" in load:
+        return f"{load['offered_rps']:g} rps offered"
+    return f"{load['concurrency']} workers"
+
+
+def _ms(value):
+    return f"{value:8.1f}" if value is not None else "       -"
+
+
+async def run(args):
+    targets = dict(DEFAULT_TARGETS)
+    for item in args.target or []:
+        name, _, url = item.partition("=")
+        targets[name] = url.rstrip("/")
+
+    if args.replay:
+        records, skipped = load_replay(args.replay)
+        print(f"📂 Replaying {len(records)} records from {args.replay} ({skipped} non-HTTP lines skipped)")
+        if not records:
+            raise SystemExit("No replayable records (each line needs a 'path')")
+    else:
+        scenarios = [s.strip() for s in args.scenario.split(",") if s.strip()]
+        records = synthesize(scenarios, args.pool, args.unique_ratio, args.seed)
+        print(f"🧪 Synthesized {len(records)} requests for {', '.join(scenarios)}")
+
+    if args.concurrencies:
+        plan = [("closed", int(c)) for c in args.concurrencies.split(",")]
+    else:
+        plan = [("open", float(r)) for r in args.rates.split(",")]
+
+    limits = httpx.Limits(max_connections=args.max_inflight, max_keepalive_connections=args.max_inflight)
+    steps = []
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        if args.warmup:
+            warm = StepStats()
+            await asyncio.gather(*(send(client, targets, r, warm, time.perf_counter()) for r in records[:args.warmup]))
+
+        for kind, level in plan:
+            print(f"\n🚀 {'Open loop' if kind == 'open' else 'Closed loop'} "
+                  f"{level:g} {'rps' if kind == 'open' else 'workers'} for {args.duration:g}s...")
+            if kind == "open":
+                stats, elapsed, load = await open_loop(client, targets, records, level, args.duration, args.max_inflight, args.seed)
+            else:
+                stats, elapsed, load = await closed_loop(client, targets, records, level, args.duration)
+
+            endpoints = summarize(stats, elapsed)
+            steps.append({"load": load, "elapsed_s": elapsed, "endpoints": endpoints})
+            for endpoint, r in endpoints.items():
+                print(f"   {endpoint:36s} {r['throughput_rps']:7.1f} rps  p50 {_ms(r['p50_ms'])}  "
+                      f"p95 {_ms(r['p95_ms'])}  p99 {_ms(r['p99_ms'])}  max {_ms(r['max_ms'])} ms  "
+                      f"errors {r['error_rate']:.1%}")
+            if args.cooldown:
+                await asyncio.sleep(args.cooldown)
+
+    endpoints = sorted({e for step in steps for e in step["endpoints"]})
+    knees = {endpoint: find_knee(steps, endpoint) for endpoint in endpoints}
+
+    print("\n📈 Knee per endpoint:")
+    for endpoint, result in knees.items():
+        knee = result["knee"]
+        if knee:
+            print(f"   {endpoint:36s} {_load_label(knee['load'])} -> {knee['throughput_rps']:.1f} rps at p95 {knee['p95_ms']:.1f} ms")
+        else:
+            print(f"   {endpoint:36s} saturated from the first step")
+        print(f"   {'':36s} next step: {result['saturated_at']}")
+
+    report = {"targets": targets, "records": len(records), "duration_s": args.duration, "steps": steps, "knees": knees}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📝 Report written to {args.output}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the local ML services")
+    parser.add_argument("--replay", default=None, help="jsonl capture to replay (lines need a 'path')")
+    parser.add_argument("--scenario", default="analyze", help="synthetic traffic: match-jobs, classify, analyze, analyze-batch (comma separated mix)")
+    parser.add_argument("--pool", type=int, default=500, help="synthetic requests generated (cycled)")
+    parser.add_argument("--unique-ratio", type=float, default=0.5, help="share of distinct texts in synthetic traffic")
+    parser.add_argument("--rates", default="1,2,5,10,20", help="open loop: target requests/s per step")
+    parser.add_argument("--concurrencies", default=None, help="closed loop: workers per step (overrides --rates)")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds per step")
+    parser.add_argument("--warmup", type=int, default=5, help="requests sent before the first step")
+    parser.add_argument("--cooldown", type=float, default=2.0, help="pause between steps (s)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="request timeout (s)")
+    parser.add_argument("--max-inflight", type=int, default=256, help="client-side cap on open requests")
+    parser.add_argument("--target", action="append", help="override a service URL, e.g. skills=http://localhost:6003")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="write the JSON report here")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
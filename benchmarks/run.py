@@ -0,0 +1,127 @@
+"""
+Run the benchmark suite and compare against a stored baseline
+
+Usage (from the repository root):
+    python -m benchmarks.run                              # quick run: 10 and 1k items
+    python -m benchmarks.run --scales 10,1000,10000,100000 --full   # full sweep
+    python -m benchmarks.run --filter classifier. --output results.json
+    python -m benchmarks.run --save-baseline              # store benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json --threshold 0.2
+
+Benchmarks with a max_scale (model inference) are capped unless --full is
+given. With a baseline, the run exits with status 1 when any benchmark got
+slower than baseline by more than --threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from benchmarks import suites  # noqa: F401  (registers the benchmarks)
+from benchmarks.harness import REGISTRY, compare, time_benchmark
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Ensure UTF-8 stdout
+sys.stdout.reconfigure(encoding="utf-8")
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=suites.REPO_ROOT,
+            capture_output=True, text=True, timeout=10,
+        ).stdout.strip() or None
+    except Exception:
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "git_commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark matching, classification and skill analysis")
+    parser.add_argument("--scales", default="10,1000", help="comma separated item counts")
+    parser.add_argument("--filter", default="", help="only benchmarks whose name contains this")
+    parser.add_argument("--full", action="store_true", help="ignore per-benchmark scale caps")
+    parser.add_argument("--repeats", type=int, default=None, help="timed runs per benchmark (default by scale)")
+    parser.add_argument("--output", default=None, help="write results JSON here")
+    parser.add_argument("--baseline", default=None, help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help=f"write results to {DEFAULT_BASELINE}")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown vs baseline (0.2 = 20%%)")
+    parser.add_argument("--list", action="store_true", help="list benchmarks and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, bench in REGISTRY.items():
+            cap = f" (max {bench.max_scale})" if bench.max_scale else ""
+            print(f"{name:36s} per {bench.unit}{cap}  {bench.description}")
+        return 0
+
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+    results = {"environment": environment(), "scales": scales, "benchmarks": {}}
+
+    for name, bench in REGISTRY.items():
+        if args.filter and args.filter not in name:
+            continue
+        results["benchmarks"][name] = {}
+        for scale in scales:
+            if bench.max_scale and scale > bench.max_scale and not args.full:
+                results["benchmarks"][name][str(scale)] = {"status": "skipped", "reason": f"scale capped at {bench.max_scale}"}
+                continue
+
+            result = time_benchmark(bench, scale, args.repeats)
+            result["unit"] = bench.unit
+            results["benchmarks"][name][str(scale)] = result
+
+            if result["status"] == "ok":
+                print(f"⏱️ {name:36s} {scale:>7d} {bench.unit}s  "
+                      f"median {result['median_s'] * 1000:10.2f} ms  "
+                      f"{result['per_item_us']:10.1f} µs/{bench.unit}")
+            else:
+                print(f"⏭️ {name:36s} {scale:>7d} {bench.unit}s  skipped: {result['reason']}")
+                # Same reason at every scale (dependency or model missing)
+                if not result["reason"].startswith("scale"):
+                    for rest in scales[scales.index(scale) + 1:]:
+                        results["benchmarks"][name][str(rest)] = dict(result)
+                    break
+
+    exit_code = 0
+    baseline_path = args.baseline or (DEFAULT_BASELINE if os.path.exists(DEFAULT_BASELINE) and not args.save_baseline else None)
+    if baseline_path:
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        results["baseline"] = {"path": baseline_path, "threshold": args.threshold, "regressions": regressions}
+        if regressions:
+            exit_code = 1
+            print(f"\n❌ {len(regressions)} regression(s) vs {baseline_path}:")
+            for r in regressions:
+                print(f"   {r['benchmark']} @ {r['scale']}: {r['baseline_s'] * 1000:.2f} ms -> "
+                      f"{r['current_s'] * 1000:.2f} ms (x{r['ratio']})")
+        else:
+            print(f"\n✅ No regressions vs {baseline_path} (threshold {args.threshold:.0%})")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"📝 Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(DEFAULT_BASELINE, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"📝 Baseline written to {DEFAULT_BASELINE}")
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""
+Benchmarks of the matching, classification and skill-analysis hot paths
+
+Each setup imports its module lazily, so a missing dependency (torch,
+sentence-transformers, TensorFlow, Flask) or model file only skips the
+benchmarks that need it.
+"""
+
+import contextlib
+import importlib
+import importlib.util
+import io
+import json
+import os
+import sys
+
+from benchmarks.corpus import SKILLS, generate_cvs, generate_jobs
+from benchmarks.harness import BenchmarkSkipped, benchmark
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ML_SERVICE_DIR = os.path.join(REPO_ROOT, "ml-service")
+BACKEND_SCRIPTS_DIR = os.path.join(REPO_ROOT, "Backend", "scripts")
+
+if ML_SERVICE_DIR not in sys.path:
+    sys.path.insert(0, ML_SERVICE_DIR)
+
+_modules = {}
+
+
+@contextlib.contextmanager
+def _quiet():
+    """Services print per request; keep that out of the timings and the report"""
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        yield
+
+
+@contextlib.contextmanager
+def _in_dir(path):
+    # Model paths in the services are relative to ml-service
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def _import(name):
+    if name not in _modules:
+        with _in_dir(ML_SERVICE_DIR):
+            _modules[name] = importlib.import_module(name)
+    return _modules[name]
+
+
+def _loaded(name, loader, attr="model"):
+    """Import a service module and run its loader once; skip when the model is not available"""
+    module = _import(name)
+    key = f"{name}:loaded"
+    if key not in _modules:
+        try:
+            with _quiet(), _in_dir(ML_SERVICE_DIR):
+                loader(module)
+        except Exception as e:
+            raise BenchmarkSkipped(f"{name}: {e}")
+        _modules[key] = True
+    if getattr(module, attr, None) is None:
+        raise BenchmarkSkipped(f"{name}: model not available")
+    return module
+
+
+# --- Matching (ml-service/cv_job_matching_model.py) ---------------------------------
+
+def _matcher():
+    module = _import("cv_job_matching_model")
+    if "matcher" not in _modules:
+        try:
+            with _quiet():
+                _modules["matcher"] = module.CVJobMatcher()
+        except Exception as e:
+            raise BenchmarkSkipped(f"sentence-transformers model not available: {e}")
+    return _modules["matcher"]
+
+
+@benchmark("matching.find_top_matches", unit="job", max_scale=10000)
+def bench_find_top_matches(scale):
+    """One CV against `scale` jobs (embedding + hybrid scoring + ranking)"""
+    matcher = _matcher()
+    cv = generate_cvs(1)[0]
+    jobs = generate_jobs(scale)
+    return lambda: matcher.find_top_matches(cv, jobs, top_k=10)
+
+
+@benchmark("matching.keyword_match", unit="pair")
+def bench_keyword_match(scale):
+    """_calculate_keyword_match over `scale` CV/job pairs"""
+    module = _import("cv_job_matching_model")
+    # The keyword score does not use any model state
+    matcher = module.CVJobMatcher.__new__(module.CVJobMatcher)
+    cvs = generate_cvs(min(scale, 1000))
+    jobs = generate_jobs(min(scale, 1000))
+    pairs = [(cvs[i % len(cvs)], jobs[(i * 7) % len(jobs)]) for i in range(scale)]
+
+    def run():
+        for cv, job in pairs:
+            matcher._calculate_keyword_match(cv, job)
+    return run
+
+
+# --- Classifiers -----------------------------------------------------------------------
+
+def _each_cv(scale, fn):
+    cvs = generate_cvs(min(scale, 1000))
+    texts = [cvs[i % len(cvs)] for i in range(scale)]
+
+    def run():
+        with _quiet():
+            for text in texts:
+                fn(text)
+    return run
+
+
+@benchmark("classifier.keras.features", unit="cv")
+def bench_keras_features(scale):
+    """cv_classifier_service.extract_text_features (8000 character features)"""
+    module = _import("cv_classifier_service")
+    return _each_cv(scale, module.extract_text_features)
+
+
+@benchmark("classifier.keras.predict", unit="cv", max_scale=10000)
+def bench_keras_predict(scale):
+    """cv_classifier_service.classify_with_keras_model (features + model.predict)"""
+    module = _loaded("cv_classifier_service", lambda m: m.load_model())
+    return _each_cv(scale, module.classify_with_keras_model)
+
+
+@benchmark("classifier.keras.keywords", unit="cv")
+def bench_keras_keywords(scale):
+    """cv_classifier_service.classify_with_keywords"""
+    module = _import("cv_classifier_service")
+    return _each_cv(scale, module.classify_with_keywords)
+
+
+@benchmark("classifier.lite.keywords", unit="cv")
+def bench_lite_keywords(scale):
+    """cv_classifier_service_lite.classify_cv_keywords"""
+    module = _import("cv_classifier_service_lite")
+    return _each_cv(scale, module.classify_cv_keywords)
+
+
+@benchmark("classifier.hybrid.keywords", unit="cv")
+def bench_hybrid_keywords(scale):
+    """cv_classifier_hybrid.classify_with_keywords (weighted patterns)"""
+    module = _import("cv_classifier_hybrid")
+    return _each_cv(scale, module.classify_with_keywords)
+
+
+@benchmark("classifier.real_model.features", unit="cv")
+def bench_real_model_features(scale):
+    """cv_classifier_real_model tokenization + padding to 3000"""
+    module = _loaded("cv_classifier_real_model", lambda m: m.load_components(), attr="tokenizer")
+    if module.fast_tokenizer is not None:
+        return _each_cv(scale, lambda text: module.fast_tokenizer.texts_to_padded([text], maxlen=3000, padding="post"))
+    return _each_cv(scale, lambda text: module.pad_sequences(module.tokenizer.texts_to_sequences([text]), maxlen=3000, padding="post"))
+
+
+@benchmark("classifier.real_model.predict", unit="cv", max_scale=10000)
+def bench_real_model_predict(scale):
+    """cv_classifier_real_model.classify_cv (tokenize + model.predict + top 5)"""
+    module = _loaded("cv_classifier_real_model", lambda m: m.load_components())
+    return _each_cv(scale, module.classify_cv)
+
+
+# --- Skill analysis --------------------------------------------------------------------
+
+def _skills_list():
+    path = os.path.join(REPO_ROOT, "last-one", "skills_list.json")
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    # Same order of magnitude as the trained list
+    return SKILLS + [f"{skill} {suffix}" for skill in SKILLS for suffix in ("framework", "tools", "cloud")]
+
+
+@benchmark("skills.extract_skills_from_text", unit="text")
+def bench_extract_skills(scale):
+    """skill_analyzer_service.extract_skills_from_text over `scale` CV texts"""
+    module = _import("skill_analyzer_service")
+    skills = _skills_list()
+    module.skill_lexicon = module.SkillLexicon(skills)
+    return _each_cv(scale, lambda text: module.extract_skills_from_text(text, skills))
+
+
+# --- Backend/scripts/match_cvs_to_job.py --------------------------------------------
+
+@benchmark("backend.match_cvs_to_job", unit="cv")
+def bench_match_cvs_to_job(scale):
+    """Full script run (stdin JSON -> stdout JSON) matching `scale` CVs to one job"""
+    path = os.path.join(BACKEND_SCRIPTS_DIR, "match_cvs_to_job.py")
+    spec = importlib.util.spec_from_file_location("match_cvs_to_job", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    cvs = generate_cvs(min(scale, 1000))
+    payload = json.dumps({
+        "job_description": generate_jobs(1)[0],
+        "cv_texts": [cvs[i % len(cvs)] for i in range(scale)],
+        "top_k": 10,
+    })
+
+    def run():
+        stdin = sys.stdin
+        sys.stdin = io.StringIO(payload)
+        try:
+            with _quiet():
+                module.main()
+        finally:
+            sys.stdin = stdin
+    return run
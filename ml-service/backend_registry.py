@@ -0,0 +1,249 @@
+"""
+Backend Registry - lazily loaded, shared model backends for one server process
+
+Each backend wraps one of the existing service modules (keras, real model,
+hybrid, lite, skill analyzer). The module is imported and its models are
+loaded on first use only. When MODEL_MEMORY_CAP_MB is set, the least
+recently used idle backends are unloaded to stay under the cap.
+"""
+
+import asyncio
+import importlib
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, Iterable, Optional
+
+import tf_runtime
+from service_logging import get_logger
+
+logger = get_logger("backend_registry")
+
+
+class Backend:
+    """
+    A lazily loaded service module.
+
+    loader(module) loads the models, unloader(module) drops them again and
+    model_globals names the module globals holding Keras models, used to
+    estimate memory from the parameter count. Models without a parameter
+    count (SavedModel, TFLite interpreters) are estimated from the size of
+    the files returned by artifact_files(module).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        module_name: str,
+        kind: str,
+        loader: Optional[Callable] = None,
+        unloader: Optional[Callable] = None,
+        model_globals: Iterable[str] = (),
+        artifact_files: Optional[Callable] = None,
+        description: str = "",
+    ):
+        self.name = name
+        self.module_name = module_name
+        self.kind = kind
+        self.loader = loader
+        self.unloader = unloader
+        self.model_globals = tuple(model_globals)
+        self.artifact_files = artifact_files
+        self.description = description
+
+        self.module = None
+        self.loaded = False
+        self.load_seconds = None
+        self.last_used = 0.0
+        self.in_use = 0
+        self._lock = asyncio.Lock()
+
+    def _load(self):
+        started = time.perf_counter()
+        self.module = importlib.import_module(self.module_name)
+        if self.loader is not None:
+            self.loader(self.module)
+        self.load_seconds = time.perf_counter() - started
+
+    def _unload(self):
+        if self.module is not None and self.unloader is not None:
+            self.unloader(self.module)
+
+    async def ensure_loaded(self):
+        if self.loaded:
+            return
+        async with self._lock:
+            if self.loaded:
+                return
+            logger.info("Loading backend '%s' (%s)", self.name, self.module_name)
+            await tf_runtime.run_blocking(self._load)
+            self.loaded = True
+            logger.info("Backend '%s' ready in %.2fs", self.name, self.load_seconds)
+
+    def estimated_bytes(self) -> int:
+        """Weights of the Keras models held by the module (float32), else the artifact size"""
+        if not self.loaded or self.module is None:
+            return 0
+        total = 0
+        uncounted = False
+        for attr in self.model_globals:
+            model = getattr(self.module, attr, None)
+            if model is not None and hasattr(model, "count_params"):
+                total += int(model.count_params()) * 4
+            elif model is not None:
+                uncounted = True
+        if uncounted and self.artifact_files is not None:
+            total += sum(_path_bytes(path) for path in self.artifact_files(self.module))
+        return total
+
+    def info(self) -> dict:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "module": self.module_name,
+            "description": self.description,
+            "loaded": self.loaded,
+            "in_use": self.in_use,
+            "load_seconds": round(self.load_seconds, 3) if self.load_seconds is not None else None,
+            "estimated_mb": round(self.estimated_bytes() / (1024 * 1024), 1),
+            "last_used": self.last_used or None,
+        }
+
+
+class BackendRegistry:
+    def __init__(self, memory_cap_mb: Optional[float] = None):
+        self.backends: Dict[str, Backend] = {}
+        self.memory_cap_bytes = int(memory_cap_mb * 1024 * 1024) if memory_cap_mb else None
+        self.evictions = 0
+
+    def register(self, backend: Backend):
+        self.backends[backend.name] = backend
+
+    def names(self, kind: Optional[str] = None):
+        return [name for name, b in self.backends.items() if kind is None or b.kind == kind]
+
+    @asynccontextmanager
+    async def use(self, name: str):
+        """Load (if needed) and pin a backend while a request uses it"""
+        backend = self.backends.get(name)
+        if backend is None:
+            raise KeyError(name)
+
+        backend.in_use += 1
+        try:
+            await backend.ensure_loaded()
+            backend.last_used = time.time()
+            self._enforce_memory_cap(keep=name)
+            yield backend.module
+        finally:
+            backend.in_use -= 1
+            backend.last_used = time.time()
+
+    def unload(self, name: str) -> bool:
+        backend = self.backends[name]
+        if not backend.loaded or backend.in_use:
+            return False
+        backend._unload()
+        backend.loaded = False
+        logger.info("Unloaded backend '%s'", name)
+        return True
+
+    def total_bytes(self) -> int:
+        return sum(b.estimated_bytes() for b in self.backends.values())
+
+    def _enforce_memory_cap(self, keep: str):
+        if not self.memory_cap_bytes:
+            return
+        while self.total_bytes() > self.memory_cap_bytes:
+            candidates = [
+                b for b in self.backends.values()
+                if b.loaded and not b.in_use and b.name != keep and b.estimated_bytes() > 0
+            ]
+            if not candidates:
+                return
+            victim = min(candidates, key=lambda b: b.last_used)
+            if self.unload(victim.name):
+                self.evictions += 1
+
+    def info(self) -> dict:
+        return {
+            "memory_cap_mb": self.memory_cap_bytes / (1024 * 1024) if self.memory_cap_bytes else None,
+            "estimated_mb": round(self.total_bytes() / (1024 * 1024), 1),
+            "evictions": self.evictions,
+            "backends": [b.info() for b in self.backends.values()],
+        }
+
+
+def _path_bytes(path) -> int:
+    """Size of a file, or of all files below a directory"""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+def _skills_artifact_files(module):
+    """Files of the prebuilt artifact the skill analyzer is serving"""
+    import skill_model_runtime
+
+    artifact_dir = module.get_artifact_dir()
+    manifest = skill_model_runtime.read_manifest(artifact_dir)
+    formats = manifest.get("formats", {}) if manifest else {}
+    if module.model_backend == "savedmodel" and "savedmodel" in formats:
+        return [os.path.join(artifact_dir, formats["savedmodel"]["path"])]
+    if module.model_backend == "tflite" and "tflite" in formats:
+        return [os.path.join(artifact_dir, name) for name in formats["tflite"]["files"].values()]
+    return []
+
+
+def _clear(*attrs):
+    def unloader(module):
+        for attr in attrs:
+            setattr(module, attr, None)
+    return unloader
+
+
+def _load_keras_service(module):
+    module.load_model()
+    module.initialize_groq()
+
+
+def _load_hybrid_service(module):
+    from llm_gateway import get_gateway
+    module.llm = get_gateway()
+
+
+def build_default_registry() -> BackendRegistry:
+    """All classification and skill backends of ml-service"""
+    cap = os.getenv("MODEL_MEMORY_CAP_MB")
+    registry = BackendRegistry(memory_cap_mb=float(cap) if cap else None)
+
+    registry.register(Backend(
+        "keras", "cv_classifier_service", "classifier",
+        loader=_load_keras_service, unloader=_clear("model"), model_globals=("model",),
+        description="cv_classifier_merged.keras + keyword/LLM cascade",
+    ))
+    registry.register(Backend(
+        "real_model", "cv_classifier_real_model", "classifier",
+        loader=lambda m: m.load_components(), unloader=_clear("model", "tokenizer", "fast_tokenizer"),
+        model_globals=("model",),
+        description="mlp_cv_model.h5 with Keras tokenizer (108 categories)",
+    ))
+    registry.register(Backend(
+        "hybrid", "cv_classifier_hybrid", "classifier",
+        loader=_load_hybrid_service,
+        description="Weighted keywords + Groq AI",
+    ))
+    registry.register(Backend(
+        "lite", "cv_classifier_service_lite", "classifier",
+        description="Keyword matching only (no TensorFlow)",
+    ))
+    registry.register(Backend(
+        "skills", "skill_analyzer_service", "skills",
+        loader=lambda m: m.load_model(), unloader=lambda m: m.unload_model(), model_globals=("model",),
+        artifact_files=_skills_artifact_files,
+        description="BiLSTM skill-gap analyzer",
+    ))
+    return registry
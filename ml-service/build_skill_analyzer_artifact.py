@@ -0,0 +1,296 @@
+"""
+Build Skill Analyzer Artifact - offline export of the skill-gap model
+
+Rebuilds the Keras model from last-one/cv_job_matcher_model.h5 once and
+exports its three submodels (cv_encoder, job_encoder, skill_head) as
+- a SavedModel (one object with the three functions)
+- TFLite flatbuffers, optionally with dynamic-range int8 quantization
+
+skill_analyzer_service then loads the artifact with SKILL_MODEL_BACKEND=auto
+(default), savedmodel or tflite, without re-declaring the architecture.
+
+The build also writes report.json next to the artifact:
+- parity of every exported backend against the .h5 model on sample pairs
+  (max/mean abs difference, HIGH/MEDIUM/LOW priority agreement, top-10 overlap);
+  the result is also recorded in manifest.json, and auto only serves a
+  quantized TFLite whose parity passed
+- cold startup time of the service per backend (fresh process)
+- per-pair and batched latency per backend
+
+Usage:
+    python build_skill_analyzer_artifact.py
+    python build_skill_analyzer_artifact.py --format tflite --quantize
+    python build_skill_analyzer_artifact.py --texts sample_texts.txt --pairs 500
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+import skill_analyzer_service as service
+import skill_model_runtime
+
+# Ensure UTF-8 stdout
+sys.stdout.reconfigure(encoding='utf-8')
+
+# Minimum parity against the .h5 model for a backend to count as passing
+PARITY_MIN_PRIORITY_AGREEMENT = 0.99
+PARITY_MIN_TOP10_OVERLAP = 0.95
+
+
+def export_savedmodel(cv_model, job_model, head_model, path):
+    import tensorflow as tf
+
+    module = tf.Module()
+    module.cv_model = cv_model
+    module.job_model = job_model
+    module.head_model = head_model
+
+    tokens = tf.TensorSpec([None, service.MAX_LEN], tf.int32, name='tokens')
+    pair = tf.TensorSpec([None, head_model.input_shape[-1]], tf.float32, name='pair_encoding')
+    module.cv_encoder = tf.function(lambda x: cv_model(x, training=False), input_signature=[tokens])
+    module.job_encoder = tf.function(lambda x: job_model(x, training=False), input_signature=[tokens])
+    module.skill_head = tf.function(lambda x: head_model(x, training=False), input_signature=[pair])
+
+    tf.saved_model.save(module, path)
+
+
+def convert_tflite(keras_model, quantize):
+    """Flatbuffer of one submodel; falls back to Select TF ops if the LSTM does not lower"""
+    import tensorflow as tf
+
+    def converter():
+        conv = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+        if quantize:
+            conv.optimizations = [tf.lite.Optimize.DEFAULT]
+        return conv
+
+    try:
+        return converter().convert(), False
+    except Exception as e:
+        print(f"⚠️ {keras_model.name}: builtin ops only failed ({e}), retrying with Select TF ops")
+
+    conv = converter()
+    conv.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS, tf.lite.OpsSet.SELECT_TF_OPS]
+    conv._experimental_lower_tensor_list_ops = False
+    return conv.convert(), True
+
+
+def sample_pairs(count, texts_path=None, seed=42):
+    """CV/job text pairs for the parity check: from a file (one text per line) or synthetic"""
+    rng = random.Random(seed)
+
+    if texts_path:
+        with open(texts_path, 'r', encoding='utf-8') as f:
+            texts = [line.strip() for line in f if line.strip()]
+        return [(rng.choice(texts), rng.choice(texts)) for _ in range(count)]
+
+    # Frequent tokenizer words mixed with skills so every skill column is exercised
+    vocab = [w for w, i in service.tokenizer.word_index.items() if i < service.MAX_WORDS]
+    skills = service.skills_list
+
+    def text():
+        words = rng.sample(vocab, min(len(vocab), rng.randint(20, 160)))
+        words += rng.sample(skills, min(len(skills), rng.randint(1, 15)))
+        rng.shuffle(words)
+        return ' '.join(words)
+
+    return [(text(), text()) for _ in range(count)]
+
+
+def priority_bucket(probabilities):
+    return np.digitize(probabilities, [0.4, 0.7])
+
+
+def run_pairs(submodels, cv_padded, job_padded):
+    cv_encoder, job_encoder, skill_head = submodels
+    pair = np.concatenate([cv_encoder(cv_padded), job_encoder(job_padded)], axis=1)
+    return skill_head(pair)
+
+
+def parity(reference, candidate):
+    top_ref = np.argsort(-reference, axis=1)[:, :10]
+    top_cand = np.argsort(-candidate, axis=1)[:, :10]
+    overlap = [len(set(a) & set(b)) / 10 for a, b in zip(top_ref, top_cand)]
+    diff = np.abs(reference - candidate)
+    return {
+        'max_abs_diff': float(diff.max()),
+        'mean_abs_diff': float(diff.mean()),
+        'priority_agreement': float((priority_bucket(reference) == priority_bucket(candidate)).mean()),
+        'top10_overlap': float(np.mean(overlap)),
+    }
+
+
+def parity_passed(result):
+    # Recorded in the manifest: auto serves a quantized TFLite only if this passed
+    return (result['priority_agreement'] >= PARITY_MIN_PRIORITY_AGREEMENT
+            and result['top10_overlap'] >= PARITY_MIN_TOP10_OVERLAP)
+
+
+def latency(submodels, cv_padded, job_padded, repeats=50, batch_size=10):
+    single = []
+    for i in range(repeats):
+        row = i % len(cv_padded)
+        started = time.perf_counter()
+        run_pairs(submodels, cv_padded[row:row + 1], job_padded[row:row + 1])
+        single.append((time.perf_counter() - started) * 1000)
+
+    batched = []
+    for i in range(max(1, repeats // 5)):
+        started = time.perf_counter()
+        run_pairs(submodels, cv_padded[:batch_size], job_padded[:batch_size])
+        batched.append((time.perf_counter() - started) * 1000)
+
+    return {
+        'pair_p50_ms': round(float(np.percentile(single, 50)), 3),
+        'pair_p95_ms': round(float(np.percentile(single, 95)), 3),
+        f'batch{batch_size}_p50_ms': round(float(np.percentile(batched, 50)), 3),
+    }
+
+
+STARTUP_PROBE = """
+import json, time
+started = time.perf_counter()
+import skill_analyzer_service as s
+s.load_artifacts()
+s.build_model(backend={backend!r})
+s.analyze_cv_job_match('python sql docker', 'python kubernetes aws')
+print(json.dumps({{'startup_s': time.perf_counter() - started}}))
+"""
+
+
+def measure_startup(backend, artifact_dir):
+    """Seconds from a cold interpreter to the first answered pair"""
+    env = dict(os.environ, SKILL_MODEL_ARTIFACT=artifact_dir)
+    result = subprocess.run(
+        [sys.executable, '-c', STARTUP_PROBE.format(backend=backend)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env, capture_output=True, text=True, encoding='utf-8',
+    )
+    if result.returncode != 0:
+        return {'error': result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'failed'}
+    return {'startup_s': round(json.loads(result.stdout.strip().splitlines()[-1])['startup_s'], 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the skill-analyzer model as SavedModel / TFLite')
+    parser.add_argument('--output', default=None, help='artifact directory (default: last-one/skill_analyzer_artifact)')
+    parser.add_argument('--format', choices=['savedmodel', 'tflite', 'both'], default='both')
+    parser.add_argument('--quantize', action='store_true', help='dynamic-range int8 weights for TFLite')
+    parser.add_argument('--pairs', type=int, default=200, help='sample pairs for the parity check')
+    parser.add_argument('--texts', default=None, help='file with one CV/job text per line for the parity check')
+    parser.add_argument('--skip-startup', action='store_true', help='do not measure cold startup')
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output or os.path.join(service.get_model_dir(), skill_model_runtime.ARTIFACT_DIRNAME))
+
+    print("=" * 80)
+    print("🔧 Building skill-analyzer artifact")
+    print("=" * 80)
+
+    service.load_artifacts()
+    built, cv_model, job_model, head_model = service.build_keras_model()
+    weights_path = os.path.join(service.get_model_dir(), 'cv_job_matcher_model.h5')
+
+    if os.path.exists(output):
+        shutil.rmtree(output)
+    os.makedirs(output)
+
+    import tensorflow as tf
+
+    manifest = {
+        'model_version': skill_model_runtime.file_fingerprint(weights_path),
+        'source': os.path.basename(weights_path),
+        'max_len': service.MAX_LEN,
+        'max_words': service.MAX_WORDS,
+        'skills_count': len(service.skills_list),
+        'tensorflow': tf.__version__,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'formats': {},
+    }
+
+    if args.format in ('savedmodel', 'both'):
+        export_savedmodel(cv_model, job_model, head_model, os.path.join(output, 'saved_model'))
+        manifest['formats']['savedmodel'] = {'path': 'saved_model'}
+        print("✅ SavedModel exported")
+
+    if args.format in ('tflite', 'both'):
+        files = {}
+        select_tf_ops = False
+        for name, keras_model in zip(skill_model_runtime.SUBMODELS, (cv_model, job_model, head_model)):
+            flatbuffer, needs_select = convert_tflite(keras_model, args.quantize)
+            select_tf_ops = select_tf_ops or needs_select
+            files[name] = f'{name}.tflite'
+            with open(os.path.join(output, files[name]), 'wb') as f:
+                f.write(flatbuffer)
+            print(f"✅ {files[name]} ({len(flatbuffer) / 1024:.0f} KB)")
+        manifest['formats']['tflite'] = {'files': files, 'quantized': args.quantize, 'select_tf_ops': select_tf_ops}
+
+    with open(os.path.join(output, skill_model_runtime.MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    # Parity and latency against the .h5 model
+    print("\n📊 Checking parity and latency...")
+    pairs = sample_pairs(args.pairs, args.texts)
+    cv_padded = service.fast_tokenizer.texts_to_padded([c for c, _ in pairs], service.MAX_LEN, padding='post', truncating='post')
+    job_padded = service.fast_tokenizer.texts_to_padded([j for _, j in pairs], service.MAX_LEN, padding='post', truncating='post')
+
+    keras_submodels = tuple(skill_model_runtime.KerasSubmodel(m) for m in (cv_model, job_model, head_model))
+    reference = built.predict([cv_padded, job_padded], verbose=0)
+
+    report = {
+        'manifest': manifest,
+        'pairs': len(pairs),
+        'h5_size_kb': round(os.path.getsize(weights_path) / 1024, 1),
+        'backends': {
+            'keras': {
+                'parity': parity(reference, run_pairs(keras_submodels, cv_padded, job_padded)),
+                'latency': latency(keras_submodels, cv_padded, job_padded),
+            }
+        },
+    }
+
+    loaders = {
+        'savedmodel': lambda: skill_model_runtime.load_savedmodel(output, manifest)[:3],
+        'tflite': lambda: skill_model_runtime.load_tflite(output, manifest),
+    }
+    for backend in manifest['formats']:
+        submodels = loaders[backend]()
+        result = parity(reference, run_pairs(submodels, cv_padded, job_padded))
+        report['backends'][backend] = {
+            'parity': result,
+            'latency': latency(submodels, cv_padded, job_padded),
+        }
+        manifest['formats'][backend]['parity'] = dict(result, passed=parity_passed(result), pairs=len(pairs))
+        if not manifest['formats'][backend]['parity']['passed']:
+            print(f"⚠️ {backend} parity below threshold")
+
+    with open(os.path.join(output, skill_model_runtime.MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    if 'tflite' in manifest['formats']:
+        size = sum(os.path.getsize(os.path.join(output, f)) for f in manifest['formats']['tflite']['files'].values())
+        report['backends']['tflite']['size_kb'] = round(size / 1024, 1)
+
+    if not args.skip_startup:
+        print("⏱️ Measuring cold startup per backend...")
+        for backend in report['backends']:
+            report['backends'][backend]['startup'] = measure_startup(backend, output)
+
+    with open(os.path.join(output, 'report.json'), 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print(json.dumps(report['backends'], indent=2))
+    print("=" * 80)
+    print(f"✅ Artifact written to {output}")
+    print("=" * 80)
+
+
+if __name__ == '__main__':
+    main()
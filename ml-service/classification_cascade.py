@@ -0,0 +1,315 @@
+"""
+Classification Cascade - confidence-gated escalation between classifiers
+
+Stages run in order from cheapest to most expensive (keyword scorer ->
+Keras/TF-IDF model -> LLM). A stage answers the request when its
+confidence reaches the stage threshold, otherwise the request escalates
+to the next stage. Each stage has a latency budget and per-stage counters
+(hit rate, escalations, latency percentiles, cost) are kept so thresholds
+can be tuned from real traffic.
+
+Thresholds, budgets, order and on/off switches can be overridden with the
+CASCADE_CONFIG environment variable (path to a JSON file or inline JSON),
+with one section per service so services in the same process are tuned
+separately:
+
+    {"keras": {"order": ["keyword", "keras", "llm"],
+               "fallback_stage": "keyword",
+               "stages": {"keyword": {"threshold": 0.6, "latency_budget_ms": 20},
+                          "llm": {"enabled": false}}},
+     "hybrid": {"stages": {"llm": {"threshold": 0.7}}}}
+"""
+
+import asyncio
+import inspect
+import json
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import tf_runtime
+from service_logging import get_logger
+
+logger = get_logger("cascade")
+
+
+@dataclass
+class CascadeStage:
+    """
+    One classifier in the cascade.
+
+    classify(text, context) returns a dict with at least "job_title" and
+    "confidence" (0-1), or None when the stage cannot answer. It may be a
+    plain function or a coroutine function. Blocking functions (model
+    inference) should set run_in_thread so the event loop stays free and
+    the latency budget can be enforced.
+    """
+    name: str
+    classify: Callable[[str, dict], Any]
+    threshold: float
+    latency_budget_ms: Optional[float] = None
+    cost: float = 0.0
+    run_in_thread: bool = False
+    enabled: bool = True
+
+
+@dataclass
+class CascadeResult:
+    job_title: str
+    confidence: float
+    stage: Optional[str]
+    method: str
+    results: Dict[str, dict] = field(default_factory=dict)
+    trace: List[dict] = field(default_factory=list)
+    latency_ms: float = 0.0
+
+
+class _LatencyWindow:
+    """Rolling window of latency samples for percentile reporting"""
+
+    def __init__(self, size: int = 4096):
+        self.samples = deque(maxlen=size)
+
+    def add(self, value_ms: float):
+        self.samples.append(value_ms)
+
+    def percentiles(self) -> dict:
+        if not self.samples:
+            return {"p50": None, "p95": None, "p99": None, "max": None}
+        ordered = sorted(self.samples)
+        last = len(ordered) - 1
+
+        def pick(q):
+            return round(ordered[min(last, int(round(q * last)))], 3)
+
+        return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99), "max": round(ordered[-1], 3)}
+
+
+class _StageStats:
+    def __init__(self):
+        self.calls = 0
+        self.accepted = 0
+        self.escalated = 0
+        self.no_answer = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.over_budget = 0
+        self.skipped = 0
+        self.cost = 0.0
+        self.latency = _LatencyWindow()
+
+    def export(self) -> dict:
+        return {
+            "calls": self.calls,
+            "accepted": self.accepted,
+            "escalated": self.escalated,
+            "no_answer": self.no_answer,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "over_budget": self.over_budget,
+            "skipped": self.skipped,
+            "hit_rate": round(self.accepted / self.calls, 4) if self.calls else None,
+            "total_cost": round(self.cost, 4),
+            "latency_ms": self.latency.percentiles(),
+        }
+
+
+class ClassificationCascade:
+    """
+    Runs CascadeStage objects in order and records per-stage statistics.
+
+    When no stage reaches its threshold the answer comes from fallback_stage
+    if it produced a result, otherwise from the most confident stage.
+    """
+
+    def __init__(
+        self,
+        stages: Iterable[CascadeStage],
+        config: Optional[dict] = None,
+        fallback_stage: Optional[str] = None,
+    ):
+        stages = {stage.name: stage for stage in stages}
+        config = config or {}
+
+        for name, overrides in config.get("stages", {}).items():
+            stage = stages.get(name)
+            if stage is None:
+                logger.warning("Cascade config refers to unknown stage '%s'", name)
+                continue
+            for key in ("threshold", "latency_budget_ms", "cost", "enabled", "run_in_thread"):
+                if key in overrides:
+                    setattr(stage, key, overrides[key])
+
+        order = config.get("order") or list(stages)
+        self.stages = [stages[name] for name in order if name in stages]
+        self.fallback_stage = config.get("fallback_stage", fallback_stage)
+
+        self._lock = threading.Lock()
+        self._stats = {stage.name: _StageStats() for stage in self.stages}
+        self._requests = 0
+        self._answered_by: Dict[str, int] = {}
+        self._latency = _LatencyWindow()
+
+    async def _run_stage(self, stage: CascadeStage, text: str, context: dict):
+        budget = stage.latency_budget_ms / 1000.0 if stage.latency_budget_ms else None
+
+        if stage.run_in_thread:
+            # Shared model pool; run_blocking carries the request context so profiles follow the call
+            call = tf_runtime.run_blocking(stage.classify, text, context)
+            return await asyncio.wait_for(call, budget) if budget else await call
+
+        result = stage.classify(text, context)
+        if inspect.isawaitable(result):
+            return await asyncio.wait_for(result, budget) if budget else await result
+        return result
+
+    async def run(self, text: str, skip: Iterable[str] = ()) -> CascadeResult:
+        """
+        Classify text, escalating until a stage is confident enough.
+        Stages listed in skip (e.g. "llm" when the caller opted out) are bypassed.
+        """
+        skip = set(skip)
+        started = time.perf_counter()
+        context: Dict[str, dict] = {}
+        trace = []
+        answer = None
+
+        for stage in self.stages:
+            stats = self._stats[stage.name]
+            if not stage.enabled or stage.name in skip:
+                with self._lock:
+                    stats.skipped += 1
+                continue
+
+            stage_started = time.perf_counter()
+            outcome = "escalated"
+            result = None
+            try:
+                result = await self._run_stage(stage, text, context)
+            except asyncio.TimeoutError:
+                outcome = "timeout"
+            except Exception as e:
+                outcome = "error"
+                logger.warning("Cascade stage '%s' failed: %s", stage.name, e)
+            elapsed_ms = (time.perf_counter() - stage_started) * 1000
+
+            if result is not None and "error" in result:
+                result = None
+                outcome = "error"
+
+            if result is not None:
+                context[stage.name] = result
+                if result.get("confidence", 0.0) >= stage.threshold:
+                    outcome = "accepted"
+                    answer = (stage, result)
+            elif outcome == "escalated":
+                outcome = "no_answer"
+
+            with self._lock:
+                stats.calls += 1
+                stats.cost += stage.cost
+                stats.latency.add(elapsed_ms)
+                if stage.latency_budget_ms and elapsed_ms > stage.latency_budget_ms:
+                    stats.over_budget += 1
+                if outcome == "accepted":
+                    stats.accepted += 1
+                elif outcome == "timeout":
+                    stats.timeouts += 1
+                    stats.escalated += 1
+                elif outcome == "error":
+                    stats.errors += 1
+                    stats.escalated += 1
+                elif outcome == "no_answer":
+                    stats.no_answer += 1
+                    stats.escalated += 1
+                else:
+                    stats.escalated += 1
+
+            trace.append({
+                "stage": stage.name,
+                "outcome": outcome,
+                "confidence": result.get("confidence") if result else None,
+                "latency_ms": round(elapsed_ms, 3),
+            })
+
+            if answer is not None:
+                break
+
+        if answer is not None:
+            stage, result = answer
+            final = CascadeResult(
+                job_title=result["job_title"],
+                confidence=float(result["confidence"]),
+                stage=stage.name,
+                method=result.get("method", stage.name),
+            )
+        elif context:
+            # No stage was confident enough: use the fallback stage or the most confident answer
+            if self.fallback_stage in context:
+                name, result = self.fallback_stage, context[self.fallback_stage]
+            else:
+                name, result = max(context.items(), key=lambda item: item[1].get("confidence", 0.0))
+            final = CascadeResult(
+                job_title=result["job_title"],
+                confidence=float(result["confidence"]),
+                stage=name,
+                method=f"{result.get('method', name)}_fallback",
+            )
+        else:
+            final = CascadeResult(job_title="Unknown", confidence=0.0, stage=None, method="no_answer")
+
+        final.results = context
+        final.trace = trace
+        final.latency_ms = (time.perf_counter() - started) * 1000
+
+        with self._lock:
+            self._requests += 1
+            key = final.stage or "none"
+            self._answered_by[key] = self._answered_by.get(key, 0) + 1
+            self._latency.add(final.latency_ms)
+
+        return final
+
+    def export_stats(self) -> dict:
+        """Per-stage hit rates, escalation counts, latencies and cost"""
+        with self._lock:
+            return {
+                "requests": self._requests,
+                "answered_by": dict(self._answered_by),
+                "latency_ms": self._latency.percentiles(),
+                "stages": [
+                    dict(
+                        name=stage.name,
+                        threshold=stage.threshold,
+                        latency_budget_ms=stage.latency_budget_ms,
+                        enabled=stage.enabled,
+                        **self._stats[stage.name].export(),
+                    )
+                    for stage in self.stages
+                ],
+            }
+
+
+def load_cascade_config(section: str) -> dict:
+    """
+    Section of CASCADE_CONFIG (JSON file path or inline JSON) for one service,
+    empty dict if unset
+    """
+    raw = os.getenv("CASCADE_CONFIG", "").strip()
+    if not raw:
+        return {}
+    try:
+        if raw.startswith("{"):
+            config = json.loads(raw)
+        else:
+            with open(raw, "r", encoding="utf-8") as f:
+                config = json.load(f)
+    except Exception as e:
+        logger.warning("Could not read CASCADE_CONFIG: %s", e)
+        return {}
+    if any(key in config for key in ("order", "fallback_stage", "stages")):
+        logger.warning("CASCADE_CONFIG needs one section per service, e.g. {\"%s\": {\"stages\": ...}}", section)
+    return config.get(section) or {}
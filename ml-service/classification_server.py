@@ -0,0 +1,259 @@
+"""
+Classification Server - all CV classifiers and the skill analyzer in one process
+
+Replaces running cv_classifier_service*.py, cv_classifier_real_model.py,
+cv_classifier_hybrid.py and skill_analyzer_service.py side by side. Backends
+are loaded on first use, share one TensorFlow runtime and one inference
+thread pool, and can be evicted under MODEL_MEMORY_CAP_MB.
+
+Endpoints:
+    POST /classify               default backend (DEFAULT_CLASSIFIER_BACKEND, "keras")
+    POST /classify/{backend}     keras | real_model | hybrid | lite
+    POST /analyze                skill-gap analysis (same contract as skill_analyzer_service)
+    POST /analyze/batch          one CV vs many jobs, or many CVs vs one job
+    GET  /backends               load state and memory estimate per backend
+    POST /backends/{name}/load   warm a backend up front
+    POST /backends/{name}/unload free a backend's models
+
+The same app can listen on several ports so existing clients keep working:
+    CLASSIFICATION_SERVER_PORTS=5002,5003 python classification_server.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+
+import tf_runtime
+from backend_registry import build_default_registry
+from service_logging import get_logger, request_log
+from skill_analyzer_service import BatchRequestError, build_batch_response, parse_batch_request
+import request_profiler
+
+# Ensure UTF-8 stdout
+sys.stdout.reconfigure(encoding="utf-8")
+
+app = FastAPI(title="CV Classification Server - Consolidated")
+logger = get_logger("classification_server")
+request_profiler.install_fastapi(app, "classification_server")
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+registry = build_default_registry()
+DEFAULT_CLASSIFIER_BACKEND = os.getenv("DEFAULT_CLASSIFIER_BACKEND", "keras")
+
+# Name of the /classify handler inside each classifier module
+CLASSIFY_HANDLERS = {
+    "keras": "classify_cv",
+    "real_model": "classify_endpoint",
+    "hybrid": "classify_endpoint",
+    "lite": "classify",
+}
+
+
+@app.on_event("startup")
+async def startup_event():
+    print("\n" + "=" * 60)
+    print("🚀 CV Classification Server (consolidated)")
+    print("=" * 60)
+
+    tf_runtime.configure()
+    asyncio.get_running_loop().set_default_executor(tf_runtime.get_executor())
+
+    preload = [name.strip() for name in os.getenv("PRELOAD_BACKENDS", "").split(",") if name.strip()]
+    for name in preload:
+        if name in registry.backends:
+            await registry.backends[name].ensure_loaded()
+
+    print(f"✅ Backends: {', '.join(registry.names())} (lazy)")
+    print("=" * 60 + "\n")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Every backend that talks to Groq holds a gateway (keras, hybrid, lite)
+    gateways = []
+    for backend in registry.backends.values():
+        llm = getattr(backend.module, "llm", None) if backend.module is not None else None
+        if llm is not None and all(llm is not g for g in gateways):
+            gateways.append(llm)
+    for llm in gateways:
+        await llm.aclose()
+    tf_runtime.shutdown()
+
+
+async def _classify(backend: str, payload: dict):
+    if backend not in CLASSIFY_HANDLERS:
+        raise HTTPException(status_code=404, detail=f"Unknown classifier backend '{backend}'")
+
+    payload = {k: v for k, v in payload.items() if k != "backend"}
+    # The module's handler adds its fields and timings to this request's summary
+    with request_log("classify", logger, backend=backend) as req:
+        acquire_started = time.perf_counter()
+        async with registry.use(backend) as module:
+            req.add_timing("backend_acquire", time.perf_counter() - acquire_started)
+            try:
+                request = module.CVClassificationRequest(**payload)
+            except Exception as e:
+                req.status = "rejected"
+                raise HTTPException(status_code=422, detail=str(e))
+            handler = getattr(module, CLASSIFY_HANDLERS[backend])
+            return await handler(request)
+
+
+@app.post("/classify")
+async def classify_default(request: Request, backend: Optional[str] = None):
+    payload = await request.json()
+    return await _classify(backend or payload.get("backend") or DEFAULT_CLASSIFIER_BACKEND, payload)
+
+
+@app.post("/classify/{backend}")
+async def classify_with_backend(backend: str, request: Request):
+    return await _classify(backend, await request.json())
+
+
+@app.post("/analyze")
+async def analyze(request: Request):
+    """Skill-gap analysis, same request/response shape as skill_analyzer_service"""
+    with request_log("analyze", logger) as req:
+        try:
+            data = await request.json()
+            cv_text = data.get("cv_text", "")
+            job_desc = data.get("job_desc", "")
+
+            if not cv_text or not job_desc:
+                req.status = "rejected"
+                return JSONResponse(status_code=400, content={
+                    "success": False,
+                    "message": "cv_text and job_desc are required"
+                })
+
+            async with registry.use("skills") as module:
+                result = await tf_runtime.run_blocking(module.analyze_cv_job_match, cv_text, job_desc)
+
+            return {"success": True, "data": result}
+
+        except Exception as e:
+            req.status = "error"
+            req.set(error=type(e).__name__)
+            logger.exception("Error in analyze endpoint: %s", e)
+            return JSONResponse(status_code=500, content={"success": False, "message": str(e)})
+
+
+@app.post("/analyze/batch")
+async def analyze_batch(request: Request):
+    """Batch skill-gap analysis, same request/response shape as skill_analyzer_service"""
+    with request_log("analyze/batch", logger) as req:
+        try:
+            try:
+                data = await request.json()
+            except ValueError:
+                data = {}
+            cv_texts, job_descs, cv_ids, job_ids = parse_batch_request(data)
+
+            async with registry.use("skills") as module:
+                results = await tf_runtime.run_blocking(module.analyze_pairs, cv_texts, job_descs)
+
+            return {"success": True, "data": build_batch_response(cv_texts, job_descs, cv_ids, job_ids, results)}
+
+        except BatchRequestError as e:
+            req.status = "rejected"
+            return JSONResponse(status_code=400, content={"success": False, "message": str(e)})
+
+        except Exception as e:
+            req.status = "error"
+            req.set(error=type(e).__name__)
+            logger.exception("Error in analyze batch endpoint: %s", e)
+            return JSONResponse(status_code=500, content={"success": False, "message": str(e)})
+
+
+@app.get("/backends")
+async def backends():
+    return registry.info()
+
+
+@app.post("/backends/{name}/load")
+async def load_backend(name: str):
+    if name not in registry.backends:
+        raise HTTPException(status_code=404, detail=f"Unknown backend '{name}'")
+    await registry.backends[name].ensure_loaded()
+    return registry.backends[name].info()
+
+
+@app.post("/backends/{name}/unload")
+async def unload_backend(name: str):
+    if name not in registry.backends:
+        raise HTTPException(status_code=404, detail=f"Unknown backend '{name}'")
+    return {"success": registry.unload(name), "backend": registry.backends[name].info()}
+
+
+@app.get("/health")
+async def health():
+    skills = registry.backends["skills"]
+    skills_list = getattr(skills.module, "skills_list", None) if skills.loaded else None
+    return {
+        "status": "healthy",
+        "success": True,
+        "message": "CV Classification Server is running",
+        "default_classifier": DEFAULT_CLASSIFIER_BACKEND,
+        "loaded_backends": [name for name, b in registry.backends.items() if b.loaded],
+        "model_loaded": skills.loaded,
+        "skills_count": len(skills_list) if skills_list else 0,
+        "result_cache": skills.module.result_cache.info() if skills.loaded else None,
+        "estimated_mb": registry.info()["estimated_mb"],
+    }
+
+
+@app.get("/")
+async def root():
+    return {
+        "service": "CV Classification Server - Consolidated",
+        "status": "running",
+        "backends": registry.names(),
+        "endpoints": {
+            "classify": "/classify or /classify/{backend} (POST)",
+            "analyze": "/analyze (POST)",
+            "analyze_batch": "/analyze/batch (POST)",
+            "backends": "/backends (GET)",
+            "health": "/health (GET)"
+        }
+    }
+
+
+def serve(host: str, ports):
+    """One uvicorn server (one event loop, one process) listening on every port"""
+    import socket
+    import uvicorn
+
+    sockets = []
+    for port in ports:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+        sockets.append(sock)
+
+    server = uvicorn.Server(uvicorn.Config(app, log_level="info"))
+    server.run(sockets=sockets)
+
+
+if __name__ == "__main__":
+    ports = [int(p) for p in os.getenv("CLASSIFICATION_SERVER_PORTS", "5002,5003").split(",") if p.strip()]
+    host = os.getenv("HOST", "0.0.0.0")
+
+    print(f"\n🚀 Starting CV Classification Server on ports {', '.join(map(str, ports))}...")
+    for port in ports:
+        print(f"📝 Health: http://localhost:{port}/health")
+    print("\nPress Ctrl+C to stop\n")
+
+    serve(host, ports)
@@ -16,14 +16,15 @@ from collections import Counter
 # Ensure UTF-8 stdout
 sys.stdout.reconfigure(encoding="utf-8")
 
-# Try to import Groq
-try:
-    from groq import Groq
-    GROQ_AVAILABLE = True
-except ImportError:
-    GROQ_AVAILABLE = False
+# Shared Groq access (async client + response cache)
+from llm_gateway import get_gateway
+from classification_cascade import CascadeStage, ClassificationCascade, load_cascade_config
+from service_logging import get_logger, request_log
+import request_profiler
 
 app = FastAPI(title="CV Classification Service - Hybrid AI")
+logger = get_logger("classifier.hybrid")
+request_profiler.install_fastapi(app, "hybrid")
 
 # CORS middleware
 app.add_middleware(
@@ -34,8 +35,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize Groq client
-groq_client = None
+# LLM gateway (initialized on startup)
+llm = None
 
 # Comprehensive job categories with keyword patterns - ALL FIELDS
 JOB_CATEGORIES_PATTERNS = {
@@ -302,10 +303,10 @@ def classify_with_keywords(cv_text: str) -> dict:
     }
 
 
-def classify_with_groq(cv_text: str) -> dict:
+async def classify_with_groq(cv_text: str) -> dict:
     """Use Groq AI for intelligent classification"""
     
-    if not groq_client or not GROQ_AVAILABLE:
+    if llm is None or not llm.available:
         return None
     
     try:
@@ -337,7 +338,7 @@ Respond with ONLY a JSON object:
 
 The job title MUST be one that accurately represents the candidate's main professional identity."""
 
-        chat_completion = groq_client.chat.completions.create(
+        response_text = await llm.chat(
             messages=[
                 {
                     "role": "system",
@@ -352,8 +353,9 @@ The job title MUST be one that accurately represents the candidate's main profes
             temperature=0.2,  # Lower temperature for more accurate results
             max_tokens=250
         )
-        
-        response_text = chat_completion.choices[0].message.content.strip()
+        if response_text is None:
+            return None
+        response_text = response_text.strip()
         
         # Try to parse JSON response
         import json
@@ -374,44 +376,66 @@ The job title MUST be one that accurately represents the candidate's main profes
         }
         
     except Exception as e:
-        print(f"⚠️  Groq classification failed: {e}")
+        logger.warning("Groq classification failed: %s", e)
         return None
 
 
+def keyword_stage(cv_text: str, context: dict) -> dict:
+    """Cheap first stage: weighted keyword scoring"""
+    result = classify_with_keywords(cv_text)
+    return dict(result)
+
+
+async def groq_stage(cv_text: str, context: dict) -> Optional[dict]:
+    """Expensive stage: Groq AI, only reached when keywords are ambiguous"""
+    return await classify_with_groq(cv_text)
+
+
+# keyword -> Groq, keyword result is used when Groq is not confident enough
+cascade = ClassificationCascade(
+    [
+        CascadeStage("keyword", keyword_stage, threshold=0.6, latency_budget_ms=20),
+        CascadeStage("llm", groq_stage, threshold=0.6, latency_budget_ms=10000, cost=1.0),
+    ],
+    load_cascade_config("hybrid"),
+    fallback_stage="keyword",
+)
+
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize on startup"""
-    global groq_client
+    global llm
     
     print("\n" + "=" * 60)
     print("🚀 CV Classification Service - Hybrid AI")
     print("=" * 60)
     
-    # Try to initialize Groq
-    if GROQ_AVAILABLE:
-        try:
-            api_key = os.getenv("GROQ_API_KEY")
-            if api_key:
-                groq_client = Groq(api_key=api_key)
-                print("✅ Groq AI enabled")
-            else:
-                print("⚠️  GROQ_API_KEY not set - Groq disabled")
-        except Exception as e:
-            print(f"⚠️  Groq initialization failed: {e}")
+    # Initialize Groq through the shared gateway
+    llm = get_gateway()
+    if llm.available:
+        print("✅ Groq AI enabled")
     else:
-        print("⚠️  Groq library not installed - using keyword matching only")
+        print("⚠️  Groq disabled - using keyword matching only")
     
     print(f"✅ Loaded {len(JOB_CATEGORIES_PATTERNS)} job categories")
     print("=" * 60 + "\n")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close pooled LLM connections"""
+    if llm is not None:
+        await llm.aclose()
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
     return {
         "service": "CV Classification - Hybrid AI",
         "status": "running",
-        "groq_enabled": groq_client is not None,
+        "groq_enabled": llm is not None and llm.available,
         "job_categories": len(JOB_CATEGORIES_PATTERNS),
         "method": "groq_ai + keyword_matching"
     }
@@ -422,8 +446,9 @@ async def health():
     """Health check"""
     return {
         "status": "healthy",
-        "groq_available": groq_client is not None,
-        "categories_count": len(JOB_CATEGORIES_PATTERNS)
+        "groq_available": llm is not None and llm.available,
+        "categories_count": len(JOB_CATEGORIES_PATTERNS),
+        "llm_gateway": llm.get_stats() if llm is not None else None
     }
 
 
@@ -431,77 +456,74 @@ async def health():
 async def classify_endpoint(request: CVClassificationRequest):
     """Classify CV endpoint"""
     
-    try:
-        cv_text = request.cv_text.strip()
-        
-        if not cv_text or len(cv_text) < 50:
-            raise HTTPException(
-                status_code=400,
-                detail="CV text is too short (minimum 50 characters)"
-            )
-        
-        print(f"\n{'='*60}")
-        print(f"📄 Classifying CV ({len(cv_text)} chars)")
-        print(f"{'='*60}")
-        
-        # Try Groq AI first if enabled
-        groq_result = None
-        if request.use_groq_analysis and groq_client:
-            print("🤖 Using Groq AI for classification...")
-            groq_result = classify_with_groq(cv_text)
-        
-        # Keyword-based classification
-        print("🔍 Running keyword analysis...")
-        keyword_result = classify_with_keywords(cv_text)
-        
-        # Decide which result to use
-        if groq_result and groq_result.get("confidence", 0) > 0.6:
-            # Use Groq result
-            final_job = groq_result["job_title"]
-            final_confidence = groq_result["confidence"]
-            final_method = "groq_ai"
-            ai_analysis = groq_result.get("reasoning", "")
-            
-            # Get keyword top 5 for additional context
-            top_5 = keyword_result["top_5"]
-            
-        else:
-            # Use keyword result
-            final_job = keyword_result["job_title"]
-            final_confidence = keyword_result["confidence"]
-            final_method = keyword_result["method"]
-            ai_analysis = f"Matched keywords: {', '.join(keyword_result.get('matches', []))}"
+    with request_log("classify", logger, backend="hybrid") as req:
+        try:
+            cv_text = request.cv_text.strip()
+            req.set(cv_chars=len(cv_text))
+
+            if not cv_text or len(cv_text) < 50:
+                raise HTTPException(
+                    status_code=400,
+                    detail="CV text is too short (minimum 50 characters)"
+                )
+
+            # Keyword analysis first, escalate to Groq AI only when it is not confident
+            skip = () if request.use_groq_analysis else ("llm",)
+            outcome = await cascade.run(cv_text, skip=skip)
+            for step in outcome.trace:
+                req.add_timing(f"cascade.{step['stage']}", step['latency_ms'] / 1000)
+            # The keyword stage can be disabled or fail; top 5 still come from the keyword scorer
+            keyword_result = outcome.results.get("keyword") or classify_with_keywords(cv_text)
             top_5 = keyword_result["top_5"]
-        
-        print(f"\n✅ Result: {final_job} ({final_confidence*100:.1f}%)")
-        print(f"   Method: {final_method}")
-        print(f"{'='*60}\n")
-        
-        return CVClassificationResponse(
-            success=True,
-            job_title=final_job,
-            confidence=final_confidence,
-            decision_method=final_method,
-            top_5_predictions=top_5,
-            ai_analysis=ai_analysis,
-            keras_prediction=None
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        import traceback
-        traceback.print_exc()
-        
-        return CVClassificationResponse(
-            success=False,
-            job_title="Error",
-            confidence=0.0,
-            decision_method="error",
-            top_5_predictions=[],
-            keras_prediction=str(e)
-        )
+
+            if outcome.stage == "llm":
+                # Use Groq result
+                final_job = outcome.job_title
+                final_confidence = outcome.confidence
+                final_method = "groq_ai"
+                ai_analysis = outcome.results["llm"].get("reasoning", "")
+            else:
+                # Use keyword result
+                final_job = keyword_result["job_title"]
+                final_confidence = keyword_result["confidence"]
+                final_method = keyword_result["method"]
+                ai_analysis = f"Matched keywords: {', '.join(keyword_result.get('matches', []))}"
+
+            req.set(job_title=final_job, confidence=round(final_confidence, 4), method=final_method)
+
+            return CVClassificationResponse(
+                success=True,
+                job_title=final_job,
+                confidence=final_confidence,
+                decision_method=final_method,
+                top_5_predictions=top_5,
+                ai_analysis=ai_analysis,
+                keras_prediction=None
+            )
+
+        except HTTPException as he:
+            req.status = "rejected"
+            req.set(http_status=he.status_code)
+            raise
+        except Exception as e:
+            req.status = "error"
+            req.set(error=type(e).__name__)
+            logger.exception("Classification failed: %s", e)
+
+            return CVClassificationResponse(
+                success=False,
+                job_title="Error",
+                confidence=0.0,
+                decision_method="error",
+                top_5_predictions=[],
+                keras_prediction=str(e)
+            )
+
+
+@app.get("/cascade/stats")
+async def cascade_stats():
+    """Per-stage hit rates, escalations, latencies and cost"""
+    return cascade.export_stats()
 
 
 if __name__ == "__main__":
@@ -9,15 +9,24 @@ from pydantic import BaseModel
 import tensorflow as tf
 from tensorflow.keras.preprocessing.sequence import pad_sequences
 import numpy as np
+import json
 import pickle
 import os
 import sys
+import time
+import asyncio
 from typing import Optional, List
 
+from fast_tokenizer import CompiledTokenizer
+from service_logging import current_request, get_logger, request_log
+import request_profiler
+
 # Ensure UTF-8 stdout
 sys.stdout.reconfigure(encoding="utf-8")
 
 app = FastAPI(title="CV Classification Service - Real Model")
+logger = get_logger("classifier.real_model")
+request_profiler.install_fastapi(app, "real_model")
 
 # CORS middleware
 app.add_middleware(
@@ -31,7 +40,9 @@ app.add_middleware(
 # Global variables
 model = None
 tokenizer = None
+fast_tokenizer = None
 job_categories = []
+sequence_length = 3000
 
 # 108 Job Categories - comprehensive list
 JOB_CATEGORIES_108 = [
@@ -99,7 +110,7 @@ class CVClassificationResponse(BaseModel):
 
 def load_components():
     """Load model and tokenizer"""
-    global model, tokenizer, job_categories
+    global model, tokenizer, fast_tokenizer, job_categories, sequence_length
     
     print("\n" + "=" * 60)
     print("🚀 Loading CV Classification Components...")
@@ -127,8 +138,17 @@ def load_components():
         if not model_loaded:
             raise FileNotFoundError("Model file not found in any expected location")
         
+        # Pad to the model's own input length (3000 for the original model)
+        sequence_length = model.input_shape[1] or 3000
+        
+        # Artifacts exported next to the model (e.g. by MYYYYY/MYYYYY/distill.py)
+        # take precedence over the shared tokenizer and the built-in category list
+        model_base = os.path.splitext(model_path)[0]
+        classes_path = model_base + "_classes.json"
+        
         # Load tokenizer
         tokenizer_paths = [
+            model_base + "_tokenizer.pkl",
             "../last-one/tokenizer.pkl",
             "last-one/tokenizer.pkl",
             "tokenizer.pkl"
@@ -148,8 +168,21 @@ def load_components():
         if not tokenizer_loaded:
             raise FileNotFoundError("Tokenizer file not found")
         
+        # Compiled tokenizer with cached sequences (same ids as texts_to_sequences)
+        try:
+            fast_tokenizer = CompiledTokenizer(tokenizer)
+            print(f"✅ Compiled tokenizer ready")
+        except ValueError as e:
+            fast_tokenizer = None
+            print(f"⚠️ Using Keras tokenizer: {e}")
+        
         # Set job categories
-        job_categories = JOB_CATEGORIES_108
+        if os.path.exists(classes_path):
+            with open(classes_path, "r", encoding="utf-8") as f:
+                job_categories = json.load(f)
+            print(f"\n📦 Loaded categories from: {classes_path}")
+        else:
+            job_categories = JOB_CATEGORIES_108
         print(f"\n✅ Job categories loaded: {len(job_categories)} categories")
         print(f"   Sample: {job_categories[:5]}")
         
@@ -170,21 +203,23 @@ def classify_cv(cv_text: str) -> dict:
     if model is None or tokenizer is None:
         return {"error": "Model not loaded"}
     
+    req = current_request()
     try:
-        # Preprocess text
-        print(f"\n📄 Processing CV ({len(cv_text)} chars)...")
-        
-        # Tokenize
-        sequences = tokenizer.texts_to_sequences([cv_text])
-        print(f"   Tokenized sequence length: {len(sequences[0])}")
+        started = time.perf_counter()
         
-        # Pad to 3000 (model input size)
-        padded = pad_sequences(sequences, maxlen=3000, padding='post')
-        print(f"   Padded shape: {padded.shape}")
+        # Tokenize + pad to the model input size
+        if fast_tokenizer is not None:
+            padded = fast_tokenizer.texts_to_padded([cv_text], maxlen=sequence_length, padding='post')
+        else:
+            sequences = tokenizer.texts_to_sequences([cv_text])
+            padded = pad_sequences(sequences, maxlen=sequence_length, padding='post')
+        tokenized = time.perf_counter()
         
         # Predict
-        print(f"   Running prediction...")
         predictions = model.predict(padded, verbose=0)
+        if req is not None:
+            req.add_timing("tokenize", tokenized - started)
+            req.add_timing("predict", time.perf_counter() - tokenized)
         
         # Get top 5 predictions
         top_5_indices = np.argsort(predictions[0])[-5:][::-1]
@@ -200,7 +235,7 @@ def classify_cv(cv_text: str) -> dict:
         else:
             predicted_job = f"Category_{best_idx}"
         
-        print(f"\n✅ Prediction: {predicted_job} ({best_score*100:.1f}%)")
+        logger.debug("prediction %s (%.3f)", predicted_job, best_score)
         
         # Build top 5 list
         top_predictions = []
@@ -223,9 +258,7 @@ def classify_cv(cv_text: str) -> dict:
         }
         
     except Exception as e:
-        print(f"\n❌ Classification error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Classification failed: %s", e)
         return {"error": str(e)}
 
 
@@ -261,52 +294,59 @@ async def health():
 async def classify_endpoint(request: CVClassificationRequest):
     """Classify CV endpoint"""
     
-    try:
-        cv_text = request.cv_text.strip()
-        
-        if not cv_text or len(cv_text) < 50:
-            raise HTTPException(
-                status_code=400,
-                detail="CV text is too short (minimum 50 characters)"
+    with request_log("classify", logger, backend="real_model") as req:
+        try:
+            cv_text = request.cv_text.strip()
+            req.set(cv_chars=len(cv_text))
+
+            if not cv_text or len(cv_text) < 50:
+                raise HTTPException(
+                    status_code=400,
+                    detail="CV text is too short (minimum 50 characters)"
+                )
+
+            # Classify (blocking inference runs off the event loop)
+            result = await asyncio.to_thread(request_profiler.tracked(classify_cv), cv_text)
+
+            if "error" in result:
+                req.status = "error"
+                req.set(error=result["error"])
+                return CVClassificationResponse(
+                    success=False,
+                    job_title="Error",
+                    confidence=0.0,
+                    decision_method="error",
+                    top_5_predictions=[],
+                    keras_prediction=result["error"]
+                )
+
+            req.set(job_title=result["predicted_job"], confidence=round(result["confidence"], 4))
+            return CVClassificationResponse(
+                success=True,
+                job_title=result["predicted_job"],
+                confidence=result["confidence"],
+                decision_method=result["method"],
+                top_5_predictions=result["top_5_predictions"],
+                keras_prediction=result["predicted_job"]
             )
-        
-        # Classify
-        result = classify_cv(cv_text)
-        
-        if "error" in result:
+
+        except HTTPException as he:
+            req.status = "rejected"
+            req.set(http_status=he.status_code)
+            raise
+        except Exception as e:
+            req.status = "error"
+            req.set(error=type(e).__name__)
+            logger.exception("Endpoint error: %s", e)
+
             return CVClassificationResponse(
                 success=False,
                 job_title="Error",
                 confidence=0.0,
                 decision_method="error",
                 top_5_predictions=[],
-                keras_prediction=result["error"]
+                keras_prediction=str(e)
             )
-        
-        return CVClassificationResponse(
-            success=True,
-            job_title=result["predicted_job"],
-            confidence=result["confidence"],
-            decision_method=result["method"],
-            top_5_predictions=result["top_5_predictions"],
-            keras_prediction=result["predicted_job"]
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"❌ Endpoint error: {e}")
-        import traceback
-        traceback.print_exc()
-        
-        return CVClassificationResponse(
-            success=False,
-            job_title="Error",
-            confidence=0.0,
-            decision_method="error",
-            top_5_predictions=[],
-            keras_prediction=str(e)
-        )
 
 
 if __name__ == "__main__":
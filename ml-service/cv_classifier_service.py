@@ -5,7 +5,7 @@ CV Classification Service
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import tensorflow as tf
 import numpy as np
 import os
@@ -17,15 +17,15 @@ import json
 # Ensure UTF-8 stdout to avoid Windows encoding errors with logs
 sys.stdout.reconfigure(encoding="utf-8")
 
-# استيراد Groq API
-try:
-    from groq import Groq
-    GROQ_AVAILABLE = True
-except ImportError:
-    GROQ_AVAILABLE = False
-    print("⚠️ Groq library not available. Will use only Keras model.")
+# Groq API عبر LLM gateway المشترك (async + cache)
+from llm_gateway import get_gateway
+from classification_cascade import CascadeStage, ClassificationCascade, load_cascade_config
+from service_logging import get_logger, request_log
+import request_profiler
 
 app = FastAPI(title="CV Classification Service")
+logger = get_logger("classifier.keras")
+request_profiler.install_fastapi(app, "keras")
 
 # CORS middleware
 app.add_middleware(
@@ -39,13 +39,24 @@ app.add_middleware(
 # تحميل موديل Keras
 MODEL_PATH = "cv_classifier_merged.keras"
 model = None
-groq_client = None
+llm = None
 JOB_CATEGORIES = []  # سيتم تحميلها من ملف JSON
+LLM_CONFIDENCE_GATE = 0.50  # AI يغير القرار فقط تحت هذه الثقة
+# Keywords قوية (>= 3 matches) ثقتها 0.55 على الأقل، المتوسطة (0.50) تصعد لـ Keras
+KEYWORD_STRONG_CONFIDENCE = 0.55
 
 
 class CVClassificationRequest(BaseModel):
     cv_text: str
-    use_groq_analysis: bool = True
+    # Deprecated: Groq يتم استدعاؤه من الـ cascade فقط عندما تكون الثقة أقل من 50%
+    use_groq_analysis: bool = Field(
+        True,
+        description=(
+            "Deprecated: no longer triggers a Groq call. Groq is only used by the cascade when "
+            "confidence is below 50%; otherwise ai_analysis comes from the local text analysis."
+        ),
+        json_schema_extra={"deprecated": True},
+    )
 
 
 class CVClassificationResponse(BaseModel):
@@ -98,20 +109,8 @@ def load_model():
 
 def initialize_groq():
     """تهيئة Groq API"""
-    global groq_client
-    if not GROQ_AVAILABLE:
-        return
-    
-    api_key = os.getenv("GROQ_API_KEY")
-    if api_key:
-        try:
-            groq_client = Groq(api_key=api_key)
-            print("✅ Groq client initialized successfully")
-        except Exception as e:
-            print(f"❌ Error initializing Groq: {e}")
-            groq_client = None
-    else:
-        print("⚠️ GROQ_API_KEY not found in environment variables")
+    global llm
+    llm = get_gateway()
 
 
 @app.on_event("startup")
@@ -123,6 +122,13 @@ async def startup_event():
     print("✅ Service ready!")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """إغلاق اتصالات Groq"""
+    if llm is not None:
+        await llm.aclose()
+
+
 def extract_text_features(text: str) -> np.ndarray:
     """
     استخراج features من النص - عمل text padding ل 8000 characters
@@ -172,11 +178,10 @@ def classify_with_keras_model(cv_text: str) -> dict:
     try:
         # استخراج features
         features = extract_text_features(cv_text)
-        print(f"📊 Features shape: {features.shape}")
         
         # التنبؤ
         predictions = model.predict(features, verbose=0)
-        print(f"📊 Predictions shape: {predictions.shape}")
+        logger.debug("features %s -> predictions %s", features.shape, predictions.shape)
         
         # الحصول على أعلى 3 تنبؤات
         top_3_indices = np.argsort(predictions[0])[-3:][::-1]
@@ -209,9 +214,7 @@ def classify_with_keras_model(cv_text: str) -> dict:
         }
         
     except Exception as e:
-        print(f"❌ Error in Keras prediction: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Keras prediction failed: %s", e)
         return {"error": str(e)}
 
 
@@ -280,9 +283,9 @@ def extract_analysis_from_text(cv_text: str) -> dict:
     }
 
 
-def analyze_cv_with_groq(cv_text: str) -> dict:
+async def analyze_cv_with_groq(cv_text: str) -> dict:
     """تحليل CV باستخدام Groq API"""
-    if not groq_client:
+    if llm is None or not llm.available:
         return {"error": "Groq client not available"}
     
     prompt = f"""
@@ -311,7 +314,7 @@ Format your response as JSON with these fields:
 """
     
     try:
-        chat_completion = groq_client.chat.completions.create(
+        response_text = await llm.chat(
             messages=[
                 {
                     "role": "user",
@@ -322,8 +325,8 @@ Format your response as JSON with these fields:
             temperature=0.3,
             max_tokens=1024,
         )
-        
-        response_text = chat_completion.choices[0].message.content
+        if response_text is None:
+            return {"error": "Groq request failed"}
         
         # محاولة استخراج JSON من الرد
         json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
@@ -378,150 +381,182 @@ def classify_with_keywords(cv_text: str) -> dict:
     }
 
 
+def keyword_stage(cv_text: str, context: dict) -> dict:
+    """مرحلة 1: Keyword matching (الأرخص)"""
+    keyword_result = classify_with_keywords(cv_text)
+    keyword_scores = keyword_result.get("scores", {})
+    max_keyword_score = max(keyword_scores.values()) if keyword_scores else 0
+    confidence = keyword_result.get("confidence", 0.0)
+
+    if max_keyword_score >= 3:
+        # زيادة الثقة قليلاً إذا كانت Keywords قوية
+        confidence = min(confidence * 1.1, 0.95)
+        method = "keyword_strong"
+    elif max_keyword_score >= 1:
+        method = "keyword_moderate"
+    else:
+        method = "keyword_none"
+
+    return {
+        "job_title": keyword_result.get("predicted_job", "Unknown"),
+        "confidence": confidence,
+        "method": method,
+        "max_score": max_keyword_score,
+        "raw": keyword_result
+    }
+
+
+def keras_stage(cv_text: str, context: dict) -> Optional[dict]:
+    """مرحلة 3: Keras Model (يتم تعزيز الثقة إذا اتفق مع Keywords)"""
+    if model is None:
+        return None
+
+    keras_result = classify_with_keras_model(cv_text)
+    if "error" in keras_result:
+        return keras_result
+
+    keras_job = keras_result.get("predicted_job", "Unknown")
+    keras_confidence = keras_result.get("confidence", 0.0)
+    keyword = context.get("keyword")
+
+    if keyword and keyword["max_score"] >= 1:
+        if keyword["job_title"] != keras_job:
+            # Keras لا يغير نتيجة الـ Keywords المتوسطة (كما في الـ baseline)
+            return {"job_title": keyword["job_title"], "confidence": keyword["confidence"],
+                    "method": "keyword_moderate", "raw": keras_result}
+        confidence = min((keyword["confidence"] + keras_confidence) / 2.0 * 1.15, 0.90)
+        method = "keyword_keras_agreement"
+    else:
+        # الموديل غير موثوق وحده - خفض الثقة (آخر محاولة بعد Text Analysis)
+        confidence = min(keras_confidence * 0.7, 0.70)
+        method = "keras_last_resort"
+
+    return {"job_title": keras_job, "confidence": confidence, "method": method, "raw": keras_result}
+
+
+def text_analysis_stage(cv_text: str, context: dict) -> Optional[dict]:
+    """مرحلة 2: تحليل النص عندما لا توجد keywords واضحة"""
+    keyword = context.get("keyword")
+    if keyword and keyword["max_score"] > 0:
+        return None
+
+    analysis = extract_analysis_from_text(cv_text)
+    return {
+        "job_title": analysis["primary_role"],
+        "confidence": 0.65,
+        "method": "text_analysis_fallback",
+        "analysis": analysis
+    }
+
+
+async def llm_stage(cv_text: str, context: dict) -> Optional[dict]:
+    """مرحلة 4: Groq AI (الأغلى) - فقط عندما تكون الثقة منخفضة"""
+    # نفس قاعدة الـ baseline: AI يغير القرار فقط إذا كانت ثقة آخر قرار أقل من 50%
+    # (مثلاً Keras يتفق مع Keywords لكن بثقة منخفضة)
+    latest = list(context.values())[-1].get("confidence", 0.0) if context else 0.0
+    if latest >= LLM_CONFIDENCE_GATE:
+        return None
+
+    if llm is not None and llm.available:
+        analysis = await analyze_cv_with_groq(cv_text)
+    else:
+        # بدون Groq: تحليل النص المحلي (كما في الـ baseline)
+        analysis = extract_analysis_from_text(cv_text)
+    if not analysis or "primary_role" not in analysis:
+        return None
+
+    return {
+        "job_title": analysis["primary_role"],
+        "confidence": 0.70,
+        "method": "ai_low_confidence",
+        "analysis": analysis
+    }
+
+
+def build_cascade() -> ClassificationCascade:
+    """
+    ترتيب المراحل من الأرخص للأغلى - يمكن تعديلها عبر قسم "keras" في CASCADE_CONFIG
+    - Keywords قوية (>= 3 matches) تجيب مباشرة
+    - Keywords متوسطة (1-2) تصعد لـ Keras: يتم تعزيز الثقة إذا اتفق، وإلا تبقى نتيجة الـ Keywords
+    - بدون keywords: Text Analysis
+    - AI فقط عندما تكون ثقة آخر قرار أقل من 50%
+    """
+    return ClassificationCascade(
+        [
+            CascadeStage("keyword", keyword_stage, threshold=KEYWORD_STRONG_CONFIDENCE, latency_budget_ms=20),
+            CascadeStage("text_analysis", text_analysis_stage, threshold=0.65, latency_budget_ms=20),
+            CascadeStage("keras", keras_stage, threshold=LLM_CONFIDENCE_GATE, latency_budget_ms=2000, cost=0.01, run_in_thread=True),
+            CascadeStage("llm", llm_stage, threshold=0.0, latency_budget_ms=10000, cost=1.0),
+        ],
+        load_cascade_config("keras"),
+        fallback_stage="keyword"
+    )
+
+
+cascade = build_cascade()
+
+
 @app.post("/classify", response_model=CVClassificationResponse)
 async def classify_cv(request: CVClassificationRequest):
     """
-    تصنيف CV باستخدام Hybrid Approach: Keras Model + Keyword Matching + AI Analysis
+    تصنيف CV باستخدام Cascade: Keyword Matching -> Text Analysis -> Keras Model -> AI
+    كل مرحلة تجيب فقط إذا وصلت ثقتها للحد المطلوب، وإلا يتم التصعيد للمرحلة التالية
     """
-    try:
-        cv_text = request.cv_text.strip()
-        
-        if not cv_text:
-            print("❌ CV text is empty")
-            raise HTTPException(status_code=400, detail="CV text is required")
-        
-        print(f"\n{'='*60}")
-        print(f"📄 CV Text Length: {len(cv_text)} characters")
-        print(f"📚 First 200 chars: {cv_text[:200]}")
-        print(f"{'='*60}\n")
-        
-        # 1. استخدام Keyword Matching أولاً (baseline)
-        print("🔎 Step 1: Keyword Matching...")
-        keyword_result = classify_with_keywords(cv_text)
-        keyword_job = keyword_result.get("predicted_job", "Unknown")
-        keyword_confidence = keyword_result.get("confidence", 0.0)
-        keyword_scores = keyword_result.get("scores", {})
-        max_keyword_score = max(keyword_scores.values()) if keyword_scores else 0
-        print(f"   📊 Keyword: {keyword_job} ({keyword_confidence*100:.1f}%) | score={max_keyword_score}")
-        
-        # 2. استخدام Keras Model (إذا متاح)
-        keras_result = None
-        keras_job = None
-        keras_confidence = 0.0
-        
-        if model is not None:
-            print("🧠 Step 2: Keras Model Classification...")
-            keras_result = classify_with_keras_model(cv_text)
-            
-            if "error" not in keras_result:
-                keras_job = keras_result.get("predicted_job", "Unknown")
-                keras_confidence = keras_result.get("confidence", 0.0)
-                print(f"   📊 Keras: {keras_job} ({keras_confidence*100:.1f}%)")
-            else:
-                print(f"   ❌ Keras error: {keras_result['error']}")
-        
-        # 3. دمج النتائج بذكاء (Ensemble)
-        print("\n🔄 Step 3: Ensemble Decision...")
-        final_job_title = "Unknown"
-        final_confidence = 0.0
-        decision_method = "keyword_primary"
-        
-        # استخدم Keywords كأساس (لأن الموديل غير موثوق)
-        final_job_title = keyword_job
-        final_confidence = keyword_confidence
-        
-        # حالة 1: Keyword matching قوي (>= 3 matches) - استخدمه مباشرة
-        if max_keyword_score >= 3:
-            decision_method = "keyword_strong"
-            # زيادة الثقة قليلاً إذا كانت Keywords قوية
-            final_confidence = min(keyword_confidence * 1.1, 0.95)
-            print(f"   ✅ Strong keyword match ({max_keyword_score} matches)")
-        
-        # حالة 2: Keyword matching متوسط (1-2 matches)
-        elif max_keyword_score >= 1:
-            decision_method = "keyword_moderate"
-            print(f"   ✓ Moderate keyword match ({max_keyword_score} matches)")
-            
-            # إذا كان Keras يتفق مع Keywords، زد الثقة
-            if keras_job and keras_job == keyword_job:
-                final_confidence = min((keyword_confidence + keras_confidence) / 2.0 * 1.15, 0.90)
-                decision_method = "keyword_keras_agreement"
-                print(f"   ✅ Keras agrees with keywords!")
-        
-        # حالة 3: لا توجد keywords واضحة (0 matches)
-        else:
-            print(f"   ⚠️ No keyword matches found")
-            decision_method = "text_analysis"
-            
-            # استخدم Text Analysis
-            ai_analysis_temp = extract_analysis_from_text(cv_text)
-            if ai_analysis_temp and "primary_role" in ai_analysis_temp:
-                final_job_title = ai_analysis_temp["primary_role"]
-                final_confidence = 0.65
-                decision_method = "text_analysis_fallback"
-                print(f"   → Using text analysis: {final_job_title}")
-            else:
-                # آخر محاولة: استخدم Keras
-                if keras_job:
-                    final_job_title = keras_job
-                    final_confidence = min(keras_confidence * 0.7, 0.70)  # خفض الثقة
-                    decision_method = "keras_last_resort"
-                    print(f"   → Using Keras as last resort")
+    with request_log("classify", logger, backend="keras") as req:
+        try:
+            cv_text = request.cv_text.strip()
+            req.set(cv_chars=len(cv_text))
+
+            if not cv_text:
+                raise HTTPException(status_code=400, detail="CV text is required")
+
+            outcome = await cascade.run(cv_text)
+            for step in outcome.trace:
+                req.add_timing(f"cascade.{step['stage']}", step['latency_ms'] / 1000)
+
+            # AI Analysis: يعاد استخدام نتيجة مرحلة AI إذا تم تشغيلها،
+            # وإلا تحليل النص المحلي (بدون استدعاء Groq إضافي)
+            ai_analysis = None
+            if "llm" in outcome.results:
+                ai_analysis = outcome.results["llm"]["analysis"]
+            elif request.use_groq_analysis:
+                if "text_analysis" in outcome.results:
+                    ai_analysis = outcome.results["text_analysis"]["analysis"]
                 else:
-                    final_job_title = "Software Engineer"  # default
-                    final_confidence = 0.50
-                    decision_method = "default"
-                    print(f"   → Using default")
-        
-        # 4. اختياري: AI Analysis للتحسين
-        ai_analysis = None
-        if request.use_groq_analysis or final_confidence < 0.50:
-            print("\n🤖 Step 4: AI Analysis...")
-            if groq_client:
-                ai_analysis = analyze_cv_with_groq(cv_text)
-            else:
-                ai_analysis = extract_analysis_from_text(cv_text)
-            
-            if ai_analysis and "primary_role" in ai_analysis:
-                ai_role = ai_analysis.get("primary_role")
-                print(f"   📊 AI: {ai_role}")
-                
-                # استخدم AI فقط إذا كانت الثقة منخفضة جداً
-                if final_confidence < 0.50:
-                    final_job_title = ai_role
-                    final_confidence = 0.70
-                    decision_method = "ai_low_confidence"
-                    print(f"   ✅ Using AI (low confidence)")
-        
-        print(f"\n{'='*60}")
-        print(f"✅ FINAL: {final_job_title} ({final_confidence*100:.1f}%) [{decision_method}]")
-        print(f"{'='*60}\n")
-        
-        # إعداد الاستجابة
-        response_data = {
-            "job_title": final_job_title,
-            "confidence": final_confidence,
-            "decision_method": decision_method,
-            "ai_analysis": ai_analysis,
-            "keras_prediction": keras_result if keras_result else keyword_result
-        }
-        
-        return CVClassificationResponse(
-            success=True,
-            **response_data
-        )
-        
-    except Exception as e:
-        print(f"❌ Error in classify_cv: {e}")
-        import traceback
-        traceback.print_exc()
-        return CVClassificationResponse(
-            success=False,
-            job_title="Error",
-            confidence=0.0,
-            error=str(e)
-        )
+                    with req.stage("ai_analysis"):
+                        ai_analysis = extract_analysis_from_text(cv_text)
+
+            req.set(job_title=outcome.job_title, confidence=round(outcome.confidence, 4), method=outcome.method)
+
+            # keras_prediction = Keras output فقط (None إذا أجاب الـ cascade قبل مرحلة Keras)،
+            # و Keyword result فقط عند عدم تحميل الموديل (كما في الـ baseline)
+            keras_result = outcome.results.get("keras", {}).get("raw")
+            keyword_result = outcome.results.get("keyword", {}).get("raw") if model is None else None
+
+            # إعداد الاستجابة
+            response_data = {
+                "job_title": outcome.job_title,
+                "confidence": outcome.confidence,
+                "decision_method": outcome.method,
+                "ai_analysis": ai_analysis,
+                "keras_prediction": keras_result if keras_result else keyword_result
+            }
+
+            return CVClassificationResponse(
+                success=True,
+                **response_data
+            )
 
+        except Exception as e:
+            req.status = "error"
+            req.set(error=type(e).__name__)
+            logger.exception("classify_cv failed: %s", e)
+            return CVClassificationResponse(
+                success=False,
+                job_title="Error",
+                confidence=0.0,
+                error=str(e)
+            )
 
 @app.get("/")
 async def root():
@@ -530,10 +565,11 @@ async def root():
         "service": "CV Classification Service",
         "status": "running",
         "keras_model": "loaded" if model else "not loaded",
-        "groq_api": "available" if groq_client else "not available",
+        "groq_api": "available" if llm is not None and llm.available else "not available",
         "endpoints": {
             "classify": "/classify (POST)",
-            "health": "/health (GET)"
+            "health": "/health (GET)",
+            "cascade_stats": "/cascade/stats (GET)"
         }
     }
 
@@ -544,10 +580,17 @@ async def health():
     return {
         "status": "healthy",
         "keras_model": model is not None,
-        "groq_api": groq_client is not None
+        "groq_api": llm is not None and llm.available,
+        "llm_gateway": llm.get_stats() if llm is not None else None
     }
 
 
+@app.get("/cascade/stats")
+async def cascade_stats():
+    """إحصائيات كل مرحلة: نسبة الإجابة، التصعيد، زمن الاستجابة والتكلفة"""
+    return cascade.export_stats()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=5002)
@@ -15,14 +15,14 @@ from typing import Optional
 # Ensure UTF-8 stdout
 sys.stdout.reconfigure(encoding="utf-8")
 
-# Try to import Groq
-try:
-    from groq import Groq
-    GROQ_AVAILABLE = True
-except ImportError:
-    GROQ_AVAILABLE = False
+# Shared Groq access (async client + response cache)
+from llm_gateway import get_gateway
+from service_logging import get_logger, request_log
+import request_profiler
 
 app = FastAPI(title="CV Classification Service - Lightweight")
+logger = get_logger("classifier.lite")
+request_profiler.install_fastapi(app, "lite")
 
 # CORS middleware
 app.add_middleware(
@@ -91,14 +91,9 @@ class CVClassificationResponse(BaseModel):
     ai_analysis: Optional[str] = None
     keras_prediction: Optional[str] = None
 
-# Initialize Groq client
-groq_client = None
-if GROQ_AVAILABLE:
-    try:
-        groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-        print("✅ Groq API initialized")
-    except Exception as e:
-        print(f"⚠️  Groq API not available: {e}")
+# Initialize Groq gateway
+llm = get_gateway()
+GROQ_AVAILABLE = llm.available
 
 
 def extract_keywords_from_cv(cv_text: str) -> dict:
@@ -139,9 +134,9 @@ def classify_cv_keywords(cv_text: str) -> tuple:
     return best_category, confidence, "keyword_matching"
 
 
-def analyze_cv_with_groq(cv_text: str, predicted_job: str) -> str:
+async def analyze_cv_with_groq(cv_text: str, predicted_job: str) -> str:
     """Use Groq API to analyze CV and provide insights"""
-    if not groq_client:
+    if not llm.available:
         return None
     
     try:
@@ -155,62 +150,78 @@ Provide a concise analysis focusing on:
 2. Skill alignment
 3. Areas for growth"""
 
-        message = groq_client.messages.create(
+        return await llm.chat(
             model="mixtral-8x7b-32768",
             max_tokens=200,
             messages=[
                 {"role": "user", "content": prompt}
             ]
         )
-        
-        return message.content[0].text
     except Exception as e:
-        print(f"⚠️  Groq analysis failed: {e}")
+        logger.warning("Groq analysis failed: %s", e)
         return None
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close pooled LLM connections"""
+    await llm.aclose()
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {
         "status": "ok",
         "service": "CV Classification Service (Lightweight)",
-        "groq_available": GROQ_AVAILABLE
+        "groq_available": GROQ_AVAILABLE,
+        "llm_gateway": llm.get_stats()
     }
 
 
 @app.post("/classify", response_model=CVClassificationResponse)
 async def classify(request: CVClassificationRequest):
     """Classify CV to determine job title"""
-    try:
-        if not request.cv_text or len(request.cv_text.strip()) < 50:
-            raise HTTPException(
-                status_code=400,
-                detail="CV text is too short or empty"
+    with request_log("classify", logger, backend="lite") as req:
+        try:
+            if not request.cv_text or len(request.cv_text.strip()) < 50:
+                raise HTTPException(
+                    status_code=400,
+                    detail="CV text is too short or empty"
+                )
+
+            req.set(cv_chars=len(request.cv_text))
+
+            # Keyword-based classification
+            with req.stage("keywords"):
+                job_title, confidence, method = classify_cv_keywords(request.cv_text)
+
+            # Groq-based analysis (optional)
+            ai_analysis = None
+            if request.use_groq_analysis and GROQ_AVAILABLE:
+                with req.stage("ai_analysis"):
+                    ai_analysis = await analyze_cv_with_groq(request.cv_text, job_title)
+
+            req.set(job_title=job_title, confidence=round(confidence, 4), method=method)
+
+            return CVClassificationResponse(
+                success=True,
+                job_title=job_title,
+                confidence=confidence,
+                decision_method=method,
+                ai_analysis=ai_analysis,
+                keras_prediction=None  # No TensorFlow model
             )
-        
-        # Keyword-based classification
-        job_title, confidence, method = classify_cv_keywords(request.cv_text)
-        
-        # Groq-based analysis (optional)
-        ai_analysis = None
-        if request.use_groq_analysis and GROQ_AVAILABLE:
-            ai_analysis = analyze_cv_with_groq(request.cv_text, job_title)
-        
-        return CVClassificationResponse(
-            success=True,
-            job_title=job_title,
-            confidence=confidence,
-            decision_method=method,
-            ai_analysis=ai_analysis,
-            keras_prediction=None  # No TensorFlow model
-        )
-    
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"❌ Error classifying CV: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+
+        except HTTPException as he:
+            req.status = "rejected"
+            req.set(http_status=he.status_code)
+            raise
+        except Exception as e:
+            req.status = "error"
+            req.set(error=type(e).__name__)
+            logger.exception("Error classifying CV: %s", e)
+            raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/")
@@ -15,6 +15,7 @@ from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 import pickle
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -395,17 +396,24 @@ class CVJobMatcher:
 
         return best_val_acc
 
-    def find_top_matches(self, cv_text, job_descriptions, top_k=10, use_hybrid=True):
+    def find_top_matches(self, cv_text, job_descriptions, top_k=10, use_hybrid=True, timings=None):
         """
         إيجاد أفضل الوظائف المطابقة للسيرة الذاتية
         use_hybrid: استخدام نهج هجين يجمع بين النموذج المدرب والتشابه الدلالي المباشر
+        timings: dict اختياري يُملأ بزمن كل مرحلة بالثواني
+            (cv_encode, job_encode, keyword_scoring, ranking)
         """
+        started = time.perf_counter()
+
         # تحويل CV إلى embedding
         cv_embedding = self.embedder.encode([cv_text], convert_to_numpy=True)
+        cv_done = time.perf_counter()
 
         # تحويل الوظائف إلى embeddings
         job_embeddings = self.embedder.encode(
             job_descriptions, convert_to_numpy=True)
+        jobs_done = time.perf_counter()
+        keyword_seconds = 0.0
 
         # حساب درجات التطابق
         matches = []
@@ -436,8 +444,10 @@ class CVJobMatcher:
                 similarity_score = ((cos_sim + 1) / 2) * 100
 
                 # إضافة keyword matching boost
+                keyword_started = time.perf_counter()
                 keyword_boost = self._calculate_keyword_match(
                     cv_text, job_descriptions[idx])
+                keyword_seconds += time.perf_counter() - keyword_started
 
                 # الدرجة النهائية: 50% semantic + 50% keyword matching
                 # هذا يعطي وزن أكبر للكلمات المفتاحية المطابقة
@@ -448,10 +458,20 @@ class CVJobMatcher:
                     'similarity_score': min(final_score, 100)  # Cap at 100%
                 })
 
+        scored = time.perf_counter()
+
         # ترتيب النتائج
         matches = sorted(
             matches, key=lambda x: x['similarity_score'], reverse=True)
 
+        if timings is not None:
+            timings['cv_encode'] = cv_done - started
+            timings['job_encode'] = jobs_done - cv_done
+            # Cosine similarity is folded into ranking; keyword scoring is timed per job
+            timings['keyword_scoring'] = keyword_seconds
+            timings['ranking'] = (scored - jobs_done - keyword_seconds) + (time.perf_counter() - scored)
+            timings['jobs_scored'] = len(matches)
+
         return matches[:top_k]
 
     def _calculate_keyword_match(self, cv_text, job_text):
@@ -0,0 +1,200 @@
+"""
+LLM Gateway - shared async access to the Groq chat completions API
+Used by cv_classifier_service.py, cv_classifier_hybrid.py and cv_classifier_service_lite.py
+
+- One pooled httpx.AsyncClient per process (keep-alive connection reuse)
+- Strict connect/read timeouts so a slow LLM never hangs a request
+- Identical prompts that are already in flight share a single API call
+- Persistent response cache keyed by (model, prompt hash)
+
+Point GROQ_BASE_URL at llm_stub_server.py to run everything offline.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+from disk_cache import DiskCache
+from service_logging import current_request, get_logger
+
+logger = get_logger("llm_gateway")
+
+DEFAULT_BASE_URL = "https://api.groq.com/openai/v1"
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".cache", "llm_responses.sqlite3"
+)
+
+
+class LLMGateway:
+    """Async, cached and de-duplicated chat completions client"""
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        base_url: str = DEFAULT_BASE_URL,
+        timeout_seconds: float = 15.0,
+        connect_timeout_seconds: float = 3.0,
+        max_connections: int = 20,
+        cache_path: Optional[str] = DEFAULT_CACHE_PATH,
+        cache_ttl_seconds: Optional[float] = 7 * 24 * 3600,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout_seconds = timeout_seconds
+        self.connect_timeout_seconds = connect_timeout_seconds
+        self.max_connections = max_connections
+
+        self.cache = DiskCache(cache_path, table="llm_responses", ttl_seconds=cache_ttl_seconds) if cache_path else None
+
+        self._client = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"requests": 0, "cache_hits": 0, "coalesced": 0, "api_calls": 0, "errors": 0}
+
+    @property
+    def available(self) -> bool:
+        return HTTPX_AVAILABLE and bool(self.api_key)
+
+    def _get_client(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                timeout=httpx.Timeout(self.timeout_seconds, connect=self.connect_timeout_seconds),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self._client
+
+    @staticmethod
+    def cache_key(model: str, messages: List[dict], temperature: float, max_tokens: int) -> str:
+        """Key = model + sha256 of the full prompt and sampling parameters"""
+        payload = json.dumps(
+            {"messages": messages, "temperature": temperature, "max_tokens": max_tokens},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return f"{model}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+    async def chat(
+        self,
+        messages: List[dict],
+        model: str,
+        temperature: float = 0.2,
+        max_tokens: int = 512,
+        use_cache: bool = True,
+    ) -> Optional[str]:
+        """
+        Return the assistant message content, or None if the call failed.
+        Failures are never cached.
+        """
+        if not self.available:
+            return None
+
+        self.stats["requests"] += 1
+        key = self.cache_key(model, messages, temperature, max_tokens)
+
+        # Coalesce identical prompts that are already being answered (or looked up)
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            # SQLite calls run off the event loop so a slow disk does not stall other requests
+            if use_cache and self.cache is not None:
+                cached = await asyncio.to_thread(self.cache.get, key)
+                if cached is not None:
+                    self.stats["cache_hits"] += 1
+                    future.set_result(cached)
+                    return cached
+
+            content = await self._call_api(messages, model, temperature, max_tokens)
+            if content is not None and use_cache and self.cache is not None:
+                await asyncio.to_thread(self.cache.set, key, content)
+            future.set_result(content)
+            return content
+        except BaseException as e:
+            # Waiters get None instead of the cancellation/exception
+            if not future.done():
+                future.set_result(None)
+            if isinstance(e, Exception):
+                return None
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _call_api(self, messages, model, temperature, max_tokens) -> Optional[str]:
+        self.stats["api_calls"] += 1
+        started = time.perf_counter()
+        try:
+            response = await self._get_client().post(
+                "/chat/completions",
+                json={
+                    "model": model,
+                    "messages": messages,
+                    "temperature": temperature,
+                    "max_tokens": max_tokens,
+                },
+            )
+            response.raise_for_status()
+            data = response.json()
+            return data["choices"][0]["message"]["content"]
+        except Exception as e:
+            self.stats["errors"] += 1
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            logger.warning("LLM call failed after %.0fms: %s: %s", elapsed_ms, type(e).__name__, e)
+            return None
+        finally:
+            request = current_request()
+            if request is not None:
+                request.add_timing("llm_api", time.perf_counter() - started)
+
+    def get_stats(self) -> dict:
+        stats = dict(self.stats)
+        stats["inflight"] = len(self._inflight)
+        stats["cache_entries"] = len(self.cache) if self.cache is not None else 0
+        return stats
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_gateway: Optional[LLMGateway] = None
+
+
+def get_gateway() -> LLMGateway:
+    """Process-wide gateway configured from environment variables"""
+    global _gateway
+    if _gateway is None:
+        cache_path = os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH)
+        _gateway = LLMGateway(
+            api_key=os.getenv("GROQ_API_KEY"),
+            base_url=os.getenv("GROQ_BASE_URL", DEFAULT_BASE_URL),
+            timeout_seconds=float(os.getenv("LLM_TIMEOUT_SECONDS", "15")),
+            connect_timeout_seconds=float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "3")),
+            max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "20")),
+            cache_path=cache_path if cache_path.lower() != "off" else None,
+            cache_ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+        )
+        if not HTTPX_AVAILABLE:
+            print("⚠️ httpx not installed - LLM gateway disabled")
+        elif not _gateway.api_key:
+            print("⚠️ GROQ_API_KEY not found in environment variables")
+        else:
+            print(f"✅ LLM gateway ready ({_gateway.base_url})")
+    return _gateway
@@ -0,0 +1,124 @@
+"""
+LLM Stub Server - offline stand-in for the Groq chat completions API
+Returns canned, deterministic JSON answers so the classifier services
+can be exercised without network access or an API key.
+
+Usage:
+    python llm_stub_server.py --port 5099 --delay 0.5
+    $env:GROQ_BASE_URL = "http://127.0.0.1:5099/openai/v1"
+    $env:GROQ_API_KEY = "stub"
+
+GET /stats returns how many completions were actually served, which makes
+it easy to confirm that caching and in-flight de-duplication work.
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROLE_KEYWORDS = [
+    ("machine learning", "Machine Learning Engineer"),
+    ("data scien", "Data Scientist"),
+    ("kubernetes", "DevOps Engineer"),
+    ("react", "Frontend Developer"),
+    ("node", "Backend Developer"),
+    ("nurse", "Nurse"),
+    ("accounting", "Accountant"),
+]
+
+stats = {"completions": 0}
+stats_lock = threading.Lock()
+
+
+def guess_role(prompt: str) -> str:
+    prompt_lower = prompt.lower()
+    for keyword, role in ROLE_KEYWORDS:
+        if keyword in prompt_lower:
+            return role
+    return "Software Engineer"
+
+
+def build_answer(prompt: str) -> str:
+    role = guess_role(prompt)
+    if '"primary_role"' in prompt:
+        return json.dumps({
+            "primary_role": role,
+            "skills": [],
+            "experience_years": 0,
+            "languages": [],
+            "projects": [],
+            "recommended_categories": [role],
+        })
+    if '"job_title"' in prompt:
+        return json.dumps({"job_title": role, "confidence": 0.8, "reasoning": "stub response"})
+    return f"Stub analysis: the candidate looks like a good fit for a {role} role."
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    delay = 0.0
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            with stats_lock:
+                self._send_json(200, dict(stats))
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": "not found"})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        prompt = "\n".join(m.get("content", "") for m in request.get("messages", []))
+
+        if self.delay:
+            time.sleep(self.delay)
+
+        with stats_lock:
+            stats["completions"] += 1
+
+        self._send_json(200, {
+            "id": "stub-completion",
+            "object": "chat.completion",
+            "model": request.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": build_answer(prompt)},
+                "finish_reason": "stop",
+            }],
+        })
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline Groq API stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5099)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to wait before answering")
+    args = parser.parse_args()
+
+    StubHandler.delay = args.delay
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    print(f"🧪 LLM stub listening on http://{args.host}:{args.port}/openai/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,17 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
 import uvicorn
+import hashlib
 import pickle
 import io
 import os
+import time
+
+from metrics import REGISTRY, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from service_logging import get_logger, request_log
+import request_profiler
 
 from typing import Optional
 
@@ -28,8 +35,73 @@ except Exception:
     docx = None
 
 app = FastAPI(title="CV Job Matcher ML Service")
+logger = get_logger("matcher")
+request_profiler.install_fastapi(app, "matcher")
 
 MODEL_PATH = os.getenv("MODEL_PATH", "cv_job_matcher_final.pkl")
+MAX_JOBS_PER_REQUEST = 20
+
+# --- Metrics (served at /metrics) ---
+# No cache-hit counters: the matcher keeps no cache on the /match-jobs path,
+# every CV and job description is encoded per request
+STAGES = ("parse", "cv_encode", "job_encode", "keyword_scoring", "ranking", "serialization")
+STAGE_SECONDS = REGISTRY.histogram(
+    "matcher_stage_seconds", "Time spent in each stage of /match-jobs", labels=("stage",))
+REQUEST_SECONDS = REGISTRY.histogram(
+    "matcher_request_seconds", "End-to-end /match-jobs latency including body parsing")
+REQUESTS_TOTAL = REGISTRY.counter(
+    "matcher_requests_total", "/match-jobs requests by outcome", labels=("outcome",))
+JOBS_SCORED_TOTAL = REGISTRY.counter(
+    "matcher_jobs_scored_total", "Job descriptions scored against a CV")
+TRUNCATIONS_TOTAL = REGISTRY.counter(
+    "matcher_truncations_total", f"Requests with more than {MAX_JOBS_PER_REQUEST} jobs that were cut")
+JOBS_TRUNCATED_TOTAL = REGISTRY.counter(
+    "matcher_jobs_truncated_total", "Job descriptions dropped by the per-request limit")
+IN_FLIGHT = REGISTRY.gauge(
+    "matcher_requests_in_flight", "Matching requests accepted and not yet answered (queue depth)")
+IN_FLIGHT_PATHS = ("/predict", "/match-jobs")
+MODEL_INFO = REGISTRY.gauge(
+    "matcher_model_info", "Loaded matcher model; the value is always 1", labels=("version", "type"))
+MODEL_LOADED_AT = REGISTRY.gauge(
+    "matcher_model_loaded_timestamp_seconds", "Unix time the current model was loaded")
+
+
+def _model_version() -> str:
+    """Short content hash of the model file, or 'default' when running on plain BERT embeddings"""
+    if not os.path.exists(MODEL_PATH):
+        return "default"
+    digest = hashlib.sha256()
+    with open(MODEL_PATH, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def _record_model_loaded():
+    MODEL_INFO.clear()
+    MODEL_INFO.set(1, version=_model_version(), type=type(model).__name__)
+    MODEL_LOADED_AT.set(time.time())
+
+
+@app.middleware("http")
+async def track_in_flight(request: Request, call_next):
+    # Body reading and validation happen before the handler runs; the handler
+    # measures the parse stage from this timestamp
+    request.state.received_at = time.perf_counter()
+    # Only matching work is queue depth; scrapes and probes are not
+    if request.url.path not in IN_FLIGHT_PATHS:
+        return await call_next(request)
+    IN_FLIGHT.inc()
+    try:
+        return await call_next(request)
+    finally:
+        IN_FLIGHT.dec()
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text exposition of the matcher metrics"""
+    return Response(content=REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
 
 
 class PredictResponse(BaseModel):
@@ -86,6 +158,7 @@ def load_model():
             
             if hasattr(model, 'find_top_matches'):
                 print("✅ Model is ready for hybrid matching!")
+            _record_model_loaded()
             return
             
         except Exception as e:
@@ -102,6 +175,7 @@ def load_model():
     print(f"✅ Model loaded from {MODEL_PATH}")
     print(f"📊 Model type: {type(model).__name__}")
     print(f"📊 Model class: {type(model)}")
+    _record_model_loaded()
     
     # Check for required methods
     has_find_top_matches = hasattr(model, 'find_top_matches')
@@ -136,6 +210,7 @@ async def reload_model():
 
         with open(MODEL_PATH, "rb") as f:
             model = pickle.load(f)
+        _record_model_loaded()
 
         return {
             "success": True,
@@ -220,8 +295,32 @@ async def predict(file: UploadFile = File(...)):
         return JSONResponse(status_code=500, content={"success": False, "error": str(e)})
 
 
+def _match_response(matched_jobs, received_at, outcome, req):
+    """Serialize the response here so the serialization stage can be timed"""
+    started = time.perf_counter()
+    body = jsonable_encoder(MatchJobsResponse(success=True, matched_jobs=matched_jobs))
+    response = JSONResponse(content=body)
+    finished = time.perf_counter()
+    STAGE_SECONDS.observe(finished - started, stage="serialization")
+    REQUEST_SECONDS.observe(finished - received_at)
+    REQUESTS_TOTAL.inc(outcome=outcome)
+    req.add_timing("serialization", finished - started)
+    req.set(outcome=outcome, matched=len(matched_jobs))
+    return response
+
+
+def _record_match_timings(timings, job_count, req):
+    for stage in STAGES:
+        if stage in timings:
+            STAGE_SECONDS.observe(timings[stage], stage=stage)
+            req.add_timing(stage, timings[stage])
+    jobs_scored = timings.get("jobs_scored", job_count)
+    JOBS_SCORED_TOTAL.inc(jobs_scored)
+    req.set(jobs_scored=jobs_scored)
+
+
 @app.post("/match-jobs", response_model=MatchJobsResponse)
-async def match_jobs(request: MatchJobsRequest):
+async def match_jobs(request: MatchJobsRequest, http_request: Request):
     """
     Match CV with job descriptions using the ML model.
 
@@ -232,143 +331,121 @@ async def match_jobs(request: MatchJobsRequest):
     Output:
     - top 10 matched job IDs with scores
     """
-    try:
-        cv_text = request.cv_text
-        job_descriptions = [{"id": job.id, "description": job.description} for job in request.job_descriptions]
-        
-        print(f"\n{'='*60}")
-        print(f"🔍 NEW MATCH REQUEST RECEIVED")
-        print(f"📄 CV Text Length: {len(cv_text)} characters")
-        print(f"📄 CV Preview: {cv_text[:100]}...")
-        print(f"💼 Number of Jobs: {len(job_descriptions)}")
-
-        if not cv_text or not cv_text.strip():
-            raise HTTPException(status_code=400, detail="CV text is required")
-
-        if not job_descriptions or len(job_descriptions) == 0:
-            raise HTTPException(
-                status_code=400, detail="Job descriptions are required")
-
-        # Limit to 20 jobs as per model specification
-        jobs_to_match = job_descriptions[:20]
-
-        # Extract just the descriptions for the model
-        descriptions = [job.get('description', '') for job in jobs_to_match]
-        
-        print(f"💼 Job Descriptions being matched:")
-        for idx, desc in enumerate(descriptions[:5]):  # Show first 5
-            print(f"   Job {idx + 1}: {desc[:80]}...")
-        if len(descriptions) > 5:
-            print(f"   ... and {len(descriptions) - 5} more jobs")
-
-        # Call the model's find_top_matches method with hybrid matching
-        # Hybrid matching: 70% Semantic Similarity + 30% Keyword Matching
-        print(
-            f"🤖 Calling model.find_top_matches() with {len(descriptions)} job descriptions...")
-        print(f"   Using HYBRID matching: 70% Semantic + 30% Keyword")
-
-        # Try find_top_matches first (preferred method with hybrid matching)
-        if hasattr(model, 'find_top_matches'):
-            try:
-                # Call with hybrid matching enabled
-                result = model.find_top_matches(
-                    cv_text, 
-                    descriptions, 
-                    top_k=10, 
-                    use_hybrid=True
-                )
-                print(
-                    f"✅ Model returned result: {type(result)}, length: {len(result) if isinstance(result, (list, tuple)) else 'N/A'}")
-
-                # Result should be list of dicts with 'job_index' and 'similarity_score'
+    received_at = getattr(http_request.state, "received_at", time.perf_counter())
+    with request_log("match-jobs", logger, started=received_at) as req:
+        try:
+            cv_text = request.cv_text
+            job_descriptions = [{"id": job.id, "description": job.description} for job in request.job_descriptions]
+            req.set(cv_chars=len(cv_text), jobs=len(job_descriptions))
+
+            if not cv_text or not cv_text.strip():
+                raise HTTPException(status_code=400, detail="CV text is required")
+
+            if not job_descriptions or len(job_descriptions) == 0:
+                raise HTTPException(
+                    status_code=400, detail="Job descriptions are required")
+
+            # Limit to 20 jobs as per model specification
+            jobs_to_match = job_descriptions[:MAX_JOBS_PER_REQUEST]
+            if len(job_descriptions) > MAX_JOBS_PER_REQUEST:
+                TRUNCATIONS_TOTAL.inc()
+                JOBS_TRUNCATED_TOTAL.inc(len(job_descriptions) - MAX_JOBS_PER_REQUEST)
+                req.set(truncated=len(job_descriptions) - MAX_JOBS_PER_REQUEST)
+
+            # Extract just the descriptions for the model
+            descriptions = [job.get('description', '') for job in jobs_to_match]
+            parse_seconds = time.perf_counter() - received_at
+            STAGE_SECONDS.observe(parse_seconds, stage="parse")
+            req.add_timing("parse", parse_seconds)
+
+            # Try find_top_matches first (preferred method with hybrid matching)
+            if hasattr(model, 'find_top_matches'):
+                try:
+                    # Call with hybrid matching enabled; CVJobMatcher also reports per-stage timings
+                    timings = {}
+                    extra = {"timings": timings} if HAS_MATCHER_CLASS and isinstance(model, CVJobMatcher) else {}
+                    result = model.find_top_matches(
+                        cv_text, 
+                        descriptions, 
+                        top_k=10, 
+                        use_hybrid=True,
+                        **extra
+                    )
+                    _record_match_timings(timings, len(descriptions), req)
+
+                    # Result should be list of dicts with 'job_index' and 'similarity_score'
+                    matched_jobs = []
+
+                    if isinstance(result, (list, tuple)):
+                        for item in result[:10]:
+                            # Expected format: {'job_index': int, 'similarity_score': float}
+                            if isinstance(item, dict):
+                                job_idx = item.get('job_index')
+                                score = item.get('similarity_score', 0)
+                                if job_idx is not None and job_idx < len(jobs_to_match):
+                                    matched_jobs.append({
+                                        "job_id": jobs_to_match[job_idx].get('id'),
+                                        "score": float(score) / 100.0  # Convert percentage to 0-1 range
+                                    })
+                            # Fallback: if item is (index, score) tuple
+                            elif isinstance(item, (list, tuple)) and len(item) >= 2:
+                                job_idx, score = item[0], item[1]
+                                if job_idx < len(jobs_to_match):
+                                    matched_jobs.append({
+                                        "job_id": jobs_to_match[job_idx].get('id'),
+                                        "score": float(score) / 100.0 if score > 1 else float(score)
+                                    })
+
+                    if req.debug:
+                        for mj in matched_jobs:
+                            logger.debug("matched job_id=%s score=%.4f", mj["job_id"], mj["score"])
+                    return _match_response(matched_jobs, received_at, "ok", req)
+                except Exception as e:
+                    logger.warning("find_top_matches failed, falling back to predict: %s", e, exc_info=True)
+                    req.set(fallback_reason=type(e).__name__)
+
+            # Fallback to predict method if find_top_matches not available
+            if hasattr(model, 'predict'):
+                result = model.predict(cv_text, descriptions)
+
+                # Result should be list of indices (0-19) for top 10 matches
+                # Convert indices to job IDs with scores
                 matched_jobs = []
 
                 if isinstance(result, (list, tuple)):
-                    print(f"📊 Processing {len(result)} results from model...")
                     for idx, item in enumerate(result[:10]):
-                        # Expected format: {'job_index': int, 'similarity_score': float}
-                        if isinstance(item, dict):
-                            job_idx = item.get('job_index')
-                            score = item.get('similarity_score', 0)
-                            
-                            print(f"   Result {idx}: job_index={job_idx}, similarity_score={score}")
-                            
-                            if job_idx is not None and job_idx < len(jobs_to_match):
-                                final_score = float(score) / 100.0  # Convert percentage to 0-1 range
-                                matched_jobs.append({
-                                    "job_id": jobs_to_match[job_idx].get('id'),
-                                    "score": final_score
-                                })
-                                print(f"      → Mapped to job_id={jobs_to_match[job_idx].get('id')}, final_score={final_score}")
-                        # Fallback: if item is (index, score) tuple
+                        # If item is just an index
+                        if isinstance(item, int) and item < len(jobs_to_match):
+                            matched_jobs.append({
+                                "job_id": jobs_to_match[item].get('id'),
+                                "score": (100 - idx * 5) / 100  # Decreasing score
+                            })
+                        # If item is (index, score) tuple
                         elif isinstance(item, (list, tuple)) and len(item) >= 2:
                             job_idx, score = item[0], item[1]
-                            print(f"   Result {idx}: tuple format - job_idx={job_idx}, score={score}")
                             if job_idx < len(jobs_to_match):
-                                final_score = float(score) / 100.0 if score > 1 else float(score)
                                 matched_jobs.append({
                                     "job_id": jobs_to_match[job_idx].get('id'),
-                                    "score": final_score
+                                    "score": float(score)
                                 })
-                                print(f"      → Mapped to job_id={jobs_to_match[job_idx].get('id')}, final_score={final_score}")
-
-                print(f"✅ Matched {len(matched_jobs)} jobs with hybrid matching")
-                print(f"📊 Final matched jobs:")
-                for mj in matched_jobs:
-                    print(f"   - job_id={mj['job_id']}, score={mj['score']}")
-                return {
-                    "success": True,
-                    "matched_jobs": matched_jobs
-                }
-            except Exception as e:
-                print(f"⚠️ find_top_matches failed: {str(e)}")
-                print(f"   Error type: {type(e).__name__}")
-                import traceback
-                traceback.print_exc()
-                print(f"   Falling back to predict method...")
-        else:
-            print(f"⚠️ Model does not have find_top_matches method")
-            print(f"   Available methods: {[m for m in dir(model) if not m.startswith('_') and callable(getattr(model, m))]}")
-        
-        # Fallback to predict method if find_top_matches not available
-        if hasattr(model, 'predict'):
-            result = model.predict(cv_text, descriptions)
-            print(
-                f"✅ Model returned result: {type(result)}, length: {len(result) if isinstance(result, (list, tuple)) else 'N/A'}")
-
-            # Result should be list of indices (0-19) for top 10 matches
-            # Convert indices to job IDs with scores
-            matched_jobs = []
-
-            if isinstance(result, (list, tuple)):
-                for idx, item in enumerate(result[:10]):
-                    # If item is just an index
-                    if isinstance(item, int) and item < len(jobs_to_match):
-                        matched_jobs.append({
-                            "job_id": jobs_to_match[item].get('id'),
-                            "score": (100 - idx * 5) / 100  # Decreasing score
-                        })
-                    # If item is (index, score) tuple
-                    elif isinstance(item, (list, tuple)) and len(item) >= 2:
-                        job_idx, score = item[0], item[1]
-                        if job_idx < len(jobs_to_match):
-                            matched_jobs.append({
-                                "job_id": jobs_to_match[job_idx].get('id'),
-                                "score": float(score)
-                            })
 
-            return {
-                "success": True,
-                "matched_jobs": matched_jobs
-            }
-        else:
-            raise HTTPException(
-                status_code=500, detail="Model does not have predict or find_top_matches method")
-
-    except HTTPException as he:
-        raise he
-    except Exception as e:
-        return JSONResponse(status_code=500, content={"success": False, "error": str(e)})
+                JOBS_SCORED_TOTAL.inc(len(descriptions))
+                return _match_response(matched_jobs, received_at, "fallback", req)
+            else:
+                raise HTTPException(
+                    status_code=500, detail="Model does not have predict or find_top_matches method")
+
+        except HTTPException as he:
+            REQUESTS_TOTAL.inc(outcome="rejected")
+            req.status = "rejected"
+            req.set(http_status=he.status_code)
+            raise he
+        except Exception as e:
+            REQUESTS_TOTAL.inc(outcome="error")
+            req.status = "error"
+            req.set(error=type(e).__name__)
+            logger.exception("match-jobs failed")
+            return JSONResponse(status_code=500, content={"success": False, "error": str(e)})
 
 
 if __name__ == "__main__":
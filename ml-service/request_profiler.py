@@ -0,0 +1,310 @@
+"""
+Request Profiler - on-demand sampling profiles of single requests
+
+A background thread samples the call stack of the thread serving the
+request (plus any model-pool thread doing work for it, see track_thread)
+every PROFILE_INTERVAL_MS. The result is written as a collapsed-stack file
+(flamegraph.pl / speedscope import) or a speedscope JSON file.
+
+A request is profiled when:
+    - it carries `X-Profile: 1` (or `?profile=1`) together with
+      `X-Admin-Token: $PROFILE_ADMIN_TOKEN`; per-request profiling is off
+      while PROFILE_ADMIN_TOKEN is unset, or
+    - it is picked by PROFILE_SAMPLE_RATE (share of all requests, default 0)
+
+The response gets an `X-Profile-File` header; admins fetch the file from
+GET /debug/profiles/{name} with the same token.
+
+Environment:
+    PROFILE_ADMIN_TOKEN     token required for per-request profiling and downloads
+    PROFILE_SAMPLE_RATE     share of requests profiled automatically (default 0)
+    PROFILE_FORMAT          collapsed | speedscope (default speedscope; X-Profile-Format overrides)
+    PROFILE_INTERVAL_MS     sampling interval (default 5)
+    PROFILE_DIR             where profiles are written (default ml-service/.profiles)
+    PROFILE_MAX_FILES       oldest files are removed beyond this (default 200)
+
+On an async service other requests running on the same event loop show up
+in the samples too; profile under low load for clean attribution.
+"""
+
+import contextvars
+import hmac
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from typing import Optional
+
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_FORMAT = os.getenv("PROFILE_FORMAT", "speedscope").lower()
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = os.getenv(
+    "PROFILE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".profiles")
+)
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "200"))
+
+FORMATS = ("collapsed", "speedscope")
+MAX_STACK_DEPTH = 128
+
+_active_profile = contextvars.ContextVar("active_profile", default=None)
+_SAFE_NAME = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+class SamplingProfiler:
+    """Periodically records the stacks of a set of threads"""
+
+    def __init__(self, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.interval = interval_ms / 1000.0
+        self.stacks = Counter()
+        self.samples = 0
+        self.started_at = None
+        self.duration = 0.0
+        self._threads = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._labels = {}
+
+    def add_thread(self, thread_id: int):
+        with self._lock:
+            self._threads[thread_id] = self._threads.get(thread_id, 0) + 1
+
+    def remove_thread(self, thread_id: int):
+        with self._lock:
+            count = self._threads.get(thread_id, 0) - 1
+            if count > 0:
+                self._threads[thread_id] = count
+            else:
+                self._threads.pop(thread_id, None)
+
+    def start(self, thread_id: Optional[int] = None):
+        self.add_thread(thread_id or threading.get_ident())
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+        return self
+
+    def _frame(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = (code.co_name, code.co_filename, code.co_firstlineno)
+        return label
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                thread_ids = list(self._threads)
+            frames = sys._current_frames()
+            for thread_id in thread_ids:
+                frame = frames.get(thread_id)
+                stack = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    stack.append(self._frame(frame.f_code))
+                    frame = frame.f_back
+                if stack:
+                    self.stacks[tuple(reversed(stack))] += 1
+                    self.samples += 1
+
+    # --- Output ---------------------------------------------------------------------
+
+    def collapsed(self) -> str:
+        """One `root;...;leaf count` line per distinct stack"""
+        lines = []
+        for stack, count in self.stacks.most_common():
+            names = ";".join(f"{name} ({os.path.basename(path)}:{line})" for name, path, line in stack)
+            lines.append(f"{names} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name: str) -> dict:
+        """Speedscope 'sampled' profile; each distinct stack is one weighted sample"""
+        frame_index = {}
+        frames = []
+        samples = []
+        weights = []
+        interval_ms = self.interval * 1000
+        for stack, count in self.stacks.most_common():
+            indices = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                indices.append(frame_index[frame])
+            samples.append(indices)
+            weights.append(count * interval_ms)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "request_profiler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+
+@contextmanager
+def track_thread():
+    """Sample the current thread too while it works for a profiled request"""
+    profiler = _active_profile.get()
+    if profiler is None:
+        yield
+        return
+    thread_id = threading.get_ident()
+    profiler.add_thread(thread_id)
+    try:
+        yield
+    finally:
+        profiler.remove_thread(thread_id)
+
+
+def tracked(fn):
+    """Wrap a callable handed to a worker thread so track_thread() covers it"""
+    def run(*args, **kwargs):
+        with track_thread():
+            return fn(*args, **kwargs)
+    return run
+
+
+def is_admin(token: Optional[str]) -> bool:
+    return bool(PROFILE_ADMIN_TOKEN) and bool(token) and hmac.compare_digest(token, PROFILE_ADMIN_TOKEN)
+
+
+def wants_profile(headers, query) -> bool:
+    """Admin opt-in via header or query flag, else the global sample rate"""
+    flag = headers.get("X-Profile") or query.get("profile")
+    if flag and flag.lower() not in ("0", "false", "no") and is_admin(headers.get("X-Admin-Token")):
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+def output_format(headers, query) -> str:
+    fmt = (headers.get("X-Profile-Format") or query.get("profile_format") or PROFILE_FORMAT).lower()
+    return fmt if fmt in FORMATS else "speedscope"
+
+
+def write_profile(profiler: SamplingProfiler, service: str, path: str, fmt: str) -> str:
+    """Write the profile under PROFILE_DIR and return the file name"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    endpoint = _SAFE_NAME.sub("_", path.strip("/")) or "root"
+    base = f"{time.strftime('%Y%m%d-%H%M%S')}_{service}_{endpoint}_{uuid.uuid4().hex[:8]}"
+    if fmt == "collapsed":
+        name = base + ".collapsed.txt"
+        content = profiler.collapsed()
+    else:
+        name = base + ".speedscope.json"
+        content = json.dumps(profiler.speedscope(f"{service} {path} ({profiler.duration * 1000:.1f} ms)"))
+    with open(os.path.join(PROFILE_DIR, name), "w", encoding="utf-8") as f:
+        f.write(content)
+    _prune()
+    return name
+
+
+def _prune():
+    try:
+        names = sorted(os.listdir(PROFILE_DIR))
+    except OSError:
+        return
+    for name in names[:max(0, len(names) - PROFILE_MAX_FILES)]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, name))
+        except OSError:
+            pass
+
+
+def profile_path(name: str) -> Optional[str]:
+    """Path of a stored profile, None for unknown or unsafe names"""
+    if _SAFE_NAME.sub("", name) != name or name.startswith("."):
+        return None
+    path = os.path.join(PROFILE_DIR, name)
+    return path if os.path.isfile(path) else None
+
+
+# --- Framework hooks --------------------------------------------------------------------
+
+def install_fastapi(app, service: str):
+    """Profiling middleware plus GET /debug/profiles/{name} on a FastAPI app"""
+    from fastapi import HTTPException, Request
+    from fastapi.responses import FileResponse
+
+    @app.middleware("http")
+    async def profile_request(request: Request, call_next):
+        if not wants_profile(request.headers, request.query_params):
+            return await call_next(request)
+
+        fmt = output_format(request.headers, request.query_params)
+        profiler = SamplingProfiler().start()
+        token = _active_profile.set(profiler)
+        try:
+            response = await call_next(request)
+        finally:
+            _active_profile.reset(token)
+            profiler.stop()
+        response.headers["X-Profile-File"] = write_profile(profiler, service, request.url.path, fmt)
+        return response
+
+    @app.get("/debug/profiles/{name}")
+    async def download_profile(name: str, request: Request):
+        if not is_admin(request.headers.get("X-Admin-Token")):
+            raise HTTPException(status_code=403, detail="Admin token required")
+        path = profile_path(name)
+        if path is None:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        return FileResponse(path, filename=name)
+
+
+def install_flask(app, service: str):
+    """Profiling hooks plus GET /debug/profiles/<name> on a Flask app"""
+    from flask import abort, g, request, send_file
+
+    @app.before_request
+    def start_profile():
+        if wants_profile(request.headers, request.args):
+            g.profile_format = output_format(request.headers, request.args)
+            g.profiler = SamplingProfiler().start()
+
+    @app.after_request
+    def finish_profile(response):
+        profiler = g.pop("profiler", None)
+        if profiler is not None:
+            profiler.stop()
+            response.headers["X-Profile-File"] = write_profile(
+                profiler, service, request.path, g.pop("profile_format", PROFILE_FORMAT)
+            )
+        return response
+
+    @app.teardown_request
+    def abandon_profile(exc):
+        # after_request is skipped when the view raised
+        profiler = g.pop("profiler", None)
+        if profiler is not None:
+            profiler.stop()
+
+    @app.route("/debug/profiles/<name>", methods=["GET"])
+    def download_profile(name):
+        if not is_admin(request.headers.get("X-Admin-Token")):
+            abort(403)
+        path = profile_path(name)
+        if path is None:
+            abort(404)
+        return send_file(path, as_attachment=True, download_name=name)
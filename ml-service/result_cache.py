@@ -0,0 +1,133 @@
+"""
+Result Cache - bounded in-memory TTL/LRU cache with an optional disk tier
+
+Used for results that are expensive to compute and identical for the same
+inputs, e.g. skill-gap analysis keyed by (CV hash, job hash, model version).
+The memory tier is per process; the disk tier (SQLite, see disk_cache.py)
+survives restarts and is shared by all worker processes.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from disk_cache import DiskCache
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+class ResultCache:
+    """
+    JSON-serializable values with TTL and LRU eviction.
+
+    Values read from memory are shared between callers and must not be
+    mutated. The disk connection is opened lazily in the process that uses
+    it, so a cache created before a pre-fork server forks stays safe.
+    """
+
+    PRUNE_EVERY = 1000
+
+    def __init__(
+        self,
+        max_entries: int = 2000,
+        ttl_seconds: Optional[float] = None,
+        disk_path: Optional[str] = None,
+        table: str = "results",
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_path = disk_path
+        self.table = table
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+        self._disk_pid = None
+        self._disk_writes = 0
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "expired": 0, "disk_errors": 0}
+
+    def _get_disk(self) -> Optional[DiskCache]:
+        if not self.disk_path:
+            return None
+        if self._disk is None or self._disk_pid != os.getpid():
+            self._disk = DiskCache(self.disk_path, table=self.table, ttl_seconds=self.ttl_seconds)
+            self._disk_pid = os.getpid()
+        return self._disk
+
+    def _put_memory(self, key: str, value: Any, expires_at: Optional[float]):
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is not None and expires_at < time.time():
+                    del self._entries[key]
+                    self.stats["expired"] += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return value
+
+        try:
+            disk = self._get_disk()
+            raw = disk.get(key) if disk is not None else None
+        except Exception as e:
+            print(f"⚠️ Result cache disk read failed: {e}")
+            self.stats["disk_errors"] += 1
+            raw = None
+
+        if raw is None:
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+
+        value = json.loads(raw)
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds else None
+        self._put_memory(key, value, expires_at)
+        with self._lock:
+            self.stats["disk_hits"] += 1
+        return value
+
+    def set(self, key: str, value: Any):
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds else None
+        self._put_memory(key, value, expires_at)
+
+        try:
+            disk = self._get_disk()
+            if disk is not None:
+                disk.set(key, json.dumps(value))
+                self._disk_writes += 1
+                if self._disk_writes % self.PRUNE_EVERY == 0:
+                    disk.prune()
+        except Exception as e:
+            print(f"⚠️ Result cache disk write failed: {e}")
+            self.stats["disk_errors"] += 1
+
+    def clear(self):
+        """Drop the memory tier (disk entries are keyed by model version)"""
+        with self._lock:
+            self._entries.clear()
+
+    def info(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0
+        stats["max_entries"] = self.max_entries
+        stats["ttl_seconds"] = self.ttl_seconds
+        stats["disk"] = self.disk_path is not None
+        return stats
@@ -0,0 +1,119 @@
+"""
+Skill Analyzer production server - pre-fork multi-worker serving
+
+Runs skill_analyzer_service.app under gunicorn instead of the Flask
+development server:
+- tokenizer, skills list and raw weights are loaded once in the master
+  before forking, so workers share those pages copy-on-write
+- each worker builds its own Keras model after the fork (TensorFlow is
+  not fork-safe once its thread pools exist)
+- TF intra-op threads are split between workers so they do not oversubscribe
+  the CPU; inter-op is pinned to 1
+- a worker only accepts connections once its model is built, and /ready
+  reports the state of the worker answering
+
+gunicorn is POSIX only; on Windows the app is served by waitress in a
+single process with a thread pool.
+
+Environment:
+    PORT                   listen port (5003)
+    SKILL_WORKERS          worker processes (default: cores // 2, at least 1)
+    SKILL_THREADS          request threads per worker (2)
+    SKILL_TIMEOUT          worker timeout in seconds (120)
+    TF_INTRA_OP_THREADS    override the per-worker intra-op thread count
+    SKILL_MODEL_BACKEND    keras | savedmodel | tflite | auto (see skill_model_runtime)
+    SKILL_MODEL_ALLOW_QUANTIZED  let auto serve an int8 TFLite without recorded parity
+
+Usage:
+    python serve_skill_analyzer.py
+"""
+
+import os
+import sys
+
+import skill_analyzer_service
+import tf_runtime
+
+# Ensure UTF-8 stdout
+sys.stdout.reconfigure(encoding='utf-8')
+
+
+def worker_thread_budget(workers):
+    """Intra-op threads per worker so all workers together use each core once"""
+    override = os.getenv('TF_INTRA_OP_THREADS')
+    if override:
+        return int(override)
+    return max(1, (os.cpu_count() or 1) // workers)
+
+
+def post_worker_init(worker):
+    """Runs in each forked worker before it starts accepting requests"""
+    workers = worker.cfg.workers
+    intra = worker_thread_budget(workers)
+    # TFLite interpreters read the budget from the environment and
+    # do not need the TensorFlow runtime at all
+    os.environ['TF_INTRA_OP_THREADS'] = str(intra)
+    backend = skill_analyzer_service.resolve_model_backend()
+    if backend != 'tflite':
+        tf_runtime.configure(intra_op_threads=intra, inter_op_threads=1)
+    skill_analyzer_service.build_model()
+    # The raw arrays are now inside the worker's model; drop this copy
+    skill_analyzer_service.preloaded_weights = None
+    print(f"✅ Worker {worker.pid} ready (intra_op={intra}, inter_op=1)")
+
+
+def serve_gunicorn(host, port, workers, threads, timeout):
+    from gunicorn.app.base import BaseApplication
+
+    class SkillAnalyzerApplication(BaseApplication):
+        def __init__(self, application, options):
+            self.application = application
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return self.application
+
+    options = {
+        'bind': f'{host}:{port}',
+        'workers': workers,
+        'threads': threads,
+        'worker_class': 'gthread',
+        'timeout': timeout,
+        'preload_app': True,
+        'post_worker_init': post_worker_init,
+    }
+    SkillAnalyzerApplication(skill_analyzer_service.app, options).run()
+
+
+def serve_waitress(host, port, threads):
+    from waitress import serve
+
+    tf_runtime.configure()
+    skill_analyzer_service.build_model()
+    skill_analyzer_service.preloaded_weights = None
+    serve(skill_analyzer_service.app, host=host, port=port, threads=threads)
+
+
+if __name__ == '__main__':
+    port = int(os.environ.get('PORT', 5003))
+    host = os.environ.get('HOST', '0.0.0.0')
+    workers = int(os.environ.get('SKILL_WORKERS', max(1, (os.cpu_count() or 1) // 2)))
+    threads = int(os.environ.get('SKILL_THREADS', 2))
+    timeout = int(os.environ.get('SKILL_TIMEOUT', 120))
+
+    print("=" * 80)
+    print("🚀 Loading Skill Analyzer artifacts (shared by all workers)...")
+    print("=" * 80)
+    skill_analyzer_service.load_artifacts(preload_weights=True)
+
+    if sys.platform == 'win32':
+        print(f"\n🚀 Starting Skill Analyzer Service on port {port} (waitress, {threads * workers} threads)...")
+        serve_waitress(host, port, threads * workers)
+    else:
+        print(f"\n🚀 Starting Skill Analyzer Service on port {port} ({workers} workers x {threads} threads)...")
+        serve_gunicorn(host, port, workers, threads, timeout)
@@ -0,0 +1,202 @@
+"""
+Service logging - leveled, sampled, structured logs shared by the ML services
+
+One JSON object per line on stdout. Each request emits a single summary
+line (endpoint, status, duration, per-stage timings and a few counters)
+instead of per-item prints; debug detail is only emitted for a sampled
+fraction of requests.
+
+    from service_logging import get_logger, request_log
+    logger = get_logger("matcher")
+
+    with request_log("match-jobs", jobs=len(jobs)) as req:
+        with req.stage("cv_encode"):
+            ...
+        if req.debug:
+            logger.debug("top result %s -> %.2f", job_id, score)   # formatted only if emitted
+
+Environment:
+    LOG_LEVEL                    DEBUG | INFO | WARNING | ERROR (default INFO)
+    LOG_FORMAT                   json | text (default json)
+    LOG_DEBUG_SAMPLE_RATE        share of requests whose debug lines are kept (default 0.01)
+    LOG_SLOW_REQUEST_MS          requests slower than this are logged at WARNING (default 5000)
+"""
+
+import contextvars
+import json
+import logging
+import os
+import random
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Optional
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.01"))
+LOG_SLOW_REQUEST_MS = float(os.getenv("LOG_SLOW_REQUEST_MS", "5000"))
+_LEVEL = getattr(logging, LOG_LEVEL, logging.INFO)
+# Debug sampling only applies while INFO (or lower) is logged; a higher
+# LOG_LEVEL silences sampled debug detail too
+_DEBUG_SAMPLING = LOG_DEBUG_SAMPLE_RATE > 0 and logging.DEBUG < _LEVEL <= logging.INFO
+
+_current_request = contextvars.ContextVar("service_request_log", default=None)
+_configured = False
+
+# Attributes every LogRecord has; anything else came in through `extra`
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        request = getattr(record, "request_id", None) or _request_id()
+        if request:
+            entry["request_id"] = request
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and key != "request_id":
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _SampledDebugFilter(logging.Filter):
+    """
+    Records at or above LOG_LEVEL pass; debug records pass only for sampled
+    requests (service loggers sit at DEBUG while sampling is on) and only
+    when LOG_LEVEL is INFO or lower
+    """
+
+    def filter(self, record):
+        if record.levelno >= _LEVEL:
+            return True
+        if record.levelno > logging.DEBUG or _LEVEL > logging.INFO:
+            return False
+        request = _current_request.get()
+        return request is not None and request.debug
+
+
+def _request_id():
+    request = _current_request.get()
+    return request.request_id if request is not None else None
+
+
+def configure():
+    """Install the stdout handler on the root logger once per process"""
+    global _configured
+    if _configured:
+        return
+    _configured = True
+
+    handler = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == "text":
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    else:
+        handler.setFormatter(JsonFormatter())
+    handler.addFilter(_SampledDebugFilter())
+
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(_LEVEL)
+    # One line per outgoing HTTP call would drown the request summaries
+    for name in ("httpx", "httpcore"):
+        logging.getLogger(name).setLevel(max(root.level, logging.WARNING))
+
+
+def get_logger(name: str) -> logging.Logger:
+    configure()
+    logger = logging.getLogger(name)
+    # Service loggers stay at DEBUG while sampling is on; the filter drops unsampled
+    # records. Third-party loggers keep the root level.
+    if _DEBUG_SAMPLING:
+        logger.setLevel(logging.DEBUG)
+    return logger
+
+
+class RequestLog:
+    """Fields and stage timings collected for one request's summary line"""
+
+    def __init__(self, endpoint: str, request_id: Optional[str] = None, started: Optional[float] = None, **fields):
+        self.endpoint = endpoint
+        self.request_id = request_id or uuid.uuid4().hex[:12]
+        self.debug = _LEVEL <= logging.DEBUG or (_DEBUG_SAMPLING and random.random() < LOG_DEBUG_SAMPLE_RATE)
+        self.fields = dict(fields)
+        self.timings = {}
+        self.status = "ok"
+        self.started = started if started is not None else time.perf_counter()
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+    def add_timing(self, stage: str, seconds: float):
+        self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_timing(name, time.perf_counter() - started)
+
+    def summary(self) -> dict:
+        duration_ms = (time.perf_counter() - self.started) * 1000
+        entry = {
+            "event": "request",
+            "request_id": self.request_id,
+            "endpoint": self.endpoint,
+            "status": self.status,
+            "duration_ms": round(duration_ms, 2),
+        }
+        if self.timings:
+            entry["timings_ms"] = {stage: round(seconds * 1000, 2) for stage, seconds in self.timings.items()}
+        entry.update(self.fields)
+        return entry
+
+
+@contextmanager
+def request_log(endpoint: str, logger: Optional[logging.Logger] = None, request_id: Optional[str] = None,
+                started: Optional[float] = None, **fields):
+    """
+    Collect one request's summary and log it as a single line on exit.
+    `started` is a time.perf_counter() value when the request arrived earlier
+    than the handler. Nested calls (a server wrapping a module handler) share
+    the outer request.
+    """
+    outer = _current_request.get()
+    if outer is not None:
+        outer.set(**fields)
+        yield outer
+        return
+
+    logger = logger or get_logger("request")
+    request = RequestLog(endpoint, request_id, started, **fields)
+    token = _current_request.set(request)
+    try:
+        yield request
+    except Exception as e:
+        if request.status == "ok":
+            request.status = "error"
+            request.set(error=type(e).__name__)
+        raise
+    finally:
+        _current_request.reset(token)
+        summary = request.summary()
+        level = logging.INFO
+        if request.status == "error":
+            level = logging.ERROR
+        elif summary["duration_ms"] > LOG_SLOW_REQUEST_MS:
+            level = logging.WARNING
+        logger.log(level, "%s %s %.1fms", request.endpoint, request.status, summary["duration_ms"], extra=summary)
+
+
+def current_request() -> Optional[RequestLog]:
+    return _current_request.get()
@@ -4,55 +4,190 @@ Based on test_model.py
 """
 
 import sys
-import io
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+sys.stdout.reconfigure(encoding='utf-8')
 
 import numpy as np
 import pickle
 import json
 import os
-from tensorflow import keras
-from tensorflow.keras import layers, Model
-from tensorflow.keras.regularizers import l2
+import threading
+import time
+from collections import OrderedDict
 from urllib.parse import quote
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 
+from fast_tokenizer import CompiledTokenizer
+from skill_lexicon import SkillLexicon
+from result_cache import ResultCache, content_hash
+from service_logging import current_request, get_logger, request_log
+import request_profiler
+import skill_model_runtime
+
 app = Flask(__name__)
+logger = get_logger("skills")
+request_profiler.install_flask(app, "skills")
 CORS(app)
 
 # Global variables for model and artifacts
 tokenizer = None
+fast_tokenizer = None
 skills_list = None
+skill_lexicon = None
 model = None
+cv_encoder = None
+job_encoder = None
+skill_head = None
+model_backend = None
+model_version = None
+model_quantized = False
+skills_version = None
+preloaded_weights = None
+# keras | savedmodel | tflite | auto (prebuilt artifact if present, else keras)
+SKILL_MODEL_BACKEND = os.environ.get('SKILL_MODEL_BACKEND', 'auto')
+# auto serves an int8 TFLite artifact only with a passing recorded parity, or with this opt-in
+SKILL_MODEL_ALLOW_QUANTIZED = os.environ.get('SKILL_MODEL_ALLOW_QUANTIZED', '').lower() in ('1', 'true', 'yes')
 MAX_WORDS = 5000
 MAX_LEN = 128
+ENCODING_CACHE_SIZE = int(os.environ.get('SKILL_ENCODING_CACHE_SIZE', 5000))
 
-def load_model():
-    """Load model artifacts and rebuild architecture"""
-    global tokenizer, skills_list, model
+class EncodingCache:
+    """LRU cache of tower outputs (128-d vectors) keyed by text hash"""
     
-    print("=" * 80)
-    print("🚀 Loading CV-Job Matcher Model...")
-    print("=" * 80)
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key):
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+    
+    def put(self, key, vector):
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
     
-    # Get paths (look in last-one directory)
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def info(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+cv_encoding_cache = EncodingCache(ENCODING_CACHE_SIZE)
+job_encoding_cache = EncodingCache(ENCODING_CACHE_SIZE)
+
+# Finished pair results keyed by (CV hash, job hash, model version)
+_result_cache_path = os.environ.get('SKILL_RESULT_CACHE_PATH', os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '.cache', 'skill_results.sqlite3'
+))
+result_cache = ResultCache(
+    max_entries=int(os.environ.get('SKILL_RESULT_CACHE_SIZE', 2000)),
+    ttl_seconds=float(os.environ.get('SKILL_RESULT_CACHE_TTL_SECONDS', 24 * 3600)),
+    disk_path=_result_cache_path if _result_cache_path.lower() != 'off' else None,
+    table='skill_results',
+)
+
+def get_model_dir():
+    """Model artifacts live in the last-one directory next to ml-service"""
     base_dir = os.path.dirname(os.path.abspath(__file__))
     parent_dir = os.path.dirname(base_dir)
-    model_dir = os.path.join(parent_dir, 'last-one')
+    return os.path.join(parent_dir, 'last-one')
+
+def get_artifact_dir():
+    """Prebuilt model artifact (see build_skill_analyzer_artifact.py)"""
+    return os.environ.get('SKILL_MODEL_ARTIFACT') or os.path.join(
+        get_model_dir(), skill_model_runtime.ARTIFACT_DIRNAME
+    )
+
+def resolve_model_backend(backend=None):
+    """Backend that build_model would load, checked against the current .h5"""
+    return skill_model_runtime.resolve_backend(
+        backend or SKILL_MODEL_BACKEND,
+        get_artifact_dir(),
+        weights_path=os.path.join(get_model_dir(), 'cv_job_matcher_model.h5'),
+        allow_quantized=SKILL_MODEL_ALLOW_QUANTIZED,
+    )
+
+def read_h5_weights(weights_path):
+    """
+    Read layer weights from a Keras .h5 file as numpy arrays, without TensorFlow.
+    Returns one list of arrays per layer that has weights, in file order.
+    """
+    import h5py
+    
+    with h5py.File(weights_path, 'r') as f:
+        group = f['model_weights'] if 'model_weights' in f else f
+        layer_weights = []
+        for layer_name in group.attrs['layer_names']:
+            layer_name = layer_name.decode('utf8') if isinstance(layer_name, bytes) else layer_name
+            layer_group = group[layer_name]
+            weight_names = [
+                n.decode('utf8') if isinstance(n, bytes) else n
+                for n in layer_group.attrs.get('weight_names', [])
+            ]
+            if weight_names:
+                layer_weights.append([np.asarray(layer_group[n]) for n in weight_names])
+    return layer_weights
+
+def load_artifacts(preload_weights=False):
+    """
+    Load everything that does not need TensorFlow: tokenizer, skills list and
+    (optionally) the raw weights. A pre-fork server calls this once in the
+    master so workers share these pages copy-on-write.
+    """
+    global tokenizer, fast_tokenizer, skills_list, skill_lexicon, skills_version, preloaded_weights
+    
+    model_dir = get_model_dir()
     
     # Load tokenizer
     tokenizer_path = os.path.join(model_dir, 'tokenizer.pkl')
     with open(tokenizer_path, 'rb') as f:
         tokenizer = pickle.load(f)
     print(f"✅ Tokenizer loaded from {tokenizer_path}")
+    fast_tokenizer = CompiledTokenizer(tokenizer)
     
     # Load skills list
     skills_path = os.path.join(model_dir, 'skills_list.json')
     with open(skills_path, 'r', encoding='utf-8') as f:
         skills_list = json.load(f)
+    skill_lexicon = SkillLexicon(skills_list)
+    skills_version = content_hash(json.dumps(skills_list, ensure_ascii=False))[:16]
     print(f"✅ Skills list loaded ({len(skills_list)} skills)")
     
+    # Raw weights are only needed when the Keras graph is rebuilt
+    if preload_weights and resolve_model_backend() == 'keras':
+        weights_path = os.path.join(model_dir, 'cv_job_matcher_model.h5')
+        try:
+            preloaded_weights = read_h5_weights(weights_path)
+            print(f"✅ Raw weights preloaded from {weights_path}")
+        except Exception as e:
+            preloaded_weights = None
+            print(f"⚠️ Could not preload weights ({e}), workers will read the .h5")
+
+def build_keras_model():
+    """
+    Rebuild the architecture and load weights (initializes TensorFlow).
+    
+    Returns the full two-input model and its parts, which share its layers:
+    cv_encoder and job_encoder (text -> 128-d BiLSTM output) and skill_head
+    (256-d concatenation -> per-skill sigmoid).
+    """
+    from tensorflow.keras import layers, Model
+    from tensorflow.keras.regularizers import l2
+    
     # Rebuild model architecture
     print("🔧 Rebuilding model architecture...")
     cv_input = layers.Input(shape=(MAX_LEN,), name='cv_input')
@@ -63,83 +198,172 @@ def load_model():
     job_embed = layers.Embedding(MAX_WORDS, 64, mask_zero=True)(job_input)
     job_lstm = layers.Bidirectional(layers.LSTM(64, dropout=0.3))(job_embed)
     
+    head_layers = [
+        layers.Dense(256, activation='relu', kernel_regularizer=l2(0.001)),
+        layers.Dropout(0.4),
+        layers.Dense(128, activation='relu', kernel_regularizer=l2(0.001)),
+        layers.Dropout(0.3),
+        layers.Dense(len(skills_list), activation='sigmoid'),
+    ]
+    
+    def apply_head(x):
+        for layer in head_layers:
+            x = layer(x)
+        return x
+    
     concat = layers.Concatenate()([cv_lstm, job_lstm])
-    dense1 = layers.Dense(256, activation='relu', kernel_regularizer=l2(0.001))(concat)
-    dense1 = layers.Dropout(0.4)(dense1)
-    dense2 = layers.Dense(128, activation='relu', kernel_regularizer=l2(0.001))(dense1)
-    dense2 = layers.Dropout(0.3)(dense2)
-    output = layers.Dense(len(skills_list), activation='sigmoid')(dense2)
+    output = apply_head(concat)
     
-    model = Model(inputs=[cv_input, job_input], outputs=output)
+    built = Model(inputs=[cv_input, job_input], outputs=output)
     
-    # Load weights
-    weights_path = os.path.join(model_dir, 'cv_job_matcher_model.h5')
-    model.load_weights(weights_path)
-    print(f"✅ Model weights loaded from {weights_path}")
+    # Load weights (same layer order matching as Keras load_weights for .h5)
+    weighted_layers = [layer for layer in built.layers if layer.weights]
+    if preloaded_weights is not None and len(preloaded_weights) == len(weighted_layers):
+        for layer, arrays in zip(weighted_layers, preloaded_weights):
+            layer.set_weights(arrays)
+        print("✅ Model weights set from preloaded arrays")
+    else:
+        weights_path = os.path.join(get_model_dir(), 'cv_job_matcher_model.h5')
+        built.load_weights(weights_path)
+        print(f"✅ Model weights loaded from {weights_path}")
     
-    print("=" * 80)
-    print("✅ Model ready!")
-    print("=" * 80)
+    head_input = layers.Input(shape=(cv_lstm.shape[-1] + job_lstm.shape[-1],), name='pair_encoding')
+    
+    return (
+        built,
+        Model(inputs=cv_input, outputs=cv_lstm, name='cv_encoder'),
+        Model(inputs=job_input, outputs=job_lstm, name='job_encoder'),
+        Model(inputs=head_input, outputs=apply_head(head_input), name='skill_head'),
+    )
 
-def extract_skills_from_text(text, skills_list):
-    """Extract skills that are actually mentioned in text"""
-    text_lower = text.lower()
-    found_skills = []
+def build_model(backend=None):
+    """
+    Load the skill model with the configured backend. keras rebuilds the
+    architecture from the .h5, savedmodel and tflite load the prebuilt
+    artifact without re-declaring any layers.
+    """
+    global model, cv_encoder, job_encoder, skill_head, model_backend, model_version, model_quantized
+    
+    artifact_dir = get_artifact_dir()
+    backend = resolve_model_backend(backend)
+    manifest = skill_model_runtime.read_manifest(artifact_dir)
+    started = time.perf_counter()
     
-    for skill in skills_list:
-        skill_lower = skill.lower()
-        # Check if skill is mentioned in text
-        if skill_lower in text_lower:
-            found_skills.append(skill)
+    if backend == 'keras':
+        built, cv_model, job_model, head_model = build_keras_model()
+        model = built
+        cv_encoder = skill_model_runtime.KerasSubmodel(cv_model)
+        job_encoder = skill_model_runtime.KerasSubmodel(job_model)
+        skill_head = skill_model_runtime.KerasSubmodel(head_model)
+        model_version = skill_model_runtime.file_fingerprint(
+            os.path.join(get_model_dir(), 'cv_job_matcher_model.h5')
+        )
+    elif backend == 'savedmodel':
+        cv_encoder, job_encoder, skill_head, model = skill_model_runtime.load_savedmodel(artifact_dir, manifest)
+        model_version = manifest['model_version']
+    else:
+        num_threads = int(os.environ.get('TF_INTRA_OP_THREADS', 0)) or None
+        cv_encoder, job_encoder, skill_head = skill_model_runtime.load_tflite(artifact_dir, manifest, num_threads)
+        model = (cv_encoder, job_encoder, skill_head)
+        model_version = manifest['model_version']
+    
+    model_backend = backend
+    model_quantized = backend == 'tflite' and bool(manifest['formats']['tflite'].get('quantized'))
+    print(f"✅ Skill model ready ({backend}, version {model_version}) in {time.perf_counter() - started:.2f}s")
     
-    return found_skills
+    # Encodings of a previous model are not valid for the new weights
+    cv_encoding_cache.clear()
+    job_encoding_cache.clear()
+    result_cache.clear()
 
-def analyze_cv_job_match(cv_text, job_desc):
-    """Analyze CV and Job match, return missing skills"""
+def unload_model():
+    """Drop the TensorFlow models and their cached encodings"""
+    global model, cv_encoder, job_encoder, skill_head, model_backend
+    model = cv_encoder = job_encoder = skill_head = model_backend = None
+    cv_encoding_cache.clear()
+    job_encoding_cache.clear()
+
+def encode_texts(texts, encoder, cache):
+    """
+    Tower outputs for texts, shape (len(texts), 128).
+    Cached texts are reused; the rest go through the encoder in one batch.
+    """
+    keys = [CompiledTokenizer.text_key(text) for text in texts]
+    vectors = [cache.get(key) for key in keys]
     
-    # Get skills directly from job and CV
-    cv_skills = extract_skills_from_text(cv_text, skills_list)
-    job_skills = extract_skills_from_text(job_desc, skills_list)
+    missing = {}
+    for i, (key, vector) in enumerate(zip(keys, vectors)):
+        if vector is None:
+            missing.setdefault(key, []).append(i)
     
-    # Tokenize for neural network prediction
-    cv_seq = tokenizer.texts_to_sequences([cv_text])
-    job_seq = tokenizer.texts_to_sequences([job_desc])
+    if missing:
+        first = [positions[0] for positions in missing.values()]
+        padded = fast_tokenizer.texts_to_padded(
+            [texts[i] for i in first], MAX_LEN, padding='post', truncating='post'
+        )
+        encoded = encoder(padded)
+        for (key, positions), row in zip(missing.items(), encoded):
+            vector = row.copy()
+            vector.setflags(write=False)
+            cache.put(key, vector)
+            for i in positions:
+                vectors[i] = vector
     
-    cv_padded = keras.preprocessing.sequence.pad_sequences(
-        cv_seq, maxlen=MAX_LEN, padding='post', truncating='post'
-    )
-    job_padded = keras.preprocessing.sequence.pad_sequences(
-        job_seq, maxlen=MAX_LEN, padding='post', truncating='post'
-    )
+    return np.stack(vectors)
+
+def predict_skills(cv_vectors, job_vectors):
+    """Per-skill probabilities for aligned rows of CV and job encodings"""
+    pair = np.concatenate([cv_vectors, job_vectors], axis=1)
+    return skill_head(pair)
+
+def load_model():
+    """Load model artifacts and rebuild architecture"""
+    print("=" * 80)
+    print("🚀 Loading CV-Job Matcher Model...")
+    print("=" * 80)
     
-    # Get neural network predictions
-    predictions = model.predict([cv_padded, job_padded], verbose=0)[0]
+    load_artifacts()
+    build_model()
+    
+    print("=" * 80)
+    print("✅ Model ready!")
+    print("=" * 80)
+
+def extract_skills_from_text(text, skills_list):
+    """Extract skills that are actually mentioned in text"""
+    lexicon = skill_lexicon
+    if lexicon is None or lexicon.skills is not skills_list:
+        lexicon = SkillLexicon(skills_list)
+    return lexicon.extract(text)
+
+MAX_BATCH_SIZE = int(os.environ.get('SKILL_MAX_BATCH_SIZE', 200))
+
+def build_gap_result(cv_columns, job_columns, predictions):
+    """Skill-gap result of one CV/job pair from its skill columns and model output"""
+    cv_skills = [skills_list[idx] for idx in sorted(cv_columns)]
+    job_skills = [skills_list[idx] for idx in sorted(job_columns)]
     
     # Find missing skills (in job but not in CV)
     missing_skills = []
-    for skill in job_skills:
-        if skill not in cv_skills:
-            # Use neural network prediction as confidence
-            skill_idx = skills_list.index(skill) if skill in skills_list else -1
-            if skill_idx >= 0:
-                confidence = float(predictions[skill_idx]) if skill_idx < len(predictions) else 0.5
-            else:
-                confidence = 0.5
-            
-            # Determine priority
-            if confidence >= 0.7:
-                priority = "HIGH"
-            elif confidence >= 0.4:
-                priority = "MEDIUM"
-            else:
-                priority = "LOW"
-            
-            missing_skills.append({
-                'skill': skill,
-                'confidence': confidence,
-                'priority': priority,
-                'youtube': f"https://www.youtube.com/results?search_query={quote(f'{skill} tutorial')}"
-            })
+    for skill_idx in sorted(job_columns - cv_columns):
+        skill = skills_list[skill_idx]
+        # Use neural network prediction as confidence
+        confidence = float(predictions[skill_idx]) if skill_idx < len(predictions) else 0.5
+        
+        # Determine priority
+        if confidence >= 0.7:
+            priority = "HIGH"
+        elif confidence >= 0.4:
+            priority = "MEDIUM"
+        else:
+            priority = "LOW"
+        
+        missing_skills.append({
+            'skill': skill,
+            'confidence': confidence,
+            'priority': priority,
+            'youtube': f"https://www.youtube.com/results?search_query={quote(f'{skill} tutorial')}"
+        })
     
     # Sort by confidence and limit to top 15
     missing_skills = sorted(missing_skills, key=lambda x: x['confidence'], reverse=True)[:15]
@@ -154,39 +378,244 @@ def analyze_cv_job_match(cv_text, job_desc):
         'cv_skills': cv_skills,
         'job_skills': job_skills,
         'missing_skills': missing_skills,
-        'matched_skills': [s for s in job_skills if s in cv_skills],
+        'matched_skills': [skills_list[idx] for idx in sorted(job_columns & cv_columns)],
         'match_percentage': round(match_percentage, 2)
     }
 
+def analyze_cv_job_match(cv_text, job_desc):
+    """Analyze CV and Job match, return missing skills"""
+    return analyze_pairs([cv_text], [job_desc])[0]
+
+def result_cache_namespace():
+    """Results differ per backend, quantization, weights and skills list"""
+    precision = 'int8' if model_quantized else 'float'
+    return f"{model_backend}:{precision}:{model_version}:{skills_version}"
+
+def analyze_pairs(cv_texts, job_descs):
+    """
+    Skill gaps for many pairs at once. Either side may hold a single text,
+    which is paired with every text of the other side.
+    """
+    if len(cv_texts) == 1 and len(job_descs) > 1:
+        cv_texts = cv_texts * len(job_descs)
+    elif len(job_descs) == 1 and len(cv_texts) > 1:
+        job_descs = job_descs * len(cv_texts)
+    if len(cv_texts) != len(job_descs):
+        raise ValueError('cv_texts and job_descs must have the same length, or one of them a single entry')
+    
+    req = current_request()
+    started = time.perf_counter()
+    
+    # Serve pairs seen before from the result cache
+    hashes = {text: content_hash(text) for text in set(cv_texts) | set(job_descs)}
+    namespace = result_cache_namespace()
+    keys = [f"{namespace}:{hashes[c]}:{hashes[j]}" for c, j in zip(cv_texts, job_descs)]
+    results = [result_cache.get(key) for key in keys]
+    todo = [i for i, result in enumerate(results) if result is None]
+    if req is not None:
+        req.add_timing("cache_lookup", time.perf_counter() - started)
+        req.set(pairs=len(keys), cached=len(keys) - len(todo))
+    if not todo:
+        return results
+    cv_todo = [cv_texts[i] for i in todo]
+    job_todo = [job_descs[i] for i in todo]
+    
+    # Get skills directly from job and CV (one pass over each distinct text)
+    stage_started = time.perf_counter()
+    columns = {}
+    for text in set(cv_todo) | set(job_todo):
+        columns[text] = skill_lexicon.find_columns(text)
+    extracted = time.perf_counter()
+    
+    # Encode each distinct text once (cached), then one head call for all pairs
+    cv_vectors = encode_texts(cv_todo, cv_encoder, cv_encoding_cache)
+    job_vectors = encode_texts(job_todo, job_encoder, job_encoding_cache)
+    encoded = time.perf_counter()
+    
+    # Get neural network predictions
+    predictions = predict_skills(cv_vectors, job_vectors)
+    predicted = time.perf_counter()
+    
+    for i, cv_text, job_desc, row in zip(todo, cv_todo, job_todo, predictions):
+        results[i] = build_gap_result(columns[cv_text], columns[job_desc], row)
+        result_cache.set(keys[i], results[i])
+    
+    if req is not None:
+        req.add_timing("extract_skills", extracted - stage_started)
+        req.add_timing("encode", encoded - extracted)
+        req.add_timing("predict", predicted - encoded)
+        req.add_timing("build_results", time.perf_counter() - predicted)
+    
+    return results
+
+def summarize_missing_skills(results):
+    """How often each skill is missing across pairs, most common first"""
+    summary = {}
+    for result in results:
+        for missing in result['missing_skills']:
+            entry = summary.setdefault(missing['skill'], {
+                'skill': missing['skill'],
+                'count': 0,
+                'confidence_sum': 0.0,
+                'youtube': missing['youtube']
+            })
+            entry['count'] += 1
+            entry['confidence_sum'] += missing['confidence']
+    
+    total = len(results)
+    skills = []
+    for entry in summary.values():
+        skills.append({
+            'skill': entry['skill'],
+            'count': entry['count'],
+            'share': round(entry['count'] / total, 4) if total else 0,
+            'avg_confidence': entry['confidence_sum'] / entry['count'],
+            'youtube': entry['youtube']
+        })
+    return sorted(skills, key=lambda x: (x['count'], x['avg_confidence']), reverse=True)
+
+class BatchRequestError(ValueError):
+    """Invalid /analyze/batch body; the message is returned to the client"""
+
+def _batch_texts(data, many_key, one_key):
+    texts = data.get(many_key)
+    # A lone string is one text, not a list of characters
+    if isinstance(texts, str):
+        texts = [texts]
+    if not texts:
+        texts = [data[one_key]] if data.get(one_key) else []
+    if not isinstance(texts, list):
+        raise BatchRequestError(f'{many_key} must be a list of strings')
+    return texts
+
+def parse_batch_request(data):
+    """
+    Validate an /analyze/batch body.
+    Returns (cv_texts, job_descs, cv_ids, job_ids), raises BatchRequestError.
+    """
+    if not isinstance(data, dict):
+        raise BatchRequestError('Request body must be a JSON object')
+
+    cv_texts = _batch_texts(data, 'cv_texts', 'cv_text')
+    job_descs = _batch_texts(data, 'job_descs', 'job_desc')
+
+    if not cv_texts or not job_descs:
+        raise BatchRequestError('cv_text(s) and job_desc(s) are required')
+    if len(cv_texts) > 1 and len(job_descs) > 1:
+        raise BatchRequestError('Send one CV with many jobs, or many CVs with one job')
+    if not all(isinstance(t, str) and t for t in cv_texts + job_descs):
+        raise BatchRequestError('cv_texts and job_descs must be non-empty strings')
+    if max(len(cv_texts), len(job_descs)) > MAX_BATCH_SIZE:
+        raise BatchRequestError(f'At most {MAX_BATCH_SIZE} pairs per batch')
+
+    cv_ids = data.get('cv_ids') if isinstance(data.get('cv_ids'), list) else []
+    job_ids = data.get('job_ids') if isinstance(data.get('job_ids'), list) else []
+    return cv_texts, job_descs, cv_ids, job_ids
+
+def build_batch_response(cv_texts, job_descs, cv_ids, job_ids, results):
+    """The "data" payload of /analyze/batch for the results of analyze_pairs"""
+    items = []
+    for i, result in enumerate(results):
+        cv_index = i if len(cv_texts) > 1 else 0
+        job_index = i if len(job_descs) > 1 else 0
+        items.append({
+            'cv_index': cv_index,
+            'job_index': job_index,
+            'cv_id': cv_ids[cv_index] if cv_index < len(cv_ids) else None,
+            'job_id': job_ids[job_index] if job_index < len(job_ids) else None,
+            **result
+        })
+
+    return {
+        'mode': 'one_cv_many_jobs' if len(job_descs) > 1 else 'many_cvs_one_job' if len(cv_texts) > 1 else 'single',
+        'count': len(items),
+        'results': items,
+        'missing_skills_summary': summarize_missing_skills(results)
+    }
+
 @app.route('/analyze', methods=['POST'])
 def analyze():
     """API endpoint to analyze CV and Job match"""
-    try:
-        data = request.get_json()
-        
-        cv_text = data.get('cv_text', '')
-        job_desc = data.get('job_desc', '')
-        
-        if not cv_text or not job_desc:
+    with request_log("analyze", logger) as req:
+        try:
+            data = request.get_json()
+
+            cv_text = data.get('cv_text', '')
+            job_desc = data.get('job_desc', '')
+
+            req.set(cv_chars=len(cv_text), job_chars=len(job_desc))
+            if not cv_text or not job_desc:
+                req.status = "rejected"
+                return jsonify({
+                    'success': False,
+                    'message': 'cv_text and job_desc are required'
+                }), 400
+
+            if model is None:
+                req.status = "not_ready"
+                return jsonify({
+                    'success': False,
+                    'message': 'Model is still loading'
+                }), 503, {'Retry-After': '5'}
+
+            # Analyze
+            result = analyze_cv_job_match(cv_text, job_desc)
+
+            return jsonify({
+                'success': True,
+                'data': result
+            })
+
+        except Exception as e:
+            req.status = "error"
+            req.set(error=type(e).__name__)
+            logger.exception("Error in analyze endpoint: %s", e)
             return jsonify({
                 'success': False,
-                'message': 'cv_text and job_desc are required'
+                'message': str(e)
+            }), 500
+
+@app.route('/analyze/batch', methods=['POST'])
+def analyze_batch():
+    """
+    Batch skill-gap analysis.
+    Body: {"cv_text": ..., "job_descs": [...]} for one CV against many jobs, or
+          {"cv_texts": [...], "job_desc": ...} for many CVs against one job.
+    Optional "cv_ids" / "job_ids" are echoed back with each result.
+    """
+    with request_log("analyze/batch", logger) as req:
+        try:
+            cv_texts, job_descs, cv_ids, job_ids = parse_batch_request(request.get_json(silent=True) or {})
+
+            if model is None:
+                req.status = "not_ready"
+                return jsonify({
+                    'success': False,
+                    'message': 'Model is still loading'
+                }), 503, {'Retry-After': '5'}
+
+            results = analyze_pairs(cv_texts, job_descs)
+
+            return jsonify({
+                'success': True,
+                'data': build_batch_response(cv_texts, job_descs, cv_ids, job_ids, results)
+            })
+
+        except BatchRequestError as e:
+            req.status = "rejected"
+            return jsonify({
+                'success': False,
+                'message': str(e)
             }), 400
-        
-        # Analyze
-        result = analyze_cv_job_match(cv_text, job_desc)
-        
-        return jsonify({
-            'success': True,
-            'data': result
-        })
-        
-    except Exception as e:
-        print(f"❌ Error in analyze endpoint: {str(e)}")
-        return jsonify({
-            'success': False,
-            'message': str(e)
-        }), 500
+
+        except Exception as e:
+            req.status = "error"
+            req.set(error=type(e).__name__)
+            logger.exception("Error in analyze batch endpoint: %s", e)
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 500
 
 @app.route('/health', methods=['GET'])
 def health():
@@ -195,9 +624,23 @@ def health():
         'success': True,
         'message': 'Skill Analyzer Service is running',
         'model_loaded': model is not None,
-        'skills_count': len(skills_list) if skills_list else 0
+        'model_backend': model_backend,
+        'model_version': model_version,
+        'skills_count': len(skills_list) if skills_list else 0,
+        'encoding_cache': {
+            'cv': cv_encoding_cache.info(),
+            'job': job_encoding_cache.info()
+        },
+        'result_cache': result_cache.info()
     })
 
+@app.route('/ready', methods=['GET'])
+def ready():
+    """Readiness probe: 200 only once this process can serve /analyze"""
+    if model is None:
+        return jsonify({'ready': False}), 503
+    return jsonify({'ready': True, 'pid': os.getpid()})
+
 if __name__ == '__main__':
     # Load model on startup
     load_model()
@@ -0,0 +1,80 @@
+"""
+Skill Lexicon - one-pass skill extraction over a fixed skills list
+
+Built once from skills_list.json. Instead of a substring scan of the whole
+text per skill, the text is tokenized once and every token start is looked
+up in an index of skills keyed by their first token, so the cost of an
+extraction depends on the text length and not on the number of skills.
+
+Matches respect word boundaries ("java" does not match inside "javascript")
+and overlapping skills are all reported ("machine learning" also yields
+"machine" and "learning" when those are skills themselves).
+"""
+
+import re
+from typing import Dict, Iterable, List, Set
+
+# Token starts in the text: a run of word characters or a single symbol
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+def _first_token(skill: str) -> str:
+    match = _TOKEN.match(skill)
+    return match.group() if match else ""
+
+
+class SkillLexicon:
+    """Skill -> model column index, set membership and a single-pass matcher"""
+
+    def __init__(self, skills: Iterable[str]):
+        self.skills: List[str] = skills if isinstance(skills, list) else list(skills)
+
+        # First occurrence wins, like skills_list.index()
+        self.column: Dict[str, int] = {}
+        for idx, skill in enumerate(self.skills):
+            self.column.setdefault(skill, idx)
+
+        # first token -> [(lowercased skill, column, needs boundary after)]
+        self._by_first_token: Dict[str, List[tuple]] = {}
+        for skill, idx in self.column.items():
+            pattern = skill.lower().strip()
+            key = _first_token(pattern)
+            if not key:
+                continue
+            ends_in_word = bool(re.match(r"\w", pattern[-1]))
+            self._by_first_token.setdefault(key, []).append((pattern, idx, ends_in_word))
+
+    def __len__(self):
+        return len(self.skills)
+
+    def __contains__(self, skill: str) -> bool:
+        return skill in self.column
+
+    def index(self, skill: str) -> int:
+        """Model output column of a skill, -1 if unknown"""
+        return self.column.get(skill, -1)
+
+    def find_columns(self, text: str) -> Set[int]:
+        """Columns of all skills mentioned in text"""
+        text_lower = text.lower()
+        n = len(text_lower)
+        found = set()
+        lookup = self._by_first_token.get
+
+        for match in _TOKEN.finditer(text_lower):
+            candidates = lookup(match.group())
+            if not candidates:
+                continue
+            start = match.start()
+            for pattern, idx, ends_in_word in candidates:
+                if idx in found or not text_lower.startswith(pattern, start):
+                    continue
+                end = start + len(pattern)
+                if ends_in_word and end < n and (text_lower[end].isalnum() or text_lower[end] == "_"):
+                    continue
+                found.add(idx)
+        return found
+
+    def extract(self, text: str) -> List[str]:
+        """Skills mentioned in text, in skills list order"""
+        return [self.skills[idx] for idx in sorted(self.find_columns(text))]
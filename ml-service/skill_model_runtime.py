@@ -0,0 +1,178 @@
+"""
+Skill Model Runtime - interchangeable backends for the skill-analyzer submodels
+
+The skill analyzer runs three submodels: cv_encoder and job_encoder (padded
+token ids -> 128-d vector) and skill_head (256-d pair encoding -> per-skill
+sigmoid). They can be served from:
+- keras       architecture rebuilt in Python + weights from the .h5 (default)
+- savedmodel  prebuilt TensorFlow SavedModel, no architecture code needed
+- tflite      TFLite flatbuffers (optionally int8 dynamic-range quantized),
+              runs on tflite_runtime without TensorFlow when available
+
+The prebuilt artifacts come from build_skill_analyzer_artifact.py. Every
+backend is wrapped so that submodel(batch) returns a numpy array.
+"""
+
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+
+ARTIFACT_DIRNAME = 'skill_analyzer_artifact'
+MANIFEST_NAME = 'manifest.json'
+SUBMODELS = ('cv_encoder', 'job_encoder', 'skill_head')
+BACKENDS = ('keras', 'savedmodel', 'tflite')
+
+logger = logging.getLogger(__name__)
+
+
+def file_fingerprint(path, length=16):
+    """Short sha256 of a file, used as model version"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:length]
+
+
+def read_manifest(artifact_dir):
+    """Manifest of a built artifact, or None if there is none"""
+    if not artifact_dir:
+        return None
+    path = os.path.join(artifact_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _installed(module):
+    return importlib.util.find_spec(module) is not None
+
+
+def _tflite_usable(tflite_format):
+    # Flatbuffers with Select TF ops need the full TensorFlow (flex delegate)
+    if tflite_format.get('select_tf_ops'):
+        return _installed('tensorflow')
+    return _installed('tflite_runtime') or _installed('tensorflow')
+
+
+def _quantized_allowed(tflite_format, allow_quantized):
+    # int8 weights change the scores: serve them only on explicit opt-in or
+    # when the build script recorded a passing parity check
+    if not tflite_format.get('quantized') or allow_quantized:
+        return True
+    return bool(tflite_format.get('parity', {}).get('passed'))
+
+
+def resolve_backend(requested, artifact_dir, weights_path=None, allow_quantized=False):
+    """
+    Pick the backend to serve. "auto" prefers tflite, then savedmodel, and
+    falls back to keras when no usable artifact exists. An artifact built
+    from other weights than weights_path is never picked by "auto", and a
+    quantized TFLite only with allow_quantized or a passing recorded
+    parity. Does not import TensorFlow.
+    """
+    requested = (requested or 'auto').lower()
+    if requested not in BACKENDS + ('auto',):
+        raise ValueError(f"Unknown skill model backend '{requested}' (use {', '.join(BACKENDS)} or auto)")
+
+    manifest = read_manifest(artifact_dir)
+    formats = manifest.get('formats', {}) if manifest else {}
+
+    stale = False
+    if manifest and weights_path and os.path.exists(weights_path):
+        current = file_fingerprint(weights_path)
+        stale = manifest.get('model_version') != current
+        if stale:
+            logger.warning(
+                "Skill model artifact in %s was built from model version %s but %s is %s "
+                "(rebuild it with build_skill_analyzer_artifact.py)",
+                artifact_dir, manifest.get('model_version'), os.path.basename(weights_path), current,
+            )
+
+    if requested == 'auto':
+        if stale:
+            return 'keras'
+        if 'tflite' in formats and _tflite_usable(formats['tflite']):
+            if _quantized_allowed(formats['tflite'], allow_quantized):
+                return 'tflite'
+            logger.warning(
+                "Skipping quantized TFLite artifact without a passing parity check "
+                "(set SKILL_MODEL_ALLOW_QUANTIZED=1 to serve it anyway)"
+            )
+        if 'savedmodel' in formats and _installed('tensorflow'):
+            return 'savedmodel'
+        return 'keras'
+
+    if requested != 'keras' and requested not in formats:
+        raise FileNotFoundError(f"No {requested} artifact in {artifact_dir} (run build_skill_analyzer_artifact.py)")
+    return requested
+
+
+class KerasSubmodel:
+    def __init__(self, model):
+        self.model = model
+
+    def __call__(self, batch):
+        return self.model(batch, training=False).numpy()
+
+
+class SavedModelSubmodel:
+    def __init__(self, function):
+        self.function = function
+
+    def __call__(self, batch):
+        return self.function(batch).numpy()
+
+
+class TFLiteSubmodel:
+    """One interpreter per submodel; resized to the batch size on demand"""
+
+    def __init__(self, path, num_threads=None):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            from tensorflow.lite import Interpreter
+
+        self.interpreter = Interpreter(model_path=path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._shape = tuple(self._input['shape'])
+        # The interpreter holds mutable tensors, so calls are serialized
+        self._lock = threading.Lock()
+
+    def __call__(self, batch):
+        batch = np.ascontiguousarray(batch, dtype=self._input['dtype'])
+        with self._lock:
+            if batch.shape != self._shape:
+                self.interpreter.resize_tensor_input(self._input['index'], batch.shape)
+                self.interpreter.allocate_tensors()
+                self._shape = batch.shape
+            self.interpreter.set_tensor(self._input['index'], batch)
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self._output['index']).copy()
+
+
+def load_savedmodel(artifact_dir, manifest):
+    """(cv_encoder, job_encoder, skill_head, loaded object) from the SavedModel"""
+    import tensorflow as tf
+
+    path = os.path.join(artifact_dir, manifest['formats']['savedmodel']['path'])
+    loaded = tf.saved_model.load(path)
+    submodels = [SavedModelSubmodel(getattr(loaded, name)) for name in SUBMODELS]
+    return (*submodels, loaded)
+
+
+def load_tflite(artifact_dir, manifest, num_threads=None):
+    """(cv_encoder, job_encoder, skill_head) from the TFLite flatbuffers"""
+    files = manifest['formats']['tflite']['files']
+    return tuple(
+        TFLiteSubmodel(os.path.join(artifact_dir, files[name]), num_threads=num_threads)
+        for name in SUBMODELS
+    )
@@ -0,0 +1,81 @@
+"""
+TF Runtime - one TensorFlow configuration and one inference thread pool per process
+
+Every model served from the same process shares the TensorFlow runtime
+configured here and runs blocking inference on the same executor, instead
+of each service sizing its own thread pools.
+
+Environment:
+    TF_INTRA_OP_THREADS   threads used inside a single op (0 = TF default)
+    TF_INTER_OP_THREADS   ops executed in parallel (0 = TF default)
+    MODEL_THREAD_POOL_SIZE  workers running blocking inference calls
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from request_profiler import tracked
+
+_lock = threading.Lock()
+_configured = False
+_executor = None
+
+
+def configure(intra_op_threads=None, inter_op_threads=None):
+    """
+    Apply thread settings before the first TensorFlow op runs.
+    Safe to call more than once; only the first call has an effect.
+    """
+    global _configured
+    with _lock:
+        if _configured:
+            return
+        _configured = True
+
+        intra = intra_op_threads if intra_op_threads is not None else int(os.getenv("TF_INTRA_OP_THREADS", "0"))
+        inter = inter_op_threads if inter_op_threads is not None else int(os.getenv("TF_INTER_OP_THREADS", "0"))
+        if not intra and not inter:
+            return
+
+        try:
+            import tensorflow as tf
+            if intra:
+                tf.config.threading.set_intra_op_parallelism_threads(intra)
+            if inter:
+                tf.config.threading.set_inter_op_parallelism_threads(inter)
+            print(f"✅ TensorFlow threads: intra_op={intra or 'default'}, inter_op={inter or 'default'}")
+        except ImportError:
+            pass
+        except RuntimeError as e:
+            # Raised when the runtime was already initialized by an earlier import
+            print(f"⚠️ Could not set TensorFlow threads: {e}")
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Shared pool for blocking model calls"""
+    global _executor
+    with _lock:
+        if _executor is None:
+            size = int(os.getenv("MODEL_THREAD_POOL_SIZE", str(min(4, os.cpu_count() or 1))))
+            _executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="model")
+        return _executor
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """Run a blocking call on the shared pool without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    # Carry the caller's context (request log, active profile) into the worker thread
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(get_executor(), partial(context.run, tracked(fn), *args, **kwargs))
+
+
+def shutdown():
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
@@ -92,6 +92,12 @@ SAVE_CONFIG = {
     
     # حفظ أفضل نموذج فقط
     'save_best_only': True,
+
+    # مجلد الـ runs (كل تدريب في مجلد فرعي خاص به)
+    'runs_dir': 'runs',
+
+    # حفظ checkpoint كامل (للاستكمال بـ resume=) كل كم epoch
+    'checkpoint_every': 1,
 }
 
 # ═══════════════════════════════════════════════════════════════
@@ -105,6 +111,23 @@ PERFORMANCE_CONFIG = {
     # عدد الـ Workers للـ DataLoader
     # 0 = بدون multiprocessing، 2-4 = أسرع
     'num_workers': 0,
+
+    # تحميل كل الـ embeddings كـ tensors على الـ device وأخذ الـ batches كـ slices
+    # True = أسرع بكثير ⭐، False = CVJobDataset + DataLoader (يستخدم num_workers)
+    'tensor_resident_loader': True,
+
+    # عدد threads الـ CPU لـ torch (0 = الافتراضي = عدد الأنوية)
+    'num_threads': 0,
+
+    # وضع التدريب السريع: metrics على الـ tensors ومزامنة واحدة لكل epoch
+    # False = المسار المرجعي (fp32، مزامنة كل batch)
+    'fast_training': False,
+
+    # في وضع التدريب السريع فقط:
+    # bf16 autocast على الـ CPU (الـ loss يبقى fp32)
+    'bf16_autocast': True,
+    # torch.compile (PyTorch 2.0+، أول epoch أبطأ بسبب الـ compile)
+    'torch_compile': False,
     
     # حجم الـ Batch للـ Embeddings
     'embedding_batch_size': 32,
@@ -14,10 +14,20 @@ from sentence_transformers import SentenceTransformer, util
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+import json
 import pickle
+import random
+import time
+import uuid
 import warnings
+
+from embedding_store import EmbeddingStore, unique_texts
+from config import PERFORMANCE_CONFIG, SAVE_CONFIG
 warnings.filterwarnings('ignore')
 
+# ترتيب مصفوفات embeddings.npz داخل مجلد الـ run (= ترتيب مخرجات train_test_split)
+RUN_ARRAYS = ('cv_train', 'cv_val', 'job_train', 'job_val', 'y_train', 'y_val')
+
 
 class CVJobDataset(Dataset):
     """Dataset مخصص للسير الذاتية والوظائف"""
@@ -38,59 +48,101 @@ class CVJobDataset(Dataset):
         }
 
 
-class SiameseMatchingNetwork(nn.Module):
+class TensorBatchLoader:
     """
-    شبكة Siamese Network متقدمة لمطابقة السيرة الذاتية مع الوظائف
-    تستخدم Attention Mechanism و Residual Connections
+    DataLoader بديل: كل الـ embeddings في tensor-ين float32 متصلين (على الـ device)
+    والـ batch مجرد slice منهما - بدون tensor جديد لكل عينة وبدون collate.
+    الخلط = permutation واحدة لكل epoch.
+    يعطي نفس مفاتيح CVJobDataset: cv_embedding / job_embedding / label
     """
 
-    def __init__(self, embedding_dim=384, hidden_dims=[512, 256, 128], dropout=0.3):
-        super(SiameseMatchingNetwork, self).__init__()
+    def __init__(self, cv_embeddings, job_embeddings, labels, batch_size=32,
+                 shuffle=False, device='cpu', seed=None):
+        self.device = torch.device(device)
+        self.cv_embeddings = self._to_tensor(cv_embeddings)
+        self.job_embeddings = self._to_tensor(job_embeddings)
+        self.labels = self._to_tensor(labels).reshape(-1, 1)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.generator = None
+        if seed is not None:
+            self.generator = torch.Generator(device=self.device)
+            self.generator.manual_seed(seed)
+
+    def _to_tensor(self, array):
+        array = np.ascontiguousarray(array, dtype=np.float32)
+        return torch.from_numpy(array).to(self.device)
 
-        # CV Processing Branch
-        self.cv_branch = nn.Sequential(
-            nn.Linear(embedding_dim, hidden_dims[0]),
-            nn.BatchNorm1d(hidden_dims[0]),
-            nn.ReLU(),
-            nn.Dropout(dropout),
-
-            nn.Linear(hidden_dims[0], hidden_dims[1]),
-            nn.BatchNorm1d(hidden_dims[1]),
-            nn.ReLU(),
-            nn.Dropout(dropout),
+    def __len__(self):
+        return (len(self.labels) + self.batch_size - 1) // self.batch_size
+
+    def __iter__(self):
+        cv, job, labels = self.cv_embeddings, self.job_embeddings, self.labels
+        if self.shuffle:
+            # gather واحد لكل epoch، ثم الـ batches كلها views
+            order = torch.randperm(len(labels), device=self.device, generator=self.generator)
+            cv, job, labels = cv[order], job[order], labels[order]
+        for start in range(0, len(labels), self.batch_size):
+            end = start + self.batch_size
+            yield {
+                'cv_embedding': cv[start:end],
+                'job_embedding': job[start:end],
+                'label': labels[start:end]
+            }
+
+
+def configure_torch_threads(num_threads=None):
+    """عدد threads الـ CPU لعمليات torch (0 أو None = الافتراضي)"""
+    if num_threads is None:
+        num_threads = PERFORMANCE_CONFIG.get('num_threads', 0)
+    if num_threads:
+        torch.set_num_threads(num_threads)
+
+
+def make_loader(cv_embeddings, job_embeddings, labels, batch_size, shuffle=False,
+                device='cpu', seed=None):
+    """
+    Loader التدريب حسب PERFORMANCE_CONFIG:
+    tensor_resident_loader=True  -> TensorBatchLoader (الافتراضي)
+    tensor_resident_loader=False -> CVJobDataset + DataLoader بـ num_workers (المسار القديم)
+    """
+    if PERFORMANCE_CONFIG.get('tensor_resident_loader', True):
+        return TensorBatchLoader(cv_embeddings, job_embeddings, labels, batch_size,
+                                 shuffle=shuffle, device=device, seed=seed)
+    num_workers = PERFORMANCE_CONFIG.get('num_workers', 0)
+    return DataLoader(
+        CVJobDataset(cv_embeddings, job_embeddings, labels),
+        batch_size=batch_size, shuffle=shuffle, num_workers=num_workers,
+        pin_memory=torch.device(device).type == 'cuda',
+        persistent_workers=num_workers > 0)
 
-            nn.Linear(hidden_dims[1], hidden_dims[2]),
-            nn.BatchNorm1d(hidden_dims[2]),
-            nn.ReLU()
-        )
 
-        # Job Processing Branch
-        self.job_branch = nn.Sequential(
-            nn.Linear(embedding_dim, hidden_dims[0]),
-            nn.BatchNorm1d(hidden_dims[0]),
-            nn.ReLU(),
-            nn.Dropout(dropout),
+class SiameseMatchingNetwork(nn.Module):
+    """
+    شبكة Siamese Network متقدمة لمطابقة السيرة الذاتية مع الوظائف
+    تستخدم Attention Mechanism و Residual Connections
+    """
 
-            nn.Linear(hidden_dims[0], hidden_dims[1]),
-            nn.BatchNorm1d(hidden_dims[1]),
-            nn.ReLU(),
-            nn.Dropout(dropout),
+    def __init__(self, embedding_dim=384, hidden_dims=[512, 256, 128], dropout=0.3, attention_heads=4):
+        super(SiameseMatchingNetwork, self).__init__()
+        self.hidden_dims = list(hidden_dims)
 
-            nn.Linear(hidden_dims[1], hidden_dims[2]),
-            nn.BatchNorm1d(hidden_dims[2]),
-            nn.ReLU()
-        )
+        # CV / Job Processing Branches
+        # Linear -> BatchNorm -> ReLU (-> Dropout) لكل طبقة؛ أي عدد من الطبقات.
+        # مع [512, 256, 128] أسماء الطبقات مطابقة للنسخة القديمة (state_dict متوافق)
+        self.cv_branch = self._branch(embedding_dim, self.hidden_dims, dropout)
+        self.job_branch = self._branch(embedding_dim, self.hidden_dims, dropout)
 
         # Attention Layer
         self.attention = nn.MultiheadAttention(
-            embed_dim=hidden_dims[2],
-            num_heads=4,
+            embed_dim=self.hidden_dims[-1],
+            num_heads=attention_heads,
             dropout=dropout,
             batch_first=True
         )
 
         # Matching Network
-        combined_dim = hidden_dims[2] * 2
+        combined_dim = self.hidden_dims[-1] * 2
         self.matching_network = nn.Sequential(
             nn.Linear(combined_dim, 256),
             nn.BatchNorm1d(256),
@@ -111,6 +163,16 @@ class SiameseMatchingNetwork(nn.Module):
             nn.Sigmoid()
         )
 
+    @staticmethod
+    def _branch(input_dim, hidden_dims, dropout):
+        layers = []
+        for i, dim in enumerate(hidden_dims):
+            layers += [nn.Linear(input_dim, dim), nn.BatchNorm1d(dim), nn.ReLU()]
+            if i < len(hidden_dims) - 1:
+                layers.append(nn.Dropout(dropout))
+            input_dim = dim
+        return nn.Sequential(*layers)
+
     def forward(self, cv_embedding, job_embedding):
         # Process CV
         cv_features = self.cv_branch(cv_embedding)
@@ -140,10 +202,70 @@ class CVJobMatcher:
     نظام متكامل لمطابقة السيرة الذاتية مع الوظائف
     """
 
-    def __init__(self, model_name='all-MiniLM-L6-v2'):
+    # قائمة شاملة بالمهارات التقنية والكلمات المفتاحية (_calculate_keyword_match و evaluation_engine)
+    # التكرار مقصود كما هو ('javascript' و 'kotlin' مرتين) - يغير وزن الكلمة في النسبة
+    TECH_KEYWORDS = [
+        # Backend & Languages
+        'node.js', 'nodejs', 'express', 'express.js',
+        'python', 'java', 'javascript', 'typescript', 'php', 'c#', 'c++',
+        'ruby', 'go', 'golang', 'rust', 'scala', 'kotlin',
+
+        # Databases
+        'mongodb', 'mysql', 'postgresql', 'redis', 'sql', 'nosql',
+        'database', 'oracle', 'cassandra', 'dynamodb',
+
+        # Frontend
+        'react', 'vue', 'angular', 'next.js', 'nextjs',
+        'html', 'css', 'javascript', 'jquery', 'bootstrap',
+
+        # DevOps & Tools
+        'docker', 'kubernetes', 'jenkins', 'git', 'github', 'gitlab',
+        'ci/cd', 'aws', 'azure', 'gcp', 'nginx', 'apache',
+        'linux', 'unix', 'bash', 'shell',
+
+        # API & Architecture
+        'rest', 'restful', 'api', 'graphql', 'microservices',
+        'websocket', 'grpc', 'soap',
+
+        # Security & Auth
+        'jwt', 'oauth', 'authentication', 'authorization',
+        'security', 'encryption', 'ssl', 'tls',
+
+        # AI & Data Science
+        'machine learning', 'deep learning', 'tensorflow', 'pytorch',
+        'scikit-learn', 'pandas', 'numpy', 'computer vision',
+        'opencv', 'nlp', 'ai', 'artificial intelligence',
+
+        # Mobile
+        'react native', 'flutter', 'android', 'ios', 'swift',
+        'kotlin', 'mobile app',
+
+        # Testing & Quality
+        'testing', 'unit test', 'selenium', 'jest', 'pytest',
+        'qa', 'quality assurance', 'agile', 'scrum',
+
+        # Data & Analytics
+        'data analysis', 'power bi', 'tableau', 'excel',
+        'analytics', 'big data', 'hadoop', 'spark',
+
+        # Design & Marketing
+        'photoshop', 'illustrator', 'figma', 'ui/ux',
+        'seo', 'marketing', 'google ads',
+
+        # Network & Systems
+        'network', 'cisco', 'firewall', 'vpn', 'routing',
+        'cybersecurity', 'penetration testing', 'siem',
+
+        # Business & Management
+        'project management', 'hr', 'accounting', 'quickbooks',
+        'communication', 'leadership'
+    ]
+
+    def __init__(self, model_name='all-MiniLM-L6-v2', load_embedder=True):
         """
         تهيئة النموذج
         model_name: اسم نموذج Sentence Transformer
+        load_embedder=False: بدون تحميل الـ transformer (تدريب من embeddings محفوظة فقط)
         """
         print("🚀 جاري تحميل نموذج BERT...", file=sys.stderr, flush=True)
         self.device = torch.device(
@@ -158,86 +280,285 @@ class CVJobMatcher:
         os.environ.setdefault('HF_HUB_OFFLINE', '1')
 
         # تحميل Sentence Transformer
-        self.embedder = SentenceTransformer(model_name, cache_folder=cache_root)
-        self.embedding_dim = self.embedder.get_sentence_embedding_dimension()
+        self.model_name = model_name
+        self.embedder = None
+        self.embedding_dim = None
+        if load_embedder:
+            self.embedder = SentenceTransformer(model_name, cache_folder=cache_root)
+            self.embedding_dim = self.embedder.get_sentence_embedding_dimension()
 
         # تهيئة شبكة المطابقة
         self.matching_model = None
+        self.hidden_dims = [512, 256, 128]
         self.label_encoder = LabelEncoder()
 
-    def create_training_data(self, cvs_df, jobs_df, sample_size=10000):
+    def create_training_data(self, cvs_df, jobs_df, sample_size=10000, seed=42):
         """
         إنشاء بيانات التدريب بطريقة متوازنة
+
+        لكل CV مختار: مثال إيجابي (وظيفة عنوانها يحتوي فئة الـ CV) ومثال سلبي
+        (وظيفة من فئة مختلفة). الوظائف المطابقة لكل فئة تُحسب مرة واحدة فقط،
+        والاختيار العشوائي يتم دفعة واحدة بـ NumPy.
+        sample_size: الحد الأقصى لعدد الأمثلة (نصفها إيجابي ونصفها سلبي)، None = كل الـ CVs
+        seed: بذرة الاختيار العشوائي (نفس البذرة = نفس الأزواج)
         """
         print("\n📊 جاري إنشاء بيانات التدريب...")
 
-        training_data = []
-
-        # إنشاء أمثلة إيجابية (CV يتطابق مع فئته)
-        for idx, cv_row in cvs_df.iterrows():
-            category = cv_row['Category']
-            cv_text = cv_row['Resume']
+        rng = np.random.default_rng(seed)
+        categories = cvs_df['Category'].fillna('').astype(str)
+        cv_codes, distinct_categories = pd.factorize(categories)
+        job_titles = jobs_df['Job Title'].fillna('').astype(str).str.lower()
+        n_jobs = len(jobs_df)
 
-            # اختيار وظائف من نفس الفئة
-            matching_jobs = jobs_df[jobs_df['Job Title'].str.contains(
-                category, case=False, na=False)]
-
-            if len(matching_jobs) > 0:
-                # اختيار وظيفة عشوائية
-                job_row = matching_jobs.sample(1).iloc[0]
-                training_data.append({
-                    'cv': cv_text,
-                    'job': f"{job_row['Job Title']} {job_row['job_description_clean']}",
-                    'label': 1  # متطابق
-                })
-
-        # إنشاء أمثلة سلبية (CV لا يتطابق مع الفئة)
-        for idx, cv_row in cvs_df.iterrows():
-            category = cv_row['Category']
-            cv_text = cv_row['Resume']
-
-            # اختيار وظائف من فئة مختلفة
-            non_matching_jobs = jobs_df[~jobs_df['Job Title'].str.contains(
-                category, case=False, na=False)]
-
-            if len(non_matching_jobs) > 0:
-                job_row = non_matching_jobs.sample(1).iloc[0]
-                training_data.append({
-                    'cv': cv_text,
-                    'job': f"{job_row['Job Title']} {job_row['job_description_clean']}",
-                    'label': 0  # غير متطابق
-                })
-
-            if len(training_data) >= sample_size:
-                break
-
-        train_df = pd.DataFrame(training_data)
+        # فهارس الوظائف المطابقة لكل فئة (نص ثابت وليس regex)
+        matches = [
+            np.flatnonzero(job_titles.str.contains(category.lower(), regex=False).to_numpy())
+            for category in distinct_categories
+        ]
+        match_counts = np.array([len(m) for m in matches], dtype=np.int64)
+
+        # الـ CVs المؤهلة: لها وظيفة مطابقة (إيجابي) / وظيفة غير مطابقة (سلبي)
+        positive_rows = np.flatnonzero((cv_codes >= 0) & (match_counts[cv_codes] > 0))
+        negative_rows = np.flatnonzero((cv_codes >= 0) & (match_counts[cv_codes] < n_jobs))
+
+        if sample_size is not None:
+            n_positive = min(sample_size // 2, len(positive_rows))
+            n_negative = min(sample_size - n_positive, len(negative_rows))
+            positive_rows = np.sort(rng.choice(positive_rows, n_positive, replace=False))
+            negative_rows = np.sort(rng.choice(negative_rows, n_negative, replace=False))
+
+        positive_jobs = np.empty(len(positive_rows), dtype=np.int64)
+        negative_jobs = np.empty(len(negative_rows), dtype=np.int64)
+        positive_codes = cv_codes[positive_rows]
+        negative_codes = cv_codes[negative_rows]
+        for code, matched in enumerate(matches):
+            # إيجابي: عنصر عشوائي من الوظائف المطابقة
+            selected = np.flatnonzero(positive_codes == code)
+            if len(selected):
+                positive_jobs[selected] = matched[rng.integers(0, len(matched), len(selected))]
+
+            # سلبي: الترتيب k بين الوظائف غير المطابقة = k + عدد المطابقات التي تسبقه
+            selected = np.flatnonzero(negative_codes == code)
+            if len(selected):
+                k = rng.integers(0, n_jobs - len(matched), len(selected))
+                negative_jobs[selected] = k + np.searchsorted(
+                    matched - np.arange(len(matched)), k, side='right')
+
+        cv_texts = cvs_df['Resume'].to_numpy()
+        job_texts = (jobs_df['Job Title'].astype(str) + ' ' +
+                     jobs_df['job_description_clean'].astype(str)).to_numpy()
+        cv_ids = np.concatenate([positive_rows, negative_rows])
+        job_ids = np.concatenate([positive_jobs, negative_jobs])
+
+        train_df = pd.DataFrame({
+            'cv': cv_texts[cv_ids],
+            'job': job_texts[job_ids],
+            'label': np.concatenate([
+                np.ones(len(positive_rows), dtype=np.int64),   # متطابق
+                np.zeros(len(negative_rows), dtype=np.int64),  # غير متطابق
+            ]),
+            'cv_id': cv_ids,
+            'job_id': job_ids,
+        })
         print(f"✅ تم إنشاء {len(train_df)} عينة تدريب")
-        print(f"   - أمثلة إيجابية: {sum(train_df['label'] == 1)}")
-        print(f"   - أمثلة سلبية: {sum(train_df['label'] == 0)}")
+        print(f"   - أمثلة إيجابية: {len(positive_rows)}")
+        print(f"   - أمثلة سلبية: {len(negative_rows)}")
 
         return train_df
 
-    def prepare_embeddings(self, texts, batch_size=32):
+    def prepare_embeddings(self, texts, batch_size=32, cache_dir='embedding_cache'):
         """
         تحويل النصوص إلى embeddings
+        كل نص فريد يُحوَّل مرة واحدة ويُحفظ في cache_dir (None = بدون حفظ على القرص)
         """
         print(f"🔄 جاري تحويل {len(texts)} نص إلى embeddings...")
-        embeddings = self.embedder.encode(
+        if cache_dir is None:
+            unique, inverse = unique_texts(texts)
+            embeddings = self.embedder.encode(
+                unique,
+                batch_size=batch_size,
+                show_progress_bar=True,
+                convert_to_numpy=True
+            )
+            return embeddings[inverse]
+
+        store = EmbeddingStore(cache_dir, self.model_name, self.embedding_dim)
+        return store.encode(
             texts,
+            self.embedder.encode,
             batch_size=batch_size,
             show_progress_bar=True,
             convert_to_numpy=True
         )
-        return embeddings
 
-    def train(self, cvs_file, jobs_file, epochs=50, batch_size=32, learning_rate=0.001):
+    def _run_epoch(self, loader, criterion, optimizer=None):
         """
-        تدريب النموذج
+        Epoch مرجعي (eager fp32): تدريب إذا مُرر optimizer وإلا validation.
+        يرجع (متوسط الـ loss، الدقة %، عدد العينات)
         """
-        print("\n" + "="*60)
-        print("🎓 بدء عملية التدريب")
-        print("="*60)
+        total_loss = 0
+        correct = 0
+        total = 0
+
+        with torch.set_grad_enabled(optimizer is not None):
+            for batch in loader:
+                cv_emb = batch['cv_embedding'].to(self.device)
+                job_emb = batch['job_embedding'].to(self.device)
+                labels = batch['label'].float().to(self.device)
+
+                if optimizer is not None:
+                    optimizer.zero_grad()
+                outputs = self.matching_model(cv_emb, job_emb)
+                loss = criterion(outputs, labels)
+
+                if optimizer is not None:
+                    loss.backward()
+
+                    # Gradient Clipping
+                    torch.nn.utils.clip_grad_norm_(
+                        self.matching_model.parameters(), max_norm=1.0)
+
+                    optimizer.step()
+
+                total_loss += loss.item()
+                predictions = (outputs > 0.5).float()
+                correct += (predictions == labels).sum().item()
+                total += labels.size(0)
+
+        return total_loss / len(loader), 100 * correct / total, total
+
+    def _run_epoch_fast(self, loader, criterion, forward_model, optimizer=None, use_bf16=False):
+        """
+        نفس _run_epoch لكن:
+        - الـ forward تحت bf16 autocast (CPU) والـ loss بـ fp32
+        - الـ loss والدقة تتجمع كـ tensors، ومزامنة واحدة (.item) في نهاية الـ epoch
+        """
+        total_loss = torch.zeros((), device=self.device)
+        correct = torch.zeros((), dtype=torch.long, device=self.device)
+        total = 0
+
+        with torch.set_grad_enabled(optimizer is not None):
+            for batch in loader:
+                cv_emb = batch['cv_embedding'].to(self.device, non_blocking=True)
+                job_emb = batch['job_embedding'].to(self.device, non_blocking=True)
+                labels = batch['label'].float().to(self.device, non_blocking=True)
+
+                if optimizer is not None:
+                    optimizer.zero_grad(set_to_none=True)
+                with torch.autocast(device_type='cpu', dtype=torch.bfloat16, enabled=use_bf16):
+                    outputs = forward_model(cv_emb, job_emb)
+                outputs = outputs.float()
+                loss = criterion(outputs, labels)
+
+                if optimizer is not None:
+                    loss.backward()
+                    torch.nn.utils.clip_grad_norm_(
+                        self.matching_model.parameters(), max_norm=1.0)
+                    optimizer.step()
+
+                total_loss += loss.detach()
+                correct += ((outputs.detach() > 0.5) == labels.bool()).sum()
+                total += labels.size(0)
+
+        return total_loss.item() / len(loader), 100 * correct.item() / total, total
+
+    def _training_setup(self, compile_model=False, bf16=False):
+        """
+        تجهيز وضع التدريب السريع: يرجع (النموذج المستخدم في الـ forward، هل نستخدم bf16)
+        self.matching_model يبقى النموذج الأصلي (للحفظ والـ state_dict)
+        """
+        use_bf16 = bool(bf16) and self.device.type == 'cpu'
+        if use_bf16:
+            try:
+                with torch.autocast(device_type='cpu', dtype=torch.bfloat16):
+                    torch.ones(2, 2) @ torch.ones(2, 2)
+            except (RuntimeError, AttributeError) as e:
+                print(f"⚠️ bf16 autocast غير مدعوم هنا ({e}) - سيتم التدريب بـ fp32")
+                use_bf16 = False
+
+        forward_model = self.matching_model
+        if compile_model:
+            if hasattr(torch, 'compile'):
+                forward_model = torch.compile(self.matching_model)
+            else:
+                print("⚠️ torch.compile غير متاح (يحتاج PyTorch 2.0+) - سيتم التدريب بدونه")
+
+        print(f"⚡ وضع التدريب السريع: compile={forward_model is not self.matching_model}, "
+              f"bf16={use_bf16}, threads={torch.get_num_threads()}")
+        return forward_model, use_bf16
+
+    def _new_run_dir(self, runs_dir):
+        """مجلد جديد لكل عملية تدريب - لا تكتب عمليتان فوق checkpoints بعض"""
+        os.makedirs(runs_dir, exist_ok=True)
+        run_dir = os.path.join(runs_dir, f"{time.strftime('%Y%m%d-%H%M%S')}_{uuid.uuid4().hex[:6]}")
+        os.makedirs(run_dir)
+        return run_dir
+
+    @staticmethod
+    def _latest_run_dir(runs_dir):
+        runs = sorted(
+            name for name in os.listdir(runs_dir)
+            if os.path.exists(os.path.join(runs_dir, name, 'run_config.json'))
+        ) if os.path.isdir(runs_dir) else []
+        if not runs:
+            raise FileNotFoundError(f"لا توجد runs في {runs_dir} للاستكمال")
+        return os.path.join(runs_dir, runs[-1])
+
+    @staticmethod
+    def _atomic_save(save_fn, path):
+        """الكتابة في ملف مؤقت ثم rename - انقطاع أثناء الحفظ لا يفسد آخر checkpoint"""
+        tmp_path = path + '.tmp'
+        save_fn(tmp_path)
+        os.replace(tmp_path, path)
+
+    def _save_checkpoint(self, path, epoch, optimizer, scheduler, train_loader,
+                         best_val_acc, patience_counter, stopped):
+        checkpoint = {
+            'epoch': epoch,
+            'model_state': self.matching_model.state_dict(),
+            'optimizer_state': optimizer.state_dict(),
+            'scheduler_state': scheduler.state_dict(),
+            'best_val_acc': best_val_acc,
+            'patience_counter': patience_counter,
+            'stopped': stopped,
+            'rng_state': {
+                'python': random.getstate(),
+                'numpy': np.random.get_state(),
+                'torch': torch.get_rng_state(),
+                'cuda': torch.cuda.get_rng_state_all() if torch.cuda.is_available() else None,
+                'loader': train_loader.generator.get_state()
+                if getattr(train_loader, 'generator', None) is not None else None,
+            },
+        }
+        self._atomic_save(lambda tmp: torch.save(checkpoint, tmp), path)
+
+    def _load_checkpoint(self, path, optimizer, scheduler, train_loader):
+        # الـ checkpoint فيه حالة RNG الخاصة بـ numpy/python -> weights_only=False
+        checkpoint = torch.load(path, map_location=self.device, weights_only=False)
+        self.matching_model.load_state_dict(checkpoint['model_state'])
+        optimizer.load_state_dict(checkpoint['optimizer_state'])
+        scheduler.load_state_dict(checkpoint['scheduler_state'])
+
+        rng = checkpoint['rng_state']
+        random.setstate(rng['python'])
+        np.random.set_state(rng['numpy'])
+        torch.set_rng_state(rng['torch'])
+        if rng['cuda'] is not None and torch.cuda.is_available():
+            torch.cuda.set_rng_state_all(rng['cuda'])
+        if rng['loader'] is not None and getattr(train_loader, 'generator', None) is not None:
+            train_loader.generator.set_state(rng['loader'])
+        return checkpoint
+
+    def _prepare_run_data(self, run_dir, cvs_file, jobs_file, sample_size, seed, embedding_cache_dir):
+        """
+        بيانات التدريب والـ validation كـ embeddings جاهزة.
+        تُحفظ في <run_dir>/embeddings.npz - الاستكمال لا يقرأ الـ CSV ولا يحسب embeddings
+        """
+        embeddings_path = os.path.join(run_dir, 'embeddings.npz')
+        if os.path.exists(embeddings_path):
+            print(f"\n📦 تحميل الـ Embeddings المحفوظة من {embeddings_path}")
+            with np.load(embeddings_path) as data:
+                return tuple(data[key] for key in RUN_ARRAYS)
 
         # تحميل البيانات
         print("\n📂 جاري تحميل البيانات...")
@@ -248,37 +569,113 @@ class CVJobMatcher:
         print(f"✅ تم تحميل {len(jobs_df)} وظيفة")
 
         # إنشاء بيانات التدريب
-        train_df = self.create_training_data(cvs_df, jobs_df)
+        train_df = self.create_training_data(cvs_df, jobs_df, sample_size=sample_size, seed=seed)
 
         # تحضير Embeddings
         print("\n🔄 جاري تحضير Embeddings...")
-        cv_embeddings = self.prepare_embeddings(train_df['cv'].tolist())
-        job_embeddings = self.prepare_embeddings(train_df['job'].tolist())
+        cv_embeddings = self.prepare_embeddings(train_df['cv'].tolist(), cache_dir=embedding_cache_dir)
+        job_embeddings = self.prepare_embeddings(train_df['job'].tolist(), cache_dir=embedding_cache_dir)
 
-        # تقسيم البيانات
-        X_cv_train, X_cv_val, X_job_train, X_job_val, y_train, y_val = train_test_split(
+        # تقسيم البيانات (ترتيب المخرجات = RUN_ARRAYS)
+        arrays = train_test_split(
             cv_embeddings, job_embeddings, train_df['label'].values,
             test_size=0.2, random_state=42, stratify=train_df['label']
         )
 
+        def save_arrays(tmp_path):
+            # file object وليس مسار: np.savez يضيف .npz لأي مسار لا ينتهي بها
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, **dict(zip(RUN_ARRAYS, arrays)))
+        self._atomic_save(save_arrays, embeddings_path)
+        return tuple(arrays)
+
+    def train(self, cvs_file, jobs_file, epochs=50, batch_size=32, learning_rate=0.001,
+              sample_size=10000, seed=42, embedding_cache_dir='embedding_cache',
+              fast_training=None, compile_model=None, bf16=None, num_threads=None,
+              runs_dir=None, resume=None, checkpoint_every=None,
+              hidden_dims=None, dropout=None, run_dir=None):
+        """
+        تدريب النموذج
+
+        fast_training / compile_model / bf16 / num_threads: None = القيمة من PERFORMANCE_CONFIG.
+        fast_training=False هو المسار المرجعي (eager fp32، مزامنة كل batch).
+
+        كل تدريب له مجلد خاص <runs_dir>/<timestamp>_<id>/:
+            run_config.json      إعدادات التدريب
+            embeddings.npz       بيانات التدريب/الـ validation (embeddings)
+            checkpoint.pt        checkpoint كامل كل checkpoint_every epochs
+            best_matching_model.pth
+        resume: مسار مجلد run (أو True = آخر run) للاستكمال من نفس النقطة؛
+        إعدادات البيانات والتدريب تؤخذ من run_config.json، و epochs يمكن زيادته.
+        run_dir: مجلد run محدد بدل مجلد جديد (مثلاً مجهز مسبقاً بـ embeddings.npz كما في sweep.py)
+
+        hidden_dims / dropout: None = [512, 256, 128] / 0.3
+        """
+        print("\n" + "="*60)
+        print("🎓 بدء عملية التدريب")
+        print("="*60)
+
+        runs_dir = runs_dir or SAVE_CONFIG.get('runs_dir', 'runs')
+        if checkpoint_every is None:
+            checkpoint_every = SAVE_CONFIG.get('checkpoint_every', 1)
+
+        run_config = {
+            'cvs_file': cvs_file, 'jobs_file': jobs_file, 'model_name': self.model_name,
+            'batch_size': batch_size, 'learning_rate': learning_rate,
+            'sample_size': sample_size, 'seed': seed,
+            'hidden_dims': list(hidden_dims or [512, 256, 128]),
+            'dropout': 0.3 if dropout is None else dropout,
+        }
+        if resume:
+            run_dir = self._latest_run_dir(runs_dir) if resume is True else resume
+            with open(os.path.join(run_dir, 'run_config.json'), 'r', encoding='utf-8') as f:
+                saved_config = json.load(f)
+            if saved_config['model_name'] != self.model_name:
+                raise ValueError(f"الـ run {run_dir} مدرب على {saved_config['model_name']} "
+                                 f"وليس {self.model_name}")
+            run_config.update(saved_config)
+            batch_size = run_config['batch_size']
+            learning_rate = run_config['learning_rate']
+            seed = run_config['seed']
+            print(f"🔁 استكمال التدريب من: {run_dir}")
+        else:
+            if run_dir is None:
+                run_dir = self._new_run_dir(runs_dir)
+            else:
+                os.makedirs(run_dir, exist_ok=True)
+            with open(os.path.join(run_dir, 'run_config.json'), 'w', encoding='utf-8') as f:
+                json.dump(run_config, f, ensure_ascii=False, indent=2)
+            print(f"📁 مجلد التدريب: {run_dir}")
+        self.run_dir = run_dir
+        checkpoint_path = os.path.join(run_dir, 'checkpoint.pt')
+        best_model_path = os.path.join(run_dir, 'best_matching_model.pth')
+
+        X_cv_train, X_cv_val, X_job_train, X_job_val, y_train, y_val = self._prepare_run_data(
+            run_dir, run_config['cvs_file'], run_config['jobs_file'],
+            run_config['sample_size'], seed, embedding_cache_dir
+        )
+
+        if self.embedding_dim is None:
+            self.embedding_dim = X_cv_train.shape[1]
+
         print(f"\n📊 تقسيم البيانات:")
         print(f"   - Training: {len(y_train)} عينة")
         print(f"   - Validation: {len(y_val)} عينة")
 
-        # إنشاء DataLoaders
-        train_dataset = CVJobDataset(X_cv_train, X_job_train, y_train)
-        val_dataset = CVJobDataset(X_cv_val, X_job_val, y_val)
-
-        train_loader = DataLoader(
-            train_dataset, batch_size=batch_size, shuffle=True)
-        val_loader = DataLoader(val_dataset, batch_size=batch_size)
+        # إنشاء DataLoaders (الـ embeddings كاملة على الـ device، الـ batch = slice)
+        configure_torch_threads(num_threads)
+        train_loader = make_loader(X_cv_train, X_job_train, y_train, batch_size,
+                                   shuffle=True, device=self.device, seed=seed)
+        val_loader = make_loader(X_cv_val, X_job_val, y_val, batch_size,
+                                 device=self.device)
 
         # تهيئة النموذج
         print(f"\n🏗️ جاري بناء الشبكة العصبية...")
+        self.hidden_dims = run_config['hidden_dims']
         self.matching_model = SiameseMatchingNetwork(
             embedding_dim=self.embedding_dim,
-            hidden_dims=[512, 256, 128],
-            dropout=0.3
+            hidden_dims=self.hidden_dims,
+            dropout=run_config['dropout']
         ).to(self.device)
 
         # Loss و Optimizer
@@ -298,99 +695,95 @@ class CVJobMatcher:
         best_val_acc = 0
         patience = 10
         patience_counter = 0
+        start_epoch = 0
+
+        if resume and os.path.exists(checkpoint_path):
+            checkpoint = self._load_checkpoint(checkpoint_path, optimizer, scheduler, train_loader)
+            start_epoch = checkpoint['epoch'] + 1
+            best_val_acc = checkpoint['best_val_acc']
+            patience_counter = checkpoint['patience_counter']
+            print(f"✅ تم تحميل checkpoint: epoch {start_epoch}، أفضل دقة {best_val_acc:.2f}%")
+            if checkpoint['stopped']:
+                print("⚠️ هذا الـ run توقف بالـ Early Stopping - لا توجد epochs متبقية")
+                start_epoch = epochs
 
         # Training Loop
         print("\n" + "="*60)
         print("🚀 بدء التدريب...")
         print("="*60)
 
-        for epoch in range(epochs):
-            # Training
-            self.matching_model.train()
-            train_loss = 0
-            train_correct = 0
-            train_total = 0
-
-            for batch in train_loader:
-                cv_emb = batch['cv_embedding'].to(self.device)
-                job_emb = batch['job_embedding'].to(self.device)
-                labels = batch['label'].float().to(self.device)
-
-                optimizer.zero_grad()
-                outputs = self.matching_model(cv_emb, job_emb)
-                loss = criterion(outputs, labels)
-                loss.backward()
-
-                # Gradient Clipping
-                torch.nn.utils.clip_grad_norm_(
-                    self.matching_model.parameters(), max_norm=1.0)
+        if fast_training is None:
+            fast_training = PERFORMANCE_CONFIG.get('fast_training', False)
+        if fast_training:
+            forward_model, use_bf16 = self._training_setup(
+                PERFORMANCE_CONFIG.get('torch_compile', False) if compile_model is None else compile_model,
+                PERFORMANCE_CONFIG.get('bf16_autocast', True) if bf16 is None else bf16)
 
-                optimizer.step()
+        for epoch in range(start_epoch, epochs):
+            epoch_start = time.perf_counter()
 
-                train_loss += loss.item()
-                predictions = (outputs > 0.5).float()
-                train_correct += (predictions == labels).sum().item()
-                train_total += labels.size(0)
-
-            train_acc = 100 * train_correct / train_total
-            avg_train_loss = train_loss / len(train_loader)
+            # Training
+            self.matching_model.train()
+            if fast_training:
+                avg_train_loss, train_acc, train_total = self._run_epoch_fast(
+                    train_loader, criterion, forward_model, optimizer, use_bf16)
+            else:
+                avg_train_loss, train_acc, train_total = self._run_epoch(
+                    train_loader, criterion, optimizer)
+            train_time = time.perf_counter() - epoch_start
 
             # Validation
             self.matching_model.eval()
-            val_loss = 0
-            val_correct = 0
-            val_total = 0
-
-            with torch.no_grad():
-                for batch in val_loader:
-                    cv_emb = batch['cv_embedding'].to(self.device)
-                    job_emb = batch['job_embedding'].to(self.device)
-                    labels = batch['label'].float().to(self.device)
-
-                    outputs = self.matching_model(cv_emb, job_emb)
-                    loss = criterion(outputs, labels)
-
-                    val_loss += loss.item()
-                    predictions = (outputs > 0.5).float()
-                    val_correct += (predictions == labels).sum().item()
-                    val_total += labels.size(0)
-
-            val_acc = 100 * val_correct / val_total
-            avg_val_loss = val_loss / len(val_loader)
+            if fast_training:
+                avg_val_loss, val_acc, _ = self._run_epoch_fast(
+                    val_loader, criterion, forward_model, use_bf16=use_bf16)
+            else:
+                avg_val_loss, val_acc, _ = self._run_epoch(val_loader, criterion)
+            epoch_time = time.perf_counter() - epoch_start
 
             # Print Progress
             print(f"Epoch [{epoch+1}/{epochs}]")
             print(
                 f"  Train Loss: {avg_train_loss:.4f} | Train Acc: {train_acc:.2f}%")
             print(f"  Val Loss: {avg_val_loss:.4f} | Val Acc: {val_acc:.2f}%")
+            print(f"  ⏱️ {epoch_time:.2f}s | {train_total / train_time:,.0f} عينة/ثانية")
             print("-" * 60)
 
             # Learning Rate Scheduling
             scheduler.step(val_acc)
 
             # Early Stopping & Model Saving
+            stopped = False
             if val_acc > best_val_acc:
                 best_val_acc = val_acc
                 patience_counter = 0
                 # حفظ أفضل نموذج
-                torch.save(self.matching_model.state_dict(),
-                           'best_matching_model.pth')
+                self._atomic_save(
+                    lambda tmp: torch.save(self.matching_model.state_dict(), tmp), best_model_path)
                 print(
                     f"✅ تم حفظ أفضل نموذج! Validation Accuracy: {val_acc:.2f}%\n")
             else:
                 patience_counter += 1
-                if patience_counter >= patience:
-                    print(
-                        f"\n⚠️ Early Stopping! لم يتحسن النموذج منذ {patience} epochs")
-                    break
+                stopped = patience_counter >= patience
+
+            # Checkpoint كامل (دائماً عند آخر epoch أو عند التوقف)
+            if stopped or epoch + 1 == epochs or (epoch + 1) % checkpoint_every == 0:
+                self._save_checkpoint(checkpoint_path, epoch, optimizer, scheduler, train_loader,
+                                      best_val_acc, patience_counter, stopped)
+
+            if stopped:
+                print(
+                    f"\n⚠️ Early Stopping! لم يتحسن النموذج منذ {patience} epochs")
+                break
 
         # تحميل أفضل نموذج
         self.matching_model.load_state_dict(
-            torch.load('best_matching_model.pth'))
+            torch.load(best_model_path, map_location=self.device))
 
         print("\n" + "="*60)
         print(f"✅ انتهى التدريب!")
         print(f"🏆 أفضل دقة: {best_val_acc:.2f}%")
+        print(f"📁 الملفات في: {run_dir}")
         print("="*60)
 
         return best_val_acc
@@ -460,69 +853,11 @@ class CVJobMatcher:
         cv_lower = cv_text.lower()
         job_lower = job_text.lower()
 
-        # قائمة شاملة بالمهارات التقنية والكلمات المفتاحية
-        tech_keywords = [
-            # Backend & Languages
-            'node.js', 'nodejs', 'express', 'express.js',
-            'python', 'java', 'javascript', 'typescript', 'php', 'c#', 'c++',
-            'ruby', 'go', 'golang', 'rust', 'scala', 'kotlin',
-
-            # Databases
-            'mongodb', 'mysql', 'postgresql', 'redis', 'sql', 'nosql',
-            'database', 'oracle', 'cassandra', 'dynamodb',
-
-            # Frontend
-            'react', 'vue', 'angular', 'next.js', 'nextjs',
-            'html', 'css', 'javascript', 'jquery', 'bootstrap',
-
-            # DevOps & Tools
-            'docker', 'kubernetes', 'jenkins', 'git', 'github', 'gitlab',
-            'ci/cd', 'aws', 'azure', 'gcp', 'nginx', 'apache',
-            'linux', 'unix', 'bash', 'shell',
-
-            # API & Architecture
-            'rest', 'restful', 'api', 'graphql', 'microservices',
-            'websocket', 'grpc', 'soap',
-
-            # Security & Auth
-            'jwt', 'oauth', 'authentication', 'authorization',
-            'security', 'encryption', 'ssl', 'tls',
-
-            # AI & Data Science
-            'machine learning', 'deep learning', 'tensorflow', 'pytorch',
-            'scikit-learn', 'pandas', 'numpy', 'computer vision',
-            'opencv', 'nlp', 'ai', 'artificial intelligence',
-
-            # Mobile
-            'react native', 'flutter', 'android', 'ios', 'swift',
-            'kotlin', 'mobile app',
-
-            # Testing & Quality
-            'testing', 'unit test', 'selenium', 'jest', 'pytest',
-            'qa', 'quality assurance', 'agile', 'scrum',
-
-            # Data & Analytics
-            'data analysis', 'power bi', 'tableau', 'excel',
-            'analytics', 'big data', 'hadoop', 'spark',
-
-            # Design & Marketing
-            'photoshop', 'illustrator', 'figma', 'ui/ux',
-            'seo', 'marketing', 'google ads',
-
-            # Network & Systems
-            'network', 'cisco', 'firewall', 'vpn', 'routing',
-            'cybersecurity', 'penetration testing', 'siem',
-
-            # Business & Management
-            'project management', 'hr', 'accounting', 'quickbooks',
-            'communication', 'leadership'
-        ]
-
         # حساب عدد الكلمات المفتاحية المشتركة
         matched_keywords = 0
         total_job_keywords = 0
 
-        for keyword in tech_keywords:
+        for keyword in self.TECH_KEYWORDS:
             if keyword in job_lower:
                 total_job_keywords += 1
                 if keyword in cv_lower:
@@ -543,7 +878,9 @@ class CVJobMatcher:
         model_data = {
             'matching_model_state': self.matching_model.state_dict(),
             'embedding_dim': self.embedding_dim,
+            'hidden_dims': self.hidden_dims,
             'embedder_name': self.embedder._model_config.get('_name_or_path', 'all-MiniLM-L6-v2')
+            if self.embedder is not None else self.model_name
         }
 
         with open(path, 'wb') as f:
@@ -559,8 +896,10 @@ class CVJobMatcher:
             model_data = pickle.load(f)
 
         self.embedding_dim = model_data['embedding_dim']
+        # النماذج القديمة لا تحفظ hidden_dims
+        self.hidden_dims = model_data.get('hidden_dims', [512, 256, 128])
         self.matching_model = SiameseMatchingNetwork(
-            embedding_dim=self.embedding_dim).to(self.device)
+            embedding_dim=self.embedding_dim, hidden_dims=self.hidden_dims).to(self.device)
         self.matching_model.load_state_dict(model_data['matching_model_state'])
         self.matching_model.eval()
 
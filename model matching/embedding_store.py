@@ -0,0 +1,114 @@
+"""
+مخزن Embeddings على القرص (memory-mapped)
+يحفظ embedding كل نص فريد مرة واحدة، بمفتاح = hash النص، في مجلد خاص بكل نموذج
+
+    store = EmbeddingStore('embedding_cache', 'all-MiniLM-L6-v2', dim=384)
+    embeddings = store.encode(texts, embedder.encode)   # shape: (len(texts), dim)
+
+تشغيل التدريب مرة ثانية (بإعدادات مختلفة) يقرأ الـ embeddings من القرص
+ولا يستدعي الـ transformer إطلاقاً.
+
+الملفات داخل <root>/<model>/:
+    vectors.f32   مصفوفة float32 بحجم (عدد النصوص, dim) - تُقرأ بـ np.memmap
+    keys.txt      sha1 لكل صف بنفس الترتيب (سطر لكل نص)
+
+الكتابة من عملية واحدة في نفس الوقت؛ القراءة من أي عدد من العمليات.
+"""
+
+import hashlib
+import os
+import re
+
+import numpy as np
+
+
+def text_key(text):
+    """مفتاح ثابت للنص (sha1 لمحتواه)"""
+    return hashlib.sha1(str(text).encode('utf-8')).hexdigest()
+
+
+def unique_texts(texts):
+    """النصوص الفريدة بترتيب أول ظهور + فهرس كل نص فيها (texts[i] == unique[inverse[i]])"""
+    unique = {}
+    inverse = np.empty(len(texts), dtype=np.int64)
+    for i, text in enumerate(texts):
+        inverse[i] = unique.setdefault(text, len(unique))
+    return list(unique), inverse
+
+
+class EmbeddingStore:
+    def __init__(self, root, model_name, dim):
+        self.dim = int(dim)
+        self.model_name = model_name
+        self.path = os.path.join(root, re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name))
+        self.vectors_path = os.path.join(self.path, 'vectors.f32')
+        self.keys_path = os.path.join(self.path, 'keys.txt')
+        os.makedirs(self.path, exist_ok=True)
+
+        self.rows = {}
+        if os.path.exists(self.keys_path):
+            with open(self.keys_path, 'r', encoding='ascii') as f:
+                keys = f.read().split()
+            # vectors.f32 تُكتب قبل keys.txt؛ بعد انقطاع قد توجد صفوف زائدة بدون مفتاح
+            stored_rows = self._stored_rows()
+            for row, key in enumerate(keys[:stored_rows]):
+                self.rows[key] = row
+            if len(keys) > stored_rows:
+                with open(self.keys_path, 'w', encoding='ascii') as f:
+                    f.write(''.join(key + '\n' for key in keys[:stored_rows]))
+        self._vectors = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _stored_rows(self):
+        if not os.path.exists(self.vectors_path):
+            return 0
+        return os.path.getsize(self.vectors_path) // (4 * self.dim)
+
+    def vectors(self):
+        """كل الصفوف المحفوظة كـ memmap للقراءة فقط"""
+        if self._vectors is None or len(self._vectors) < len(self.rows):
+            if not self.rows:
+                return np.zeros((0, self.dim), dtype=np.float32)
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode='r',
+                                      shape=(len(self.rows), self.dim))
+        return self._vectors
+
+    def add(self, keys, embeddings):
+        """إضافة صفوف جديدة (المفاتيح الموجودة مسبقاً تُتجاهل)"""
+        embeddings = np.asarray(embeddings, dtype=np.float32).reshape(-1, self.dim)
+        new = [i for i, key in enumerate(keys) if key not in self.rows]
+        if not new:
+            return
+        # ابدأ من نهاية آخر صف له مفتاح حتى لا تُحسب صفوف يتيمة
+        with open(self.vectors_path, 'r+b' if os.path.exists(self.vectors_path) else 'wb') as f:
+            f.seek(len(self.rows) * 4 * self.dim)
+            f.write(np.ascontiguousarray(embeddings[new]).tobytes())
+            f.truncate()
+        with open(self.keys_path, 'w' if not self.rows else 'a', encoding='ascii') as f:
+            for i in new:
+                f.write(keys[i] + '\n')
+        for i in new:
+            self.rows[keys[i]] = len(self.rows)
+        self._vectors = None
+
+    def encode(self, texts, encode_fn, **encode_kwargs):
+        """
+        embeddings لكل النصوص: يحسب فقط النصوص الفريدة غير المحفوظة
+        ثم يعيد توزيع النتائج على مواقعها الأصلية
+        """
+        texts = list(texts)
+        unique, inverse = unique_texts(texts)
+        keys = [text_key(text) for text in unique]
+
+        missing = [i for i, key in enumerate(keys) if key not in self.rows]
+        print(f"🔄 {len(texts)} نص، {len(unique)} فريد، "
+              f"{len(unique) - len(missing)} محفوظ مسبقاً، {len(missing)} للتحويل")
+        if missing:
+            encoded = encode_fn([unique[i] for i in missing], **encode_kwargs)
+            self.add([keys[i] for i in missing], encoded)
+
+        vectors = self.vectors()
+        unique_rows = np.array([self.rows[key] for key in keys], dtype=np.int64)
+        return np.asarray(vectors[unique_rows[inverse]], dtype=np.float32)
@@ -0,0 +1,98 @@
+"""
+محرك تقييم: مصفوفة درجات التطابق لكل (سيرة ذاتية × وظيفة) دفعة واحدة
+
+كل نص يُحوَّل إلى embedding مرة واحدة فقط، والدرجة الهجينة نفسها في
+CVJobMatcher.find_top_matches (70% cosine similarity + 30% keyword matching)
+تُحسب كعمليات مصفوفات بدل استدعاء لكل سيرة ذاتية:
+
+    engine = EvaluationEngine(matcher)
+    scores = engine.score_matrix(cv_texts, job_texts)    # shape: (len(cv_texts), len(job_texts))
+
+الكلمات المفتاحية: مصفوفة وجود (نص × كلمة) لكل جانب، وعدد الكلمات المشتركة
+= ضرب مصفوفات. نفس قائمة CVJobMatcher.TECH_KEYWORDS بتكراراتها، فالنتيجة مطابقة.
+"""
+
+import numpy as np
+
+from cv_job_matching_model import CVJobMatcher
+
+# عدد السير الذاتية في كل جزء من المصفوفة (لحد الذاكرة مع آلاف السير)
+SCORE_CHUNK_SIZE = 1024
+
+
+def keyword_presence(texts, keywords=CVJobMatcher.TECH_KEYWORDS):
+    """مصفوفة float32 (عدد النصوص × عدد الكلمات): 1 إذا كانت الكلمة داخل النص"""
+    presence = np.zeros((len(texts), len(keywords)), dtype=np.float32)
+    for i, text in enumerate(texts):
+        lower = str(text).lower()
+        presence[i] = [keyword in lower for keyword in keywords]
+    return presence
+
+
+def keyword_scores(cv_presence, job_presence):
+    """
+    نسبة كلمات الوظيفة الموجودة في السيرة الذاتية (0-100) لكل زوج
+    = _calculate_keyword_match؛ الوظائف بدون كلمات مفتاحية = 0
+    """
+    matched = cv_presence @ job_presence.T
+    total = job_presence.sum(axis=1)
+    return np.divide(matched * 100, total, out=np.zeros_like(matched), where=total > 0)
+
+
+def semantic_scores(cv_embeddings, job_embeddings):
+    """cosine similarity محولة من [-1, 1] إلى [0, 100]"""
+    cv_unit = cv_embeddings / np.maximum(np.linalg.norm(cv_embeddings, axis=1, keepdims=True), 1e-8)
+    job_unit = job_embeddings / np.maximum(np.linalg.norm(job_embeddings, axis=1, keepdims=True), 1e-8)
+    return (cv_unit @ job_unit.T + 1) * 50
+
+
+def sampled_top_k_mean(scores, n_pick, top_k, rng):
+    """
+    لكل صف: اختيار n_pick عمود عشوائي ثم متوسط أعلى top_k درجة منها
+    (نفس تقدير "عينة وظائف لكل سيرة ذاتية ثم find_top_matches" لكن على المصفوفة)
+    """
+    n_rows, n_cols = scores.shape
+    if n_cols > n_pick:
+        columns = rng.random((n_rows, n_cols)).argsort(axis=1)[:, :n_pick]
+        scores = np.take_along_axis(scores, columns, axis=1)
+    top_k = min(top_k, scores.shape[1])
+    top = np.partition(scores, scores.shape[1] - top_k, axis=1)[:, -top_k:]
+    return top.mean(axis=1)
+
+
+class EvaluationEngine:
+    def __init__(self, matcher, batch_size=64, cache_dir='embedding_cache'):
+        """
+        matcher: CVJobMatcher محمل
+        cache_dir: نفس embedding cache التدريب (None = بدون حفظ على القرص)
+        """
+        self.matcher = matcher
+        self.batch_size = batch_size
+        self.cache_dir = cache_dir
+
+    def encode(self, texts):
+        # النصوص المكررة تُحوَّل مرة واحدة (prepare_embeddings)
+        return np.asarray(
+            self.matcher.prepare_embeddings(list(texts), batch_size=self.batch_size,
+                                            cache_dir=self.cache_dir),
+            dtype=np.float32
+        )
+
+    def score_matrix(self, cv_texts, job_texts, cv_embeddings=None, job_embeddings=None):
+        """الدرجة الهجينة لكل (سيرة ذاتية × وظيفة): 70% semantic + 30% keyword"""
+        if cv_embeddings is None:
+            cv_embeddings = self.encode(cv_texts)
+        if job_embeddings is None:
+            job_embeddings = self.encode(job_texts)
+
+        cv_presence = keyword_presence(cv_texts)
+        job_presence = keyword_presence(job_texts)
+
+        scores = np.empty((len(cv_texts), len(job_texts)), dtype=np.float32)
+        for start in range(0, len(cv_texts), SCORE_CHUNK_SIZE):
+            end = start + SCORE_CHUNK_SIZE
+            scores[start:end] = (
+                semantic_scores(cv_embeddings[start:end], job_embeddings) * 0.7
+                + keyword_scores(cv_presence[start:end], job_presence) * 0.3
+            )
+        return scores
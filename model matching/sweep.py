@@ -0,0 +1,322 @@
+"""
+Sweep - تدريب عدة إعدادات بالتوازي ومقارنة الدقة بالسرعة
+يختار أسرع نموذج يحقق الدقة المطلوبة
+
+    python sweep.py                                   # كل الـ PRESETS في config.py
+    python sweep.py --presets fast balanced --workers 2
+    python sweep.py --grid grid.json --min-acc 85
+
+grid.json إما dict من القوائم (كل التوافيق) أو list من الإعدادات:
+    {"hidden_dims": [[256, 128], [512, 256, 128]], "batch_size": [32, 64], "epochs": [20]}
+
+الـ Embeddings تُحسب مرة واحدة في العملية الرئيسية (لكل نموذج BERT و sample_size)
+عبر embedding_cache المشترك، ثم كل worker يدرب من embeddings.npz بدون تحميل الـ transformer.
+الـ workers عمليات منفصلة (spawn)، وعدد أنوية الـ CPU مقسم بينها.
+
+المخرجات في sweeps/<timestamp>/:
+    leaderboard.csv / leaderboard.json / leaderboard.md
+    runs/<variant>/       مجلد run كامل (checkpoint, best_matching_model.pth, cv_job_matcher.pkl, train.log)
+"""
+
+import argparse
+import contextlib
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from config import DATA_CONFIG, MODEL_CONFIG, PRESETS, TRAINING_CONFIG
+
+# مفاتيح الإعدادات التي تُمرر لـ CVJobMatcher.train كما هي
+TRAIN_KEYS = ('epochs', 'batch_size', 'learning_rate', 'sample_size', 'seed',
+              'hidden_dims', 'dropout', 'fast_training', 'compile_model', 'bf16')
+
+LEADERBOARD_COLUMNS = ('rank', 'name', 'val_acc', 'train_time_s', 'latency_ms', 'pair_latency_us',
+                       'params', 'sentence_transformer_model', 'hidden_dims', 'dropout',
+                       'batch_size', 'learning_rate', 'epochs', 'sample_size', 'run_dir', 'error')
+
+# الاستدلال: سيرة ذاتية واحدة مقابل هذا العدد من الوظائف (مثل find_top_matches)
+LATENCY_JOBS = 100
+LATENCY_REPEATS = 30
+
+
+def default_config():
+    return {
+        'epochs': TRAINING_CONFIG['epochs'],
+        'batch_size': TRAINING_CONFIG['batch_size'],
+        'learning_rate': TRAINING_CONFIG['learning_rate'],
+        'sample_size': TRAINING_CONFIG['sample_size'],
+        'seed': 42,
+        'hidden_dims': MODEL_CONFIG['hidden_dims'],
+        'dropout': MODEL_CONFIG['dropout'],
+        'sentence_transformer_model': MODEL_CONFIG['sentence_transformer_model'],
+    }
+
+
+def expand_grid(grid):
+    """dict من القوائم -> كل التوافيق؛ list -> كما هي"""
+    if isinstance(grid, list):
+        return [dict(config) for config in grid]
+    keys = list(grid)
+    values = []
+    for key in keys:
+        value = grid[key]
+        values.append(value if isinstance(value, list) and not _is_dims(key, value) else [value])
+    return [dict(zip(keys, combo)) for combo in itertools.product(*values)]
+
+
+def _is_dims(key, value):
+    # "hidden_dims": [256, 128] قيمة واحدة، و [[256, 128], [512, 256]] قائمة قيم
+    return key == 'hidden_dims' and all(isinstance(v, int) for v in value)
+
+
+def load_variants(presets=None, grid_file=None, epochs=None):
+    """قائمة (اسم، إعدادات كاملة)"""
+    if grid_file:
+        with open(grid_file, 'r', encoding='utf-8') as f:
+            configs = expand_grid(json.load(f))
+        named = [(config.pop('name', f"v{i:02d}"), config) for i, config in enumerate(configs, 1)]
+    else:
+        names = presets or list(PRESETS)
+        unknown = [name for name in names if name not in PRESETS]
+        if unknown:
+            raise SystemExit(f"❌ Presets غير موجودة: {', '.join(unknown)} "
+                             f"(المتاح: {', '.join(PRESETS)})")
+        named = [(name, {k: v for k, v in PRESETS[name].items() if k != 'description'})
+                 for name in names]
+
+    variants = []
+    for name, overrides in named:
+        config = default_config()
+        config.update(overrides)
+        if epochs is not None:
+            config['epochs'] = epochs
+        variants.append((re.sub(r'[^A-Za-z0-9_.-]+', '_', str(name)), config))
+    return variants
+
+
+def thread_budget(workers):
+    """أنوية الـ CPU مقسمة على الـ workers (على الأقل thread لكل worker)"""
+    return max(1, (os.cpu_count() or 1) // workers)
+
+
+def _data_key(config):
+    return (config['sentence_transformer_model'], config['sample_size'], config['seed'])
+
+
+def prepare_shared_data(variants, cvs_file, jobs_file, data_dir, embedding_cache_dir):
+    """
+    embeddings.npz واحد لكل (نموذج BERT، sample_size، seed) - يُحسب مرة واحدة
+    ويستخدمه كل الـ variants المتشابهة
+    """
+    from cv_job_matching_model import CVJobMatcher
+
+    paths = {}
+    by_model = {}
+    for _, config in variants:
+        by_model.setdefault(config['sentence_transformer_model'], set()).add(_data_key(config))
+
+    for model_name, keys in by_model.items():
+        matcher = CVJobMatcher(model_name)
+        for key in sorted(keys, key=str):
+            _, sample_size, seed = key
+            key_dir = os.path.join(data_dir, re.sub(r'[^A-Za-z0-9_.-]+', '_',
+                                                    f"{model_name}_{sample_size or 'all'}_{seed}"))
+            os.makedirs(key_dir, exist_ok=True)
+            matcher._prepare_run_data(key_dir, cvs_file, jobs_file, sample_size, seed,
+                                      embedding_cache_dir)
+            paths[key] = os.path.join(key_dir, 'embeddings.npz')
+        # الـ workers لا يحتاجون الـ transformer؛ لا داعي لإبقائه في الذاكرة
+        del matcher
+    return paths
+
+
+def _link_or_copy(src, dst):
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def _init_worker(threads):
+    # قبل أول import لـ torch داخل العملية
+    for var in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+        os.environ[var] = str(threads)
+
+
+def measure_latency(matcher, cv_embeddings, job_embeddings):
+    """زمن تقييم سيرة ذاتية واحدة مقابل LATENCY_JOBS وظيفة (median, ms)"""
+    import torch
+
+    model = matcher.matching_model.eval()
+    n_jobs = min(LATENCY_JOBS, len(job_embeddings))
+    cv = torch.as_tensor(np.repeat(cv_embeddings[:1], n_jobs, axis=0), dtype=torch.float32,
+                         device=matcher.device)
+    jobs = torch.as_tensor(job_embeddings[:n_jobs], dtype=torch.float32, device=matcher.device)
+
+    timings = []
+    with torch.no_grad():
+        for i in range(LATENCY_REPEATS + 3):
+            started = time.perf_counter()
+            model(cv, jobs)
+            if i >= 3:   # أول 3 للتسخين
+                timings.append(time.perf_counter() - started)
+    latency_ms = float(np.median(timings)) * 1000
+    return latency_ms, latency_ms * 1000 / n_jobs
+
+
+def run_variant(name, config, run_dir, cvs_file, jobs_file, threads):
+    """تدريب variant واحد داخل worker؛ يرجع صف الـ leaderboard"""
+    row = {'name': name, 'run_dir': run_dir, 'error': ''}
+    row.update({key: config.get(key) for key in LEADERBOARD_COLUMNS if key in config})
+    log_path = os.path.join(run_dir, 'train.log')
+    try:
+        with open(log_path, 'w', encoding='utf-8') as log, contextlib.redirect_stdout(log):
+            from cv_job_matching_model import RUN_ARRAYS, CVJobMatcher
+
+            matcher = CVJobMatcher(config['sentence_transformer_model'], load_embedder=False)
+            train_kwargs = {key: config[key] for key in TRAIN_KEYS if key in config}
+            started = time.perf_counter()
+            row['val_acc'] = round(float(matcher.train(
+                cvs_file, jobs_file, run_dir=run_dir, num_threads=threads,
+                embedding_cache_dir=None, **train_kwargs)), 2)
+            row['train_time_s'] = round(time.perf_counter() - started, 2)
+
+            with np.load(os.path.join(run_dir, 'embeddings.npz')) as data:
+                arrays = dict(zip(RUN_ARRAYS, (data[key] for key in RUN_ARRAYS)))
+            latency_ms, pair_us = measure_latency(matcher, arrays['cv_val'], arrays['job_val'])
+            row['latency_ms'] = round(latency_ms, 3)
+            row['pair_latency_us'] = round(pair_us, 2)
+            row['params'] = sum(p.numel() for p in matcher.matching_model.parameters())
+            matcher.save_model(os.path.join(run_dir, 'cv_job_matcher.pkl'))
+    except Exception as e:
+        row['error'] = f"{type(e).__name__}: {e}"
+    return row
+
+
+def recommend(rows, min_acc=None):
+    """أسرع نموذج (latency) يحقق min_acc؛ بدون min_acc = في حدود 1% من أفضل دقة"""
+    done = [row for row in rows if not row['error']]
+    if not done:
+        return None, min_acc
+    if min_acc is None:
+        min_acc = max(row['val_acc'] for row in done) - 1.0
+    eligible = [row for row in done if row['val_acc'] >= min_acc]
+    if not eligible:
+        return None, min_acc
+    return min(eligible, key=lambda row: (row['latency_ms'], row['train_time_s'])), min_acc
+
+
+def write_leaderboard(rows, out_dir, min_acc=None):
+    rows = sorted(rows, key=lambda row: (bool(row['error']), -(row.get('val_acc') or 0)))
+    for rank, row in enumerate(rows, 1):
+        row['rank'] = rank
+    best, min_acc = recommend(rows, min_acc)
+
+    with open(os.path.join(out_dir, 'leaderboard.csv'), 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=LEADERBOARD_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+
+    with open(os.path.join(out_dir, 'leaderboard.json'), 'w', encoding='utf-8') as f:
+        json.dump({'min_acc': min_acc, 'recommended': best['name'] if best else None,
+                   'results': rows}, f, ensure_ascii=False, indent=2)
+
+    columns = ('rank', 'name', 'val_acc', 'train_time_s', 'latency_ms', 'params', 'hidden_dims',
+               'batch_size', 'sentence_transformer_model', 'error')
+    lines = ['| ' + ' | '.join(columns) + ' |', '|' + '---|' * len(columns)]
+    for row in rows:
+        cells = [str(row.get(column, '') if row.get(column) is not None else '') for column in columns]
+        if best is not None and row['name'] == best['name']:
+            cells[1] = f"**{cells[1]}** ⭐"
+        lines.append('| ' + ' | '.join(cells) + ' |')
+    summary = (f"\nالموصى به: **{best['name']}** - أسرع نموذج بدقة ≥ {min_acc:.2f}%\n" if best
+               else f"\nلا يوجد نموذج بدقة ≥ {min_acc}%\n")
+    with open(os.path.join(out_dir, 'leaderboard.md'), 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n' + summary)
+    return rows, best, min_acc
+
+
+def run_sweep(variants, cvs_file, jobs_file, out_dir, workers=None, min_acc=None,
+              embedding_cache_dir='embedding_cache'):
+    workers = workers or max(1, min(len(variants), (os.cpu_count() or 1) // 2))
+    threads = thread_budget(workers)
+    os.makedirs(out_dir, exist_ok=True)
+
+    print("\n" + "="*60)
+    print(f"🧪 Sweep: {len(variants)} إعدادات، {workers} workers × {threads} threads")
+    print(f"📁 {out_dir}")
+    print("="*60)
+
+    print("\n🔄 تجهيز الـ Embeddings المشتركة...")
+    data_paths = prepare_shared_data(variants, cvs_file, jobs_file,
+                                     os.path.join(out_dir, 'data'), embedding_cache_dir)
+
+    jobs = []
+    for name, config in variants:
+        run_dir = os.path.join(out_dir, 'runs', name)
+        os.makedirs(run_dir)
+        _link_or_copy(data_paths[_data_key(config)], os.path.join(run_dir, 'embeddings.npz'))
+        jobs.append((name, config, run_dir))
+
+    rows = []
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(threads,)) as pool:
+        futures = [pool.submit(run_variant, name, config, run_dir, cvs_file, jobs_file, threads)
+                   for name, config, run_dir in jobs]
+        for future in as_completed(futures):
+            row = future.result()
+            rows.append(row)
+            if row['error']:
+                print(f"❌ {row['name']}: {row['error']}")
+            else:
+                print(f"✅ {row['name']}: {row['val_acc']:.2f}% | تدريب {row['train_time_s']:.1f}s | "
+                      f"استدلال {row['latency_ms']:.2f}ms")
+
+    rows, best, min_acc = write_leaderboard(rows, out_dir, min_acc)
+
+    print("\n" + "="*60)
+    print("🏆 Leaderboard")
+    print("="*60)
+    for row in rows:
+        if row['error']:
+            print(f"  {row['rank']}. {row['name']}: ❌ {row['error']}")
+        else:
+            print(f"  {row['rank']}. {row['name']}: {row['val_acc']:.2f}% | "
+                  f"{row['train_time_s']:.1f}s | {row['latency_ms']:.2f}ms")
+    if best:
+        print(f"\n⭐ الموصى به: {best['name']} (أسرع نموذج بدقة ≥ {min_acc:.2f}%)")
+        print(f"   {os.path.join(best['run_dir'], 'cv_job_matcher.pkl')}")
+    print(f"\n📄 {os.path.join(out_dir, 'leaderboard.md')}")
+    return rows, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='تدريب عدة إعدادات بالتوازي ومقارنتها')
+    parser.add_argument('--presets', nargs='*', help=f"من: {', '.join(PRESETS)} (الافتراضي: الكل)")
+    parser.add_argument('--grid', help='ملف JSON: dict من القوائم أو list من الإعدادات')
+    parser.add_argument('--workers', type=int, help='عدد العمليات المتوازية')
+    parser.add_argument('--epochs', type=int, help='تجاوز عدد الـ epochs لكل الإعدادات')
+    parser.add_argument('--min-acc', type=float, help='الدقة المطلوبة (%%) لاختيار أسرع نموذج')
+    parser.add_argument('--cvs', default=DATA_CONFIG['cvs_file'])
+    parser.add_argument('--jobs', default=DATA_CONFIG['jobs_file'])
+    parser.add_argument('--embedding-cache', default='embedding_cache')
+    parser.add_argument('--out', help='مجلد النتائج (الافتراضي: sweeps/<timestamp>)')
+    args = parser.parse_args()
+
+    variants = load_variants(args.presets, args.grid, args.epochs)
+    out_dir = args.out or os.path.join('sweeps', time.strftime('%Y%m%d-%H%M%S'))
+    run_sweep(variants, args.cvs, args.jobs, out_dir, workers=args.workers,
+              min_acc=args.min_acc, embedding_cache_dir=args.embedding_cache)
+
+
+if __name__ == "__main__":
+    main()
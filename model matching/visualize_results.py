@@ -7,6 +7,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from cv_job_matching_model import CVJobMatcher
+from evaluation_engine import EvaluationEngine, sampled_top_k_mean
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -124,40 +125,45 @@ def plot_top_matches_bar(matches, jobs_df, top_n=10):
     plt.show()
 
 
-def plot_category_performance(cvs_df, jobs_df, matcher, n_samples=50):
+def _job_texts(jobs_df):
+    return (jobs_df['Job Title'] + " " + jobs_df['job_description_clean']).tolist()
+
+
+def plot_category_performance(cvs_df, jobs_df, matcher, n_samples=50, engine=None,
+                              job_pool=500, seed=None):
     """
     رسم أداء النموذج لكل فئة وظيفية
+    لكل سيرة ذاتية: 20 وظيفة عشوائية من مجموعة مشتركة (job_pool) ومتوسط أفضل 5 درجات،
+    من مصفوفة درجات واحدة (EvaluationEngine) - كل نص يُحوَّل مرة واحدة
     """
-    categories = cvs_df['Category'].unique()
-    category_scores = []
+    engine = engine or EvaluationEngine(matcher)
+    rng = np.random.default_rng(seed)
+    categories = cvs_df['Category'].unique()[:10]  # أول 10 فئات
     
     print("\n🔍 جاري تحليل الأداء لكل فئة...")
     
-    for category in categories[:10]:  # أول 10 فئات
-        category_cvs = cvs_df[cvs_df['Category'] == category].sample(
-            min(n_samples, len(cvs_df[cvs_df['Category'] == category]))
+    sampled_cvs = pd.concat([
+        cvs_df[cvs_df['Category'] == category].sample(
+            min(n_samples, int((cvs_df['Category'] == category).sum())), random_state=seed
         )
-        
-        scores = []
-        for _, cv_row in category_cvs.iterrows():
-            cv_text = cv_row['Resume']
-            
-            # اختيار وظائف
-            sample_jobs = jobs_df.sample(20)
-            job_texts = (sample_jobs['Job Title'] + " " + 
-                        sample_jobs['job_description_clean']).tolist()
-            
-            matches = matcher.find_top_matches(cv_text, job_texts, top_k=5)
-            avg_score = np.mean([m['similarity_score'] for m in matches])
-            scores.append(avg_score)
-        
+        for category in categories
+    ])
+    sample_jobs = jobs_df.sample(min(job_pool, len(jobs_df)), random_state=seed)
+    
+    scores = engine.score_matrix(sampled_cvs['Resume'].tolist(), _job_texts(sample_jobs))
+    cv_scores = sampled_top_k_mean(scores, n_pick=20, top_k=5, rng=rng)
+    cv_categories = sampled_cvs['Category'].to_numpy()
+    
+    category_scores = []
+    for category in categories:
+        category_cv_scores = cv_scores[cv_categories == category]
         category_scores.append({
             'category': category,
-            'avg_score': np.mean(scores),
-            'std_score': np.std(scores)
+            'avg_score': category_cv_scores.mean(),
+            'std_score': np.std(category_cv_scores)
         })
         
-        print(f"  ✅ {category}: {np.mean(scores):.2f}%")
+        print(f"  ✅ {category}: {category_cv_scores.mean():.2f}%")
     
     # رسم النتائج
     df_scores = pd.DataFrame(category_scores)
@@ -189,40 +195,50 @@ def plot_category_performance(cvs_df, jobs_df, matcher, n_samples=50):
     plt.show()
 
 
-def plot_confusion_style_matrix(cvs_df, jobs_df, matcher, n_samples=20):
+def plot_confusion_style_matrix(cvs_df, jobs_df, matcher, n_samples=20, engine=None,
+                                jobs_per_category=50, seed=None):
     """
     رسم مصفوفة توضح علاقة التطابق بين الفئات
+    الخلية (i, j): متوسط (أفضل 3 من 5 وظائف عشوائية من الفئة j) لسير الفئة i،
+    من مصفوفة درجات واحدة لكل السير المختارة × كل وظائف الفئات
     """
+    engine = engine or EvaluationEngine(matcher)
+    rng = np.random.default_rng(seed)
     categories = cvs_df['Category'].unique()[:5]  # أول 5 فئات
     
     matrix = np.zeros((len(categories), len(categories)))
     
     print("\n🔍 جاري بناء مصفوفة التطابق...")
     
-    for i, cv_cat in enumerate(categories):
-        category_cvs = cvs_df[cvs_df['Category'] == cv_cat].sample(
-            min(n_samples, len(cvs_df[cvs_df['Category'] == cv_cat]))
+    sampled_cvs = [
+        cvs_df[cvs_df['Category'] == cv_cat].sample(
+            min(n_samples, int((cvs_df['Category'] == cv_cat).sum())), random_state=seed
         )
-        
-        for _, cv_row in category_cvs.iterrows():
-            cv_text = cv_row['Resume']
-            
-            for j, job_cat in enumerate(categories):
-                # الوظائف من هذه الفئة
-                job_cat_jobs = jobs_df[
-                    jobs_df['Job Title'].str.contains(job_cat, case=False, na=False)
-                ]
-                
-                if len(job_cat_jobs) > 0:
-                    sample = job_cat_jobs.sample(min(5, len(job_cat_jobs)))
-                    job_texts = (sample['Job Title'] + " " + 
-                                sample['job_description_clean']).tolist()
-                    
-                    matches = matcher.find_top_matches(cv_text, job_texts, top_k=3)
-                    avg_score = np.mean([m['similarity_score'] for m in matches])
-                    matrix[i, j] += avg_score
-        
-        matrix[i] /= len(category_cvs)
+        for cv_cat in categories
+    ]
+    
+    # الوظائف من كل فئة (عمود لكل وظيفة؛ job_columns[j] = أعمدة الفئة j)
+    job_texts = []
+    job_columns = []
+    for job_cat in categories:
+        job_cat_jobs = jobs_df[
+            jobs_df['Job Title'].str.contains(job_cat, case=False, na=False)
+        ]
+        job_cat_jobs = job_cat_jobs.sample(min(jobs_per_category, len(job_cat_jobs)),
+                                           random_state=seed)
+        job_columns.append(np.arange(len(job_texts), len(job_texts) + len(job_cat_jobs)))
+        job_texts.extend(_job_texts(job_cat_jobs))
+    
+    cv_texts = pd.concat(sampled_cvs)['Resume'].tolist()
+    scores = engine.score_matrix(cv_texts, job_texts)
+    
+    row = 0
+    for i, (cv_cat, category_cvs) in enumerate(zip(categories, sampled_cvs)):
+        rows = scores[row:row + len(category_cvs)]
+        row += len(category_cvs)
+        for j, columns in enumerate(job_columns):
+            if len(columns) > 0 and len(rows) > 0:
+                matrix[i, j] = sampled_top_k_mean(rows[:, columns], n_pick=5, top_k=3, rng=rng).mean()
         print(f"  ✅ {cv_cat}")
     
     # رسم المصفوفة
@@ -291,11 +307,14 @@ def generate_full_report():
     print("\n3. أفضل المطابقات...")
     plot_top_matches_bar(matches, sample_jobs)
     
+    # محرك واحد للرسمين: الـ embeddings المحسوبة تُعاد من الـ cache
+    engine = EvaluationEngine(matcher)
+    
     print("\n4. الأداء حسب الفئة...")
-    plot_category_performance(cvs_df, jobs_df, matcher, n_samples=10)
+    plot_category_performance(cvs_df, jobs_df, matcher, n_samples=10, engine=engine)
     
     print("\n5. مصفوفة التطابق...")
-    plot_confusion_style_matrix(cvs_df, jobs_df, matcher, n_samples=5)
+    plot_confusion_style_matrix(cvs_df, jobs_df, matcher, n_samples=5, engine=engine)
     
     print("\n" + "="*60)
     print("✅ تم إنشاء جميع الرسوم البيانية!")
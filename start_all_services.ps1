@@ -29,10 +29,10 @@ function Start-ServiceInNewTerminal {
 }
 
 Write-Host "Services to start:" -ForegroundColor Green
-Write-Host "   1. CV Classifier Service (Python) - Port 5002" -ForegroundColor White
-Write-Host "   2. Skill Analyzer Service (TensorFlow) - Port 5003" -ForegroundColor White
-Write-Host "   3. Backend Server (Node.js) - Port 5000" -ForegroundColor White
-Write-Host "   4. Frontend (React) - Port 5174" -ForegroundColor White
+Write-Host "   1. Classification Server (Python) - Ports 5002 + 5003" -ForegroundColor White
+Write-Host "      (CV Classifier + Skill Analyzer in one process, models load on first use)" -ForegroundColor Gray
+Write-Host "   2. Backend Server (Node.js) - Port 5000" -ForegroundColor White
+Write-Host "   3. Frontend (React) - Port 5174" -ForegroundColor White
 Write-Host ""
 
 $start = Read-Host "Start all services? (Y/n)"
@@ -43,28 +43,22 @@ if ($start -eq "" -or $start -eq "Y" -or $start -eq "y") {
     Write-Host "🚀 Starting services..." -ForegroundColor Cyan
     Write-Host ""
     
-    # Start CV Classifier Service
+    # Start Classification Server (CV Classifier on 5002 + Skill Analyzer on 5003)
     $classifierPath = Join-Path (Get-Location) "ml-service"
-    $service1 = Start-ServiceInNewTerminal -Title "CV Classifier Service" -Command "python cv_classifier_service.py" -WorkingDirectory $classifierPath
+    $service1 = Start-ServiceInNewTerminal -Title "Classification Server" -Command "`$env:CLASSIFICATION_SERVER_PORTS='5002,5003'; python classification_server.py" -WorkingDirectory $classifierPath
     $services += $service1
     Start-Sleep -Seconds 2
     
-    # Start Skill Analyzer Service
-    $analyzerPath = Join-Path (Get-Location) "ml-service"
-    $service2 = Start-ServiceInNewTerminal -Title "Skill Analyzer Service" -Command "python skill_analyzer_service.py" -WorkingDirectory $analyzerPath
-    $services += $service2
-    Start-Sleep -Seconds 2
-    
     # Start Backend
     $backendPath = Join-Path (Get-Location) "Backend"
-    $service3 = Start-ServiceInNewTerminal -Title "Backend Server" -Command "npm start" -WorkingDirectory $backendPath
-    $services += $service3
+    $service2 = Start-ServiceInNewTerminal -Title "Backend Server" -Command "npm start" -WorkingDirectory $backendPath
+    $services += $service2
     Start-Sleep -Seconds 2
     
     # Start Frontend
     $frontendPath = Join-Path (Get-Location) "my-react-app"
-    $service4 = Start-ServiceInNewTerminal -Title "Frontend Dev Server" -Command "npm run dev" -WorkingDirectory $frontendPath
-    $services += $service4
+    $service3 = Start-ServiceInNewTerminal -Title "Frontend Dev Server" -Command "npm run dev" -WorkingDirectory $frontendPath
+    $services += $service3
     
     Write-Host ""
     Write-Host "All services started successfully!" -ForegroundColor Green
@@ -45,6 +45,10 @@ if ($LASTEXITCODE -ne 0) {
     Write-Host "Installing TensorFlow..." -ForegroundColor Yellow
     pip install tensorflow keras flask flask-cors
 }
+python -c "import waitress" 2>$null
+if ($LASTEXITCODE -ne 0) {
+    pip install waitress
+}
 
 # Set environment variable
 $env:PORT = "5003"
@@ -52,4 +56,4 @@ $env:PORT = "5003"
 # Start the service
 Write-Host "`n🚀 Starting Skill Analyzer Service on port 5003..." -ForegroundColor Green
 Write-Host ("=" * 80) -ForegroundColor Cyan
-python skill_analyzer_service.py
+python serve_skill_analyzer.py